@@ -0,0 +1,107 @@
+# 🎚️ 질문마다 검색 개수(k)를 점수 분포로 정하는 검색기
+# 1등 문단이 압도적이면 1~2개만, 점수가 고르게 비슷하면 최대 max_k 개까지 LLM 에 보낸다.
+
+import logging
+import threading
+
+from langchain_core.retrievers import BaseRetriever
+
+logger = logging.getLogger(__name__)
+
+
+def _token_counter():
+    try:
+        import tiktoken
+        encoding = tiktoken.get_encoding("cl100k_base")
+        return lambda text: len(encoding.encode(text))
+    except ImportError:
+        # 한국어는 대략 글자 2개당 1토큰 이상
+        return lambda text: max(len(text) // 2, 1)
+
+
+count_tokens = _token_counter()
+
+
+# ✅ 점수 내림차순 목록에서 몇 개를 쓸지 결정
+# - threshold: 이 점수 미만은 버림
+# - gap     : 바로 앞 문단보다 이만큼 이상 떨어지면 거기서 끊음
+# - relative: 1등 점수 × relative 미만은 버림
+def adaptive_cutoff(scores, min_k=1, max_k=6, gap=0.05, relative=0.9, threshold=None):
+    if not scores:
+        return 0
+    top = scores[0]
+    n = 1
+    for prev, score in zip(scores, scores[1:max_k]):
+        if n >= min_k:
+            if threshold is not None and score < threshold:
+                break
+            if gap is not None and prev - score > gap:
+                break
+            if relative is not None and score < top * relative:
+                break
+        n += 1
+    return max(min(n, max_k), min(min_k, len(scores)))
+
+
+# 세션/평가 전체 누적 통계 (고정 k 대비 절약한 문단 수·토큰 수)
+class AdaptiveStats:
+    def __init__(self, fixed_k=4):
+        self._lock = threading.Lock()
+        self.fixed_k = fixed_k
+        self.queries = 0
+        self.chunks = 0
+        self.tokens = 0
+        self.fixed_tokens = 0
+
+    def record(self, hits, chosen):
+        used = sum(count_tokens(doc.page_content) for doc, _ in hits[:chosen])
+        fixed = sum(count_tokens(doc.page_content) for doc, _ in hits[:self.fixed_k])
+        with self._lock:
+            self.queries += 1
+            self.chunks += chosen
+            self.tokens += used
+            self.fixed_tokens += fixed
+        return used, fixed
+
+    def as_dict(self):
+        return {
+            "queries": self.queries,
+            "avg_k": self.chunks / self.queries if self.queries else 0.0,
+            "tokens": self.tokens,
+            "fixed_tokens": self.fixed_tokens,
+            "saved_tokens": self.fixed_tokens - self.tokens,
+            "saved_ratio": 1 - self.tokens / self.fixed_tokens if self.fixed_tokens else 0.0,
+        }
+
+
+class AdaptiveKRetriever(BaseRetriever):
+    # search(query, k, vector=None) → [(Document, score)] (점수 높을수록 관련)
+    # vector: 이미 계산한 질문 임베딩 (search_with_vector 로 들어올 때만 넘긴다)
+    search: object
+    min_k: int = 1
+    max_k: int = 6
+    gap: float = 0.05
+    relative: float = 0.9
+    threshold: float | None = None
+    stats: AdaptiveStats | None = None
+
+    @classmethod
+    def from_vectorstore(cls, vectorstore, **kwargs):
+        # 관련도 점수 검색은 문장으로만 가능해서 vector 는 쓰지 않는다
+        return cls(search=lambda query, k, vector=None:
+                   vectorstore.similarity_search_with_relevance_scores(query, k=k), **kwargs)
+
+    def search_with_score(self, query, vector=None):
+        hits = self.search(query, self.max_k) if vector is None else self.search(query, self.max_k, vector=vector)
+        chosen = adaptive_cutoff([score for _, score in hits], min_k=self.min_k, max_k=self.max_k,
+                                 gap=self.gap, relative=self.relative, threshold=self.threshold)
+        if self.stats is not None:
+            used, fixed = self.stats.record(hits, chosen)
+            logger.info("adaptive k=%d (tokens %d vs fixed %d): %s", chosen, used, fixed, query)
+        return hits[:chosen]
+
+    def search_with_vector(self, query, vector):
+        return [doc for doc, _ in self.search_with_score(query, vector=vector)]
+
+    def _get_relevant_documents(self, query, *, run_manager=None):
+        return [doc for doc, _ in self.search_with_score(query)]
@@ -0,0 +1,48 @@
+# 🖼️ 채팅 기록 렌더링: 최근 메시지만 그리고, 이전 대화는 펼칠 때만 그린다
+# 말풍선 HTML 은 메시지마다 한 번만 만들어 저장하고, 마스코트도 메시지를 추가할 때 한 번만 고른다.
+# 그래서 대화가 길어져도 rerun 마다 그리는 양이 일정하다.
+
+import os
+import random
+from functools import lru_cache
+
+import streamlit as st
+
+RECENT_WINDOW = int(os.getenv("CHAT_RECENT_WINDOW", "10"))
+
+GRADUATION_KEYWORDS = ["졸업", "졸업요건", "졸업논문", "졸업학점", "학위"]
+MASCOTS = ["assets/mascot.png", "assets/mascot_love.png", "assets/mascot_alarm.png"]
+DEFAULT_MASCOT = "assets/mascot.png"
+
+
+# ✅ 답변 메시지를 추가할 때 한 번만 호출해서 msg["mascot"] 에 저장
+def pick_mascot(question):
+    if any(k in question for k in GRADUATION_KEYWORDS):
+        return "assets/mascot_graduate.png"
+    return random.choice(MASCOTS)
+
+
+# 이미지 파일은 프로세스에서 한 번만 읽는다
+@lru_cache(maxsize=32)
+def image_bytes(path):
+    with open(path, "rb") as f:
+        return f.read()
+
+
+# ✅ 말풍선 HTML 은 처음 그릴 때 만들어 메시지에 저장 (to_html(content) → str)
+def message_html(msg, to_html):
+    html = msg.get("html")
+    if html is None:
+        html = msg["html"] = to_html(msg["content"])
+    return html
+
+
+# ✅ 최근 window 개만 바로 그리고, 그 이전은 토글을 켰을 때만 그린다
+def render_history(messages, render_message, window=RECENT_WINDOW, key="show_older_messages"):
+    older = messages[:-window] if len(messages) > window else []
+    recent = messages[len(older):]
+    if older and st.toggle(f"🕘 이전 대화 {len(older)}개 보기", key=key):
+        for msg in older:
+            render_message(msg)
+    for msg in recent:
+        render_message(msg)
@@ -0,0 +1,223 @@
+# 🗜️ 열(column) 단위 문서 저장소: 청크마다 Document 객체 + metadata dict 를 들고 있지 않는다
+# - 본문: 모든 청크 텍스트를 이어 붙인 UTF-8 버퍼 하나 + 시작 위치(offset) 배열
+#         compress=True 면 청크 BLOCK_CHUNKS 개씩 zstd 로 압축 (zstandard 가 없으면 압축 없이)
+# - 메타데이터: 키마다 범주형(categorical) 열. 같은 source 경로 문자열은 한 번만 저장하고 행마다 정수 코드만 둔다
+# Document 는 검색 결과(top-k)로 나갈 때만 만든다.
+
+import json
+import logging
+import sys
+from array import array
+from functools import lru_cache
+
+import numpy as np
+from langchain_core.documents import Document
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+try:
+    from langchain_community.docstore.base import AddableMixin, Docstore
+except ImportError:
+    # FAISS 를 쓰지 않으면 langchain_community 없이도 TextColumn / MetadataColumns 는 쓸 수 있다
+    class Docstore:
+        pass
+
+    class AddableMixin:
+        pass
+
+logger = logging.getLogger(__name__)
+
+BLOCK_CHUNKS = 64
+_MISSING = -1
+
+
+class TextColumn:
+    def __init__(self, texts=(), compress=False):
+        if compress and zstandard is None:
+            logger.warning("zstandard 가 없어 압축 없이 저장합니다 (pip install zstandard)")
+            compress = False
+        self.compress = compress
+        self._blocks = []  # 압축된 블록 (BLOCK_CHUNKS 개씩)
+        self._block_offsets = []  # 블록마다 청크 시작 위치 (블록 안 기준)
+        self._tail = bytearray()  # 아직 블록을 다 채우지 못한 부분 (압축하지 않으면 전부 여기)
+        self._tail_offsets = array("q", [0])
+        self.extend(texts)
+
+    def __len__(self):
+        return len(self._blocks) * BLOCK_CHUNKS + len(self._tail_offsets) - 1
+
+    def __getitem__(self, i):
+        if i < 0:
+            i += len(self)
+        if not 0 <= i < len(self):
+            raise IndexError(i)
+        block, row = divmod(i, BLOCK_CHUNKS)
+        if self.compress and block < len(self._blocks):
+            data, offsets = self._block(block), self._block_offsets[block]
+        elif self.compress:
+            data, offsets = self._tail, self._tail_offsets
+        else:
+            data, offsets, row = self._tail, self._tail_offsets, i
+        return bytes(data[offsets[row]:offsets[row + 1]]).decode("utf-8")
+
+    def __iter__(self):
+        return (self[i] for i in range(len(self)))
+
+    def _block(self, block):
+        return _decompress(self._blocks[block])
+
+    def append(self, text):
+        encoded = text.encode("utf-8")
+        self._tail += encoded
+        self._tail_offsets.append(self._tail_offsets[-1] + len(encoded))
+        if self.compress and len(self._tail_offsets) - 1 == BLOCK_CHUNKS:
+            self._blocks.append(_compress(bytes(self._tail)))
+            self._block_offsets.append(self._tail_offsets)
+            self._tail, self._tail_offsets = bytearray(), array("q", [0])
+
+    def extend(self, texts):
+        for text in texts:
+            self.append(text)
+
+    def take(self, rows):
+        return TextColumn((self[i] for i in rows), compress=self.compress)
+
+    def copy(self):
+        column = TextColumn(compress=self.compress)
+        # 다 채운 블록은 바뀌지 않으므로 공유
+        column._blocks, column._block_offsets = list(self._blocks), list(self._block_offsets)
+        column._tail, column._tail_offsets = bytearray(self._tail), array("q", self._tail_offsets)
+        return column
+
+    @property
+    def nbytes(self):
+        offsets = self._block_offsets + [self._tail_offsets]
+        return sum(len(b) for b in self._blocks) + len(self._tail) + sum(8 * len(o) for o in offsets)
+
+
+# 같은 블록을 연달아 읽는 경우(같은 문서의 인접 청크)가 많아 최근 블록 몇 개만 풀어 둔다
+@lru_cache(maxsize=16)
+def _decompress(data):
+    return zstandard.ZstdDecompressor().decompress(data)
+
+
+def _compress(data):
+    # compress() 결과는 최대 크기로 잡은 버퍼를 그대로 쓰므로 실제 크기로 복사해 둔다
+    return bytes(memoryview(zstandard.ZstdCompressor(level=3).compress(data)))
+
+
+class MetadataColumns:
+    def __init__(self, metadatas=()):
+        self._length = 0
+        self._codes = {}  # 키 → 행마다 값 번호 (없으면 -1)
+        self._values = {}  # 키 → 값 목록 (같은 값은 한 번만)
+        self._lookup = {}  # 키 → {값 JSON: 번호}
+        self.extend(metadatas)
+
+    def __len__(self):
+        return self._length
+
+    def __getitem__(self, i):
+        if i < 0:
+            i += self._length
+        if not 0 <= i < self._length:
+            raise IndexError(i)
+        return {key: self._values[key][codes[i]] for key, codes in self._codes.items() if codes[i] != _MISSING}
+
+    def __iter__(self):
+        return (self[i] for i in range(self._length))
+
+    def _grow(self, codes):
+        if len(codes) > self._length:
+            return codes
+        grown = np.full(max(16, 2 * len(codes)), _MISSING, dtype=np.int32)
+        grown[:len(codes)] = codes
+        return grown
+
+    def append(self, metadata):
+        for key, value in (metadata or {}).items():
+            if key not in self._codes:
+                self._codes[key] = np.full(max(16, self._length + 1), _MISSING, dtype=np.int32)
+                self._values[key], self._lookup[key] = [], {}
+            lookup = self._lookup[key]
+            token = json.dumps(value, ensure_ascii=False, sort_keys=True, default=str)
+            if token not in lookup:
+                lookup[token] = len(self._values[key])
+                self._values[key].append(sys.intern(value) if isinstance(value, str) else value)
+            self._codes[key][self._length] = lookup[token]
+        self._length += 1
+        for key in self._codes:
+            self._codes[key] = self._grow(self._codes[key])
+
+    def extend(self, metadatas):
+        for metadata in metadatas:
+            self.append(metadata)
+
+    def take(self, rows):
+        return MetadataColumns(self[i] for i in rows)
+
+    def copy(self):
+        column = MetadataColumns()
+        column._length = self._length
+        column._codes = {key: codes.copy() for key, codes in self._codes.items()}
+        column._values = {key: list(values) for key, values in self._values.items()}
+        column._lookup = {key: dict(lookup) for key, lookup in self._lookup.items()}
+        return column
+
+    @property
+    def nbytes(self):
+        values = sum(len(json.dumps(v, ensure_ascii=False, default=str).encode("utf-8"))
+                     for values in self._values.values() for v in values)
+        return sum(codes.nbytes for codes in self._codes.values()) + values
+
+
+# ✅ FAISS 용 문서 저장소 (InMemoryDocstore 대체). search() 할 때만 Document 를 만든다
+class CompactDocstore(Docstore, AddableMixin):
+    def __init__(self, documents=None, compress=False):
+        self.texts = TextColumn(compress=compress)
+        self.metadatas = MetadataColumns()
+        self._rows = {}
+        self.add(documents or {})
+
+    def __len__(self):
+        return len(self._rows)
+
+    def add(self, texts):
+        overlapping = set(texts).intersection(self._rows)
+        if overlapping:
+            raise ValueError(f"Tried to add ids that already exist: {overlapping}")
+        for _id, doc in texts.items():
+            self._rows[_id] = len(self.texts)
+            self.texts.append(doc.page_content)
+            self.metadatas.append(doc.metadata)
+
+    # 지운 청크는 id 만 빼고 본문은 남겨 둔다 (업로드 문서 교체 정도의 삭제량이면 충분)
+    def delete(self, ids):
+        missing = set(ids).difference(self._rows)
+        if missing:
+            raise ValueError(f"Tried to delete ids that does not exist: {missing}")
+        for _id in ids:
+            del self._rows[_id]
+
+    def search(self, search):
+        row = self._rows.get(search)
+        if row is None:
+            return f"ID {search} not found."
+        return Document(id=search, page_content=self.texts[row], metadata=self.metadatas[row])
+
+    @property
+    def nbytes(self):
+        return self.texts.nbytes + self.metadatas.nbytes + sum(sys.getsizeof(_id) + 8 for _id in self._rows)
+
+    @classmethod
+    def from_docstore(cls, docstore, compress=False):
+        return cls(dict(docstore._dict), compress=compress)
+
+
+# ✅ FAISS.from_documents(...) 로 만든 저장소의 InMemoryDocstore 를 교체
+def compact_faiss(store, compress=False):
+    store.docstore = CompactDocstore.from_docstore(store.docstore, compress=compress)
+    return store
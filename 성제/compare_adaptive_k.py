@@ -0,0 +1,59 @@
+# 📊 고정 k vs 적응형 k: 평가 세트에서 LLM 에 보내는 문맥 토큰과 검색 재현율 비교
+import logging
+import sys
+
+from adaptive_k import AdaptiveStats, adaptive_cutoff, count_tokens
+from eval_set import context_recall, load_eval_set
+from numpy_store import NumpyVectorStore
+from onnx_embeddings import load_embeddings
+from text_cache import load_pdf_folder
+from token_splitter import TokenAwareSplitter
+
+logging.basicConfig(level=logging.WARNING)
+
+folder_path = sys.argv[1] if len(sys.argv) > 1 else "경북대학교"
+model_name = "jhgan/ko-sbert-nli"
+fixed_k = 4
+settings = [
+    {"gap": 0.05, "relative": 0.9},
+    {"gap": 0.08, "relative": 0.85},
+    {"gap": 0.03, "relative": 0.95},
+    {"gap": None, "relative": None, "threshold": 0.5},
+]
+
+eval_set = load_eval_set()
+print(f"🧪 평가 질문 {len(eval_set)}개")
+
+chunks = TokenAwareSplitter.from_model(model_name).split_documents(load_pdf_folder(folder_path))
+store = NumpyVectorStore.from_documents(chunks, load_embeddings(model_name))
+hits = {item["question"]: store.similarity_search_with_score(item["question"], k=8) for item in eval_set}
+
+
+def evaluate(choose):
+    stats = AdaptiveStats(fixed_k=fixed_k)
+    recalls = []
+    for item in eval_set:
+        question_hits = hits[item["question"]]
+        chosen = choose(question_hits)
+        stats.record(question_hits, chosen)
+        context = "\n\n".join(doc.page_content for doc, _ in question_hits[:chosen])
+        recalls.append(context_recall(item["reference"], context))
+    return stats.as_dict(), sum(recalls) / len(recalls)
+
+
+print(f"\n{'설정':<36}{'평균 k':>8}{'토큰':>8}{'절약':>8}{'재현율':>8}")
+baseline, baseline_recall = evaluate(lambda question_hits: min(fixed_k, len(question_hits)))
+print(f"{f'고정 k={fixed_k}':<36}{baseline['avg_k']:>8.2f}{baseline['tokens']:>8}{'-':>8}{baseline_recall:>8.1%}")
+for params in settings:
+    stats, recall = evaluate(lambda question_hits: adaptive_cutoff([s for _, s in question_hits], **params))
+    label = ", ".join(f"{k}={v}" for k, v in params.items())
+    print(f"{label:<36}{stats['avg_k']:>8.2f}{stats['tokens']:>8}{stats['saved_ratio']:>8.1%}"
+          f"{recall - baseline_recall:>+8.1%}")
+
+# 🔍 질문별로 어떤 k 가 골라졌는지
+print("\n질문별 (기본 설정)")
+for item in eval_set:
+    question_hits = hits[item["question"]]
+    chosen = adaptive_cutoff([s for _, s in question_hits], **settings[0])
+    tokens = sum(count_tokens(doc.page_content) for doc, _ in question_hits[:chosen])
+    print(f"  k={chosen}  토큰={tokens:<5} {item['question']}")
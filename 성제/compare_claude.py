@@ -1,4 +1,3 @@
-from langchain_community.document_loaders import PyPDFDirectoryLoader
 from langchain.text_splitter import RecursiveCharacterTextSplitter
 from langchain_anthropic import ChatAnthropic
 from langchain.vectorstores import Chroma
@@ -8,14 +7,15 @@ from bert_score import score as bert_score
 import os
 import getpass
 
+from text_cache import load_pdf_folder
+
 # 🔐 Claude API Key 입력 받기
 claude_api_key = getpass.getpass("Claude API Key를 입력하세요: ")
 os.environ["ANTHROPIC_API_KEY"] = claude_api_key
 
 # 📁 PDF 로딩
 folder_path = r"C:/_vscode/Project_13/성제/경북대학교"
-loader = PyPDFDirectoryLoader(folder_path)
-documents = loader.load()
+documents = load_pdf_folder(folder_path)
 print(f"📄 불러온 PDF 문서 수: {len(documents)}개")
 
 # 📚 청크 분할
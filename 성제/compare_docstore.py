@@ -0,0 +1,73 @@
+# 📊 문서 저장소 메모리 비교: InMemoryDocstore(청크마다 Document) vs 열 단위 저장소 vs + zstd (경북대 데이터)
+# 벡터는 어느 쪽이든 같으므로 본문/메타데이터만 잰다. tracemalloc 으로 만든 뒤 남아 있는 바이트를 측정.
+import gc
+import json
+import random
+import sys
+import time
+import tracemalloc
+
+from langchain_core.documents import Document
+
+from compact_docstore import CompactDocstore
+from text_cache import load_pdf_folder
+from token_splitter import TokenAwareSplitter
+
+try:
+    from langchain_community.docstore.in_memory import InMemoryDocstore
+except ImportError:
+    InMemoryDocstore = None
+
+folder_path = sys.argv[1] if len(sys.argv) > 1 else "경북대학교"
+model_name = "jhgan/ko-sbert-nli"
+k = 4
+repeat = 2000
+
+chunks = TokenAwareSplitter.from_model(model_name).split_documents(load_pdf_folder(folder_path))
+# 저장소끼리 문자열을 공유하지 않도록 직렬화해 두고 매번 새로 읽는다
+serialized = json.dumps([{"text": d.page_content, "metadata": d.metadata} for d in chunks], ensure_ascii=False)
+text_bytes = sum(len(d.page_content.encode("utf-8")) for d in chunks)
+print(f"🧩 청크 {len(chunks)}개, 본문 {text_bytes / 1e6:.2f}MB")
+
+
+def build_documents():
+    docs = {str(i): Document(page_content=c["text"], metadata=c["metadata"])
+            for i, c in enumerate(json.loads(serialized))}
+    return InMemoryDocstore(docs) if InMemoryDocstore else docs
+
+
+def build_compact(compress):
+    def build():
+        return CompactDocstore({str(i): Document(page_content=c["text"], metadata=c["metadata"])
+                                for i, c in enumerate(json.loads(serialized))}, compress=compress)
+    return build
+
+
+# ✅ 만든 뒤 남아 있는 메모리 (임시 객체는 정리된 뒤)
+def retained_bytes(build):
+    gc.collect()
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    store = build()
+    gc.collect()
+    after = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    return store, after - before
+
+
+def lookup_us(store):
+    search = store.search if hasattr(store, "search") else store.get
+    ids = [str(i) for i in range(len(chunks))]
+    random.seed(0)
+    start = time.perf_counter()
+    for _ in range(repeat):
+        for _id in random.sample(ids, k):
+            search(_id)
+    return (time.perf_counter() - start) / repeat * 1e6
+
+
+print(f"{'저장소':<22}{'메모리(MB)':>12}{'본문 대비':>10}{f'top-{k} 꺼내기(µs)':>20}")
+for name, build in [("Document (기본)", build_documents), ("열 단위", build_compact(False)),
+                    ("열 단위 + zstd", build_compact(True))]:
+    store, nbytes = retained_bytes(build)
+    print(f"{name:<22}{nbytes / 1e6:>12.2f}{nbytes / text_bytes:>9.1f}x{lookup_us(store):>20.1f}")
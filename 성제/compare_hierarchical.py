@@ -0,0 +1,72 @@
+# 📊 평면(flat) 검색 vs 2단계(문서 → 청크) 검색: 지연시간 + top-k 일치율
+import sys
+import time
+
+import numpy as np
+from langchain.text_splitter import RecursiveCharacterTextSplitter
+from langchain_community.embeddings import HuggingFaceEmbeddings
+from langchain_core.embeddings import Embeddings
+
+from hierarchical import HierarchicalIndex
+from numpy_store import NumpyVectorStore
+from text_cache import load_pdf_folder
+
+folder_path = sys.argv[1] if len(sys.argv) > 1 else "경북대학교"
+questions = [
+    "기계공학부 졸업하려면 몇 학점 들어야 하나요?",
+    "전자공학부 졸업요건 알려줘",
+    "경영학부 졸업 논문은 필수인가요?",
+    "휴학은 어떻게 하나요?",
+    "수강신청 일정은 언제인가요?",
+    "등록금 납부 기간은 언제인가요?",
+]
+k = 4
+repeat = 50
+
+
+# ✅ 질문 임베딩 시간은 빼고 검색 자체만 비교
+class CachedEmbeddings(Embeddings):
+    def __init__(self, base):
+        self.base = base
+        self.cache = {}
+
+    def embed_documents(self, texts):
+        missing = [t for t in texts if t not in self.cache]
+        if missing:
+            for t, v in zip(missing, self.base.embed_documents(missing)):
+                self.cache[t] = v
+        return [self.cache[t] for t in texts]
+
+    def embed_query(self, text):
+        return self.embed_documents([text])[0]
+
+
+documents = load_pdf_folder(folder_path)
+chunks = RecursiveCharacterTextSplitter(chunk_size=1000, chunk_overlap=100).split_documents(documents)
+embeddings = CachedEmbeddings(HuggingFaceEmbeddings(model_name="jhgan/ko-sbert-nli"))
+store = NumpyVectorStore.from_documents(chunks, embeddings)
+embeddings.embed_documents(questions)
+
+start = time.perf_counter()
+index = HierarchicalIndex(store)
+print(f"🧩 청크 {len(store)}개 / 문서 {len(index)}개, 문서 인덱스 생성 {(time.perf_counter() - start) * 1000:.1f}ms")
+for info in index.documents:
+    print(f"   - {info['title']} ({info['department']}, {info['n_chunks']}청크)")
+
+print(f"\n{'n_docs':<8}{'p50(ms)':>10}{'p95(ms)':>10}{'일치율':>10}")
+exact = {q: [d.page_content for d in store.similarity_search(q, k=k)] for q in questions}
+for n_docs in (None, 1, 2, 3, 5):
+    samples = []
+    overlap = []
+    for q in questions:
+        for _ in range(repeat):
+            t = time.perf_counter()
+            if n_docs is None:
+                got = [d.page_content for d in store.similarity_search(q, k=k)]
+            else:
+                got = [d.page_content for d, _ in index.search_with_score(q, k=k, n_docs=n_docs)]
+            samples.append(time.perf_counter() - t)
+        overlap.append(len(set(got) & set(exact[q])) / k)
+    label = "flat" if n_docs is None else str(n_docs)
+    print(f"{label:<8}{np.percentile(samples, 50) * 1000:>10.3f}{np.percentile(samples, 95) * 1000:>10.3f}"
+          f"{np.mean(overlap):>10.0%}")
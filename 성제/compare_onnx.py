@@ -0,0 +1,79 @@
+# 📊 PyTorch vs ONNX(int8) 임베딩: 일치도(parity) + 처리량 비교
+import sys
+import time
+
+import numpy as np
+from langchain_community.embeddings import HuggingFaceEmbeddings
+
+from numpy_store import NumpyVectorStore
+from onnx_embeddings import OnnxEmbeddings
+from text_cache import load_pdf_folder
+from token_splitter import TokenAwareSplitter
+
+folder_path = sys.argv[1] if len(sys.argv) > 1 else "경북대학교"
+model_name = sys.argv[2] if len(sys.argv) > 2 else "jhgan/ko-sbert-nli"
+questions = [
+    "휴학은 어떻게 하나요?",
+    "복학 신청은 어디서 하나요?",
+    "수강신청 일정은 언제인가요?",
+    "성적 열람은 어디서 하나요?",
+    "학생증 발급은 어떻게 하나요?",
+    "졸업하려면 몇 학점 들어야 하나요?",
+    "등록금 납부 기간은 언제인가요?",
+    "강의평가는 언제 하나요?",
+]
+k = 4
+
+
+def normalize(matrix):
+    matrix = np.asarray(matrix, dtype=np.float32)
+    return matrix / np.linalg.norm(matrix, axis=1, keepdims=True)
+
+
+def throughput(embeddings, texts):
+    start = time.perf_counter()
+    vectors = embeddings.embed_documents(texts)
+    return vectors, len(texts) / (time.perf_counter() - start)
+
+
+def query_latency_ms(embeddings):
+    samples = []
+    for q in questions * 5:
+        start = time.perf_counter()
+        embeddings.embed_query(q)
+        samples.append(time.perf_counter() - start)
+    return float(np.percentile(samples, 50)) * 1000
+
+
+# 📁 청크 준비
+documents = load_pdf_folder(folder_path)
+chunks = TokenAwareSplitter.from_model(model_name).split_documents(documents)
+texts = [c.page_content for c in chunks]
+print(f"🧩 청크 수: {len(texts)}개")
+
+# 🤖 기준: PyTorch fp32
+torch_embeddings = HuggingFaceEmbeddings(model_name=model_name)
+torch_vectors, torch_tps = throughput(torch_embeddings, texts)
+print(f"\n🔥 PyTorch fp32 : {torch_tps:.1f} 청크/s, 질의 p50 {query_latency_ms(torch_embeddings):.1f}ms")
+
+torch_store = NumpyVectorStore(torch_embeddings)
+torch_store.add_vectors(texts, torch_vectors)
+reference = {q: {d.page_content for d in torch_store.similarity_search(q, k=k)} for q in questions}
+
+# ⚡ ONNX fp32 / int8, 스레드 수별
+for quantize in [False, True]:
+    for threads in [1, 2, 4]:
+        onnx_embeddings = OnnxEmbeddings(model_name, quantize=quantize, num_threads=threads)
+        onnx_vectors, onnx_tps = throughput(onnx_embeddings, texts)
+        cosine = (normalize(torch_vectors) * normalize(onnx_vectors)).sum(axis=1)
+
+        onnx_store = NumpyVectorStore(onnx_embeddings)
+        onnx_store.add_vectors(texts, onnx_vectors)
+        overlap = [len({d.page_content for d in onnx_store.similarity_search(q, k=k)} & reference[q]) / k
+                   for q in questions]
+
+        name = f"ONNX {'int8' if quantize else 'fp32'} x{threads}"
+        print(f"\n⚡ {name}: {onnx_tps:.1f} 청크/s ({onnx_tps / torch_tps:.2f}배), "
+              f"질의 p50 {query_latency_ms(onnx_embeddings):.1f}ms")
+        print(f"  - 코사인 일치도 평균/최소 : {cosine.mean():.4f} / {cosine.min():.4f}")
+        print(f"  - top-{k} 검색 일치율     : {np.mean(overlap):.2f}")
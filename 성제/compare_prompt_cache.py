@@ -0,0 +1,58 @@
+# 📊 프롬프트 접두부 캐시 확인: 평가 질문을 두 바퀴 돌리며 요청마다 캐시 읽기/쓰기 토큰 출력
+# 기본은 로컬 mock 서버(mock_anthropic.py), --live 면 실제 Claude API (CLAUDE_API_KEY 필요)
+import os
+import sys
+
+from dotenv import load_dotenv
+from langchain_anthropic import ChatAnthropic
+
+from deadline import format_docs
+from eval_set import load_eval_set
+from mock_anthropic import MockMessagesAPI
+from numpy_store import NumpyVectorStore
+from onnx_embeddings import load_embeddings
+from prompt_cache import CachedPromptChain, PassageFrequency
+from text_cache import load_pdf_folder
+from token_splitter import TokenAwareSplitter
+
+live = "--live" in sys.argv
+args = [a for a in sys.argv[1:] if not a.startswith("--")]
+folder_path = args[0] if args else "경북대학교"
+model = "claude-3-haiku-20240307"
+model_name = "jhgan/ko-sbert-nli"
+instructions = ("당신은 경북대학교에 관한 정보를 제공하는 AI 도우미입니다. "
+                "아래 문서 내용을 참고하여 정확하고 공손하게 한국어로 답변해 주세요. 이모지도 함께 사용하세요.")
+
+eval_set = load_eval_set()
+chunks = TokenAwareSplitter.from_model(model_name).split_documents(load_pdf_folder(folder_path))
+store = NumpyVectorStore.from_documents(chunks, load_embeddings(model_name))
+
+mock = None
+if live:
+    load_dotenv()
+    llm = ChatAnthropic(model=model, api_key=os.getenv("CLAUDE_API_KEY"), max_tokens=300)
+else:
+    mock = MockMessagesAPI().start()
+    llm = ChatAnthropic(model=model, api_key="test", anthropic_api_url=mock.url, max_tokens=300)
+
+# 첫 바퀴가 끝나면 자주 찾은 문단으로 접두부를 만든다
+chain = CachedPromptChain(llm, instructions, frequency=PassageFrequency(refresh_every=len(eval_set)))
+
+print(f"{'바퀴':<4}{'질문':<28}{'읽기':>8}{'쓰기':>8}{'캐시 안 됨':>10}")
+for round_no in (1, 2):
+    for item in eval_set:
+        docs = store.similarity_search(item["question"], k=4)
+        before = chain.stats.as_dict()
+        chain.invoke({"context": format_docs(docs), "input": item["question"], "docs": docs})
+        after = chain.stats.as_dict()
+        print(f"{round_no:<4}{item['question'][:26]:<28}"
+              f"{after['cache_read_tokens'] - before['cache_read_tokens']:>8}"
+              f"{after['cache_write_tokens'] - before['cache_write_tokens']:>8}"
+              f"{after['input_tokens'] - before['input_tokens']:>10}")
+
+tokens, cacheable = chain.prefix_tokens()
+print(f"\n접두부 약 {tokens}토큰 (최소 {chain.min_tokens}, {'캐시됨' if cacheable else '너무 짧음'}), "
+      f"자주 찾는 문단 {len(chain.frequency.hot)}개")
+print(f"합계 {chain.stats.as_dict()}")
+if mock:
+    mock.stop()
@@ -0,0 +1,42 @@
+# 📊 벡터 검색 상위 3개 vs 12개 가져와 cross-encoder 재정렬 후 상위 3개: 재현율 + 지연시간
+import sys
+import time
+
+from eval_set import context_recall, load_eval_set
+from numpy_store import NumpyVectorStore
+from onnx_embeddings import load_embeddings
+from reranker import CrossEncoderReranker
+from text_cache import load_pdf_folder
+from token_splitter import TokenAwareSplitter
+
+folder_path = sys.argv[1] if len(sys.argv) > 1 else "경북대학교"
+model_name = "jhgan/ko-sbert-nli"
+fetch_k = 12
+top_n = 3
+
+eval_set = load_eval_set()
+chunks = TokenAwareSplitter.from_model(model_name).split_documents(load_pdf_folder(folder_path))
+store = NumpyVectorStore.from_documents(chunks, load_embeddings(model_name))
+reranker = CrossEncoderReranker(budget_ms=None)
+
+print(f"{'질문':<28}{'벡터':>8}{'재정렬':>8}{'첫 호출(ms)':>12}{'캐시(ms)':>10}")
+totals = {"vector": 0.0, "rerank": 0.0}
+for item in eval_set:
+    docs = store.similarity_search(item["question"], k=fetch_k)
+    vector_recall = context_recall(item["reference"], "\n\n".join(d.page_content for d in docs[:top_n]))
+
+    start = time.perf_counter()
+    ranked = reranker.score(item["question"], docs)
+    cold_ms = (time.perf_counter() - start) * 1000
+    start = time.perf_counter()
+    reranker.score(item["question"], docs)
+    warm_ms = (time.perf_counter() - start) * 1000
+    rerank_recall = context_recall(item["reference"], "\n\n".join(d.page_content for d, _ in ranked[:top_n]))
+
+    totals["vector"] += vector_recall
+    totals["rerank"] += rerank_recall
+    print(f"{item['question'][:26]:<28}{vector_recall:>8.1%}{rerank_recall:>8.1%}{cold_ms:>12.1f}{warm_ms:>10.2f}")
+
+n = len(eval_set)
+print(f"\n평균 재현율: 벡터 {totals['vector'] / n:.1%} → 재정렬 {totals['rerank'] / n:.1%}")
+print(f"쌍 하나당 약 {reranker.estimate_ms(1):.1f}ms, 통계 {reranker.stats}")
@@ -0,0 +1,35 @@
+# 📊 글자 수 분할 vs 토큰 기준 분할: 임베딩 모델에서 잘려나가는 토큰 비교
+import sys
+import time
+
+from langchain.text_splitter import RecursiveCharacterTextSplitter
+
+from text_cache import load_pdf_folder
+from token_splitter import TokenAwareSplitter, truncation_report
+
+folder_path = sys.argv[1] if len(sys.argv) > 1 else "경북대학교"
+model_name = "jhgan/ko-sbert-nli"
+
+documents = load_pdf_folder(folder_path)
+print(f"📄 불러온 페이지 수: {len(documents)}개")
+
+token_splitter = TokenAwareSplitter.from_model(model_name)
+
+for chunk_size, chunk_overlap in [(1000, 100), (700, 100), (500, 100), (300, 100)]:
+    char_splitter = RecursiveCharacterTextSplitter(chunk_size=chunk_size, chunk_overlap=chunk_overlap)
+    chunks = [d.page_content for d in char_splitter.split_documents(documents)]
+    report = truncation_report(chunks, token_splitter.tokenizer, token_splitter.budget)
+    print(f"\n✂️ 글자 수 분할 [{chunk_size}, {chunk_overlap}]")
+    print(f"  - 청크 수       : {report['chunks']}")
+    print(f"  - 잘리는 청크   : {report['truncated_chunks']}")
+    print(f"  - 잘리는 토큰   : {report['truncated_tokens']} ({report['truncated_ratio']:.1%})")
+
+start = time.perf_counter()
+chunks = token_splitter.split_documents(documents)
+elapsed = time.perf_counter() - start
+report = token_splitter.last_report
+print(f"\n🧩 토큰 기준 분할 [{token_splitter.budget} 토큰, overlap {token_splitter._chunk_overlap}]")
+print(f"  - 청크 수       : {report['chunks']}")
+print(f"  - 최대 토큰 수  : {report['max_tokens']}")
+print(f"  - 잘리는 청크   : {report['truncated_chunks']}")
+print(f"  - 분할 시간     : {elapsed * 1000:.1f}ms")
@@ -0,0 +1,95 @@
+# 📊 벡터 저장소 속도 비교: NumPy 전수 검색 vs FAISS vs Chroma (경북대 데이터)
+import sys
+import time
+
+import numpy as np
+from langchain.text_splitter import RecursiveCharacterTextSplitter
+from langchain_community.vectorstores import FAISS, Chroma
+from langchain_community.embeddings import HuggingFaceEmbeddings
+from langchain_core.embeddings import Embeddings
+
+from numpy_store import NumpyVectorStore
+from text_cache import load_pdf_folder
+
+folder_path = sys.argv[1] if len(sys.argv) > 1 else "경북대학교"
+questions = [
+    "휴학은 어떻게 하나요?",
+    "복학 신청은 어디서 하나요?",
+    "수강신청 일정은 언제인가요?",
+    "성적 열람은 어디서 하나요?",
+    "학생증 발급은 어떻게 하나요?",
+    "졸업하려면 몇 학점 들어야 하나요?",
+    "등록금 납부 기간은 언제인가요?",
+    "강의평가는 언제 하나요?",
+]
+k = 4
+repeat = 50
+
+
+# ✅ 임베딩은 한 번만 계산하고, 저장소 비교에서는 캐시된 값을 돌려준다
+class CachedEmbeddings(Embeddings):
+    def __init__(self, base):
+        self.base = base
+        self.cache = {}
+
+    def embed_documents(self, texts):
+        missing = [t for t in texts if t not in self.cache]
+        if missing:
+            for t, v in zip(missing, self.base.embed_documents(missing)):
+                self.cache[t] = v
+        return [self.cache[t] for t in texts]
+
+    def embed_query(self, text):
+        return self.embed_documents([text])[0]
+
+
+def timed(fn):
+    start = time.perf_counter()
+    result = fn()
+    return result, time.perf_counter() - start
+
+
+def percentile_ms(samples, p):
+    return float(np.percentile(samples, p)) * 1000
+
+
+# 📁 PDF 로딩 및 청크 분할
+documents = load_pdf_folder(folder_path)
+chunks = RecursiveCharacterTextSplitter(chunk_size=1000, chunk_overlap=100).split_documents(documents)
+print(f"🧩 청크 수: {len(chunks)}개")
+
+embeddings = CachedEmbeddings(HuggingFaceEmbeddings(model_name="jhgan/ko-sbert-nli"))
+embeddings.embed_documents([c.page_content for c in chunks] + questions)
+
+# 🧠 저장소 생성
+stores = {}
+stores["numpy-fp32"], t = timed(lambda: NumpyVectorStore.from_documents(chunks, embeddings))
+print(f"⏱️ numpy-fp32 생성: {t * 1000:.1f}ms")
+stores["numpy-fp16"], t = timed(lambda: NumpyVectorStore.from_documents(chunks, embeddings, dtype="float16"))
+print(f"⏱️ numpy-fp16 생성: {t * 1000:.1f}ms")
+stores["faiss"], t = timed(lambda: FAISS.from_documents(chunks, embeddings))
+print(f"⏱️ faiss 생성: {t * 1000:.1f}ms")
+stores["chroma"], t = timed(lambda: Chroma.from_documents(chunks, embeddings))
+print(f"⏱️ chroma 생성: {t * 1000:.1f}ms")
+
+# 🔍 단일 질의 지연시간 + 정확 검색(numpy-fp32) 대비 top-k 일치율
+exact = {q: [d.page_content for d in stores["numpy-fp32"].similarity_search(q, k=k)] for q in questions}
+print(f"\n{'저장소':<12}{'p50(ms)':>10}{'p95(ms)':>10}{'일치율':>10}")
+for name, store in stores.items():
+    samples = []
+    overlap = []
+    for _ in range(repeat):
+        for q in questions:
+            docs, t = timed(lambda: store.similarity_search(q, k=k))
+            samples.append(t)
+    for q in questions:
+        got = [d.page_content for d in store.similarity_search(q, k=k)]
+        overlap.append(len(set(got) & set(exact[q])) / k)
+    print(f"{name:<12}{percentile_ms(samples, 50):>10.3f}{percentile_ms(samples, 95):>10.3f}{np.mean(overlap):>10.2f}")
+
+# 📦 배치 질의 (numpy 는 행렬곱 한 번)
+batch = questions * 16
+_, t = timed(lambda: stores["numpy-fp32"].similarity_search_batch(batch, k=k))
+print(f"\n📦 numpy-fp32 배치 {len(batch)}개: {t * 1000:.1f}ms ({len(batch) / t:.0f} q/s)")
+_, t = timed(lambda: [stores["faiss"].similarity_search(q, k=k) for q in batch])
+print(f"📦 faiss 순차 {len(batch)}개: {t * 1000:.1f}ms ({len(batch) / t:.0f} q/s)")
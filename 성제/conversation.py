@@ -0,0 +1,134 @@
+# 💬 대화 기억: 후속 질문을 독립 질문으로 바꾸고, 오래된 대화는 요약으로 접는다
+# 검색/프롬프트에 들어가는 대화 기록 = 요약(토큰 상한) + 최근 몇 턴(글자 수 상한)
+# 이라서 대화가 길어져도 프롬프트 크기와 지연시간이 일정하다.
+
+import logging
+import os
+import threading
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+
+from langchain_core.output_parsers import StrOutputParser
+from langchain_core.prompts import ChatPromptTemplate
+
+from adaptive_k import count_tokens
+
+logger = logging.getLogger(__name__)
+
+RECENT_TURNS = int(os.getenv("MEMORY_RECENT_TURNS", "3"))
+SUMMARY_TOKEN_CAP = int(os.getenv("MEMORY_SUMMARY_TOKENS", "300"))
+TURN_CHAR_LIMIT = 600
+
+# "그럼 신청 기간은?" 처럼 앞 대화를 가리키는 표현
+# ("또", "다른" 이나 짧은 질문은 첫 질문에도 흔해서 넣지 않는다. 바꿔쓰기는 LLM 호출이라 꼭 필요할 때만)
+_FOLLOW_UP_MARKERS = ["그럼", "그러면", "그거", "그건", "그게", "그것", "그때", "거기", "이거", "이건", "저거",
+                      "아까", "방금", "이전", "그 중", "그중", "그 다음", "그다음"]
+
+_summary_executor = ThreadPoolExecutor(max_workers=2, thread_name_prefix="memory")
+
+CONDENSE_PROMPT = ChatPromptTemplate.from_messages([
+    ("system", "이전 대화를 참고해 사용자의 마지막 질문을 그 자체로 이해되는 한 문장의 한국어 질문으로 다시 써 주세요. "
+               "답하지 말고 질문만 출력하세요.\n\n[대화 요약]\n{summary}\n\n[최근 대화]\n{recent}"),
+    ("human", "{question}"),
+])
+
+SUMMARY_PROMPT = ChatPromptTemplate.from_messages([
+    ("system", "경북대 학사 도우미와 학생의 대화를 요약합니다. 기존 요약에 새 대화를 합쳐 "
+               "학생이 무엇을 물었고 어떤 답(일정, 장소, 조건 등 핵심 사실)을 받았는지 {cap} 토큰 이내로 요약하세요."),
+    ("human", "[기존 요약]\n{summary}\n\n[새 대화]\n{turns}"),
+])
+
+
+# 앞 대화가 있고, 질문에 앞 대화를 가리키는 표현이 있을 때만 바꿔쓴다
+def needs_context(question, has_history=True):
+    question = question.strip()
+    return has_history and any(marker in question for marker in _FOLLOW_UP_MARKERS)
+
+
+def _clip(text, limit=TURN_CHAR_LIMIT):
+    return text if len(text) <= limit else text[:limit].rstrip() + " …"
+
+
+def _format_turns(turns):
+    return "\n".join(f"학생: {q}\n도우미: {_clip(a)}" for q, a in turns)
+
+
+def _cap_tokens(text, cap):
+    while text and count_tokens(text) > cap:
+        text = text[:int(len(text) * 0.9)]
+    return text
+
+
+class ConversationMemory:
+    # meter: usage_meter.UsageMeter (바꿔쓰기/요약 호출도 세션 사용량에 넣고, 예산 "stop" 이면 LLM 을 부르지 않는다)
+    def __init__(self, llm, recent_turns=RECENT_TURNS, summary_token_cap=SUMMARY_TOKEN_CAP, meter=None,
+                 session=None):
+        self.recent_turns = recent_turns
+        self.summary_token_cap = summary_token_cap
+        self.meter = meter
+        self.session = session
+        self.summary = ""
+        self.turns = deque()
+        self._condense = CONDENSE_PROMPT | llm | StrOutputParser()
+        self._summarize = SUMMARY_PROMPT | llm | StrOutputParser()
+        self._lock = threading.Lock()
+        self._pending = None
+
+    def _budget_ok(self):
+        return self.meter is None or self.meter.check(session=self.session) != "stop"
+
+    # LLM 체인 호출 + 사용량 기록 (실패해도 쓴 만큼은 기록)
+    def _invoke(self, chain, inputs, question):
+        if self.meter is None:
+            return chain.invoke(inputs)
+        collector = self.meter.collector()
+        try:
+            return chain.invoke(inputs, config={"callbacks": [collector]})
+        finally:
+            self.meter.record(collector.usage(), session=self.session, question=question)
+
+    # ✅ 검색에 쓸 독립 질문. 첫 질문이거나 앞 대화와 무관해 보이면 그대로
+    def condense(self, question, use_llm=True):
+        if not needs_context(question, has_history=bool(self.turns)):
+            return question
+        if use_llm and self._budget_ok():
+            try:
+                standalone = self._invoke(self._condense, {"summary": self.summary or "(없음)",
+                                                           "recent": _format_turns(self.turns),
+                                                           "question": question}, question).strip()
+                if standalone:
+                    logger.info("condensed %r → %r", question, standalone)
+                    return standalone
+            except Exception as e:
+                logger.warning("condense failed: %s", e)
+        # LLM 없이: 직전 질문을 앞에 붙여 검색
+        return f"{self.turns[-1][0]} {question}"
+
+    # ✅ 답변이 끝난 뒤 기록. 최근 창을 넘친 턴은 백그라운드에서 요약에 합친다
+    def add(self, question, answer):
+        with self._lock:
+            self.turns.append((question, answer))
+            overflow = []
+            while len(self.turns) > self.recent_turns:
+                overflow.append(self.turns.popleft())
+            if overflow:
+                previous = self._pending
+                self._pending = _summary_executor.submit(self._fold, overflow, previous)
+
+    def _fold(self, overflow, previous):
+        # 요약은 순서대로 합쳐야 하므로 이전 요약 작업이 끝날 때까지 기다린다
+        if previous is not None:
+            previous.result()
+        try:
+            if not self._budget_ok():
+                raise RuntimeError("usage budget stop")
+            summary = self._invoke(self._summarize, {"summary": self.summary or "(없음)",
+                                                     "turns": _format_turns(overflow),
+                                                     "cap": self.summary_token_cap}, None)
+        except Exception as e:
+            logger.warning("summary failed, keeping clipped turns: %s", e)
+            summary = (self.summary + "\n" + _format_turns(overflow)).strip()
+        self.summary = _cap_tokens(summary.strip(), self.summary_token_cap)
+
+    def prompt_tokens(self):
+        return count_tokens(self.summary) + count_tokens(_format_turns(self.turns)) if self.turns else 0
@@ -0,0 +1,123 @@
+# ⏱️ 응답 시간 예산(deadline) 안에서 답변하기
+# 검색은 수 ms 안에 끝나므로, LLM 생성이 예산을 넘기면 기다리지 않고
+# 검색된 문단과 출처만으로 답변한다. 검색 전용 모드(LLM 호출 없음)도 제공.
+
+import logging
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor, TimeoutError
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_BUDGET_S = float(os.getenv("ANSWER_BUDGET_S", "15"))
+
+# 생성 호출은 이 풀에서 실행하고, 시간이 지나면 결과를 버린다
+_executor = ThreadPoolExecutor(max_workers=int(os.getenv("GENERATION_WORKERS", "8")),
+                               thread_name_prefix="generation")
+
+
+def format_docs(docs):
+    return "\n\n".join(d.page_content for d in docs)
+
+
+def format_source(doc):
+    source = os.path.basename(str(doc.metadata.get("source", "문서")))
+    page = doc.metadata.get("page")
+    return f"{source} (p.{page + 1})" if isinstance(page, int) else source
+
+
+# ✅ 검색 결과만으로 만드는 답변 (상위 문단 + 출처)
+def format_retrieval_only(docs, note="", top_n=3, max_chars=400):
+    if not docs:
+        return (note + "\n\n" if note else "") + "🔎 관련 문서를 찾지 못했어요. 질문을 조금 바꿔서 다시 물어봐 주세요."
+    lines = [note] if note else []
+    lines.append("🔎 관련 문서에서 찾은 내용입니다:")
+    for i, doc in enumerate(docs[:top_n], 1):
+        text = doc.page_content.strip()
+        if len(text) > max_chars:
+            text = text[:max_chars].rstrip() + " …"
+        lines.append(f"**{i}. 📄 {format_source(doc)}**\n\n{text}")
+    return "\n\n".join(lines)
+
+
+class DeadlineRAG:
+    # meter: usage_meter.UsageMeter (토큰/비용 기록 + 예산 확인), downgrade_chain: 예산 초과 시 쓸 더 싼 모델 체인
+    def __init__(self, retriever, generate_chain, budget_s=DEFAULT_BUDGET_S, top_n=3, meter=None,
+                 downgrade_chain=None):
+        self.retriever = retriever
+        self.generate_chain = generate_chain
+        self.budget_s = budget_s
+        self.top_n = top_n
+        self.meter = meter
+        self.downgrade_chain = downgrade_chain
+
+    # vector: 호출한 쪽에서 이미 만든 질문 임베딩 (예: 질문 캐시 조회용). 검색기가 받을 수 있으면 다시 임베딩하지 않는다
+    def search(self, question, vector=None):
+        if vector is not None and hasattr(self.retriever, "search_with_vector"):
+            return self.retriever.search_with_vector(question, vector)
+        return self.retriever.invoke(question)
+
+    # ✅ 결과 dict: answer / docs / fallback(검색 전용 여부) / timings(ms) / usage(토큰·비용, LLM 호출 시)
+    # callbacks: 생성 호출에 붙일 LangChain 콜백 (예: 부하 테스트의 첫 토큰 시간 측정)
+    def answer(self, question, mode="rag", budget_s=None, session=None, run=None, callbacks=None, vector=None):
+        budget_s = self.budget_s if budget_s is None else budget_s
+        start = time.monotonic()
+        docs = self.search(question, vector=vector)
+        timings = {"retrieval_ms": (time.monotonic() - start) * 1000}
+
+        if mode == "search":
+            return {"answer": format_retrieval_only(docs, top_n=self.top_n), "docs": docs,
+                    "fallback": True, "timings": timings, "usage": None}
+
+        remaining = budget_s - (time.monotonic() - start)
+        note, usage = "", None
+        chain, budget = self.generate_chain, "ok"
+        if self.meter is not None:
+            from usage_meter import current_run
+            run = run if run is not None else current_run()
+            budget = self.meter.check(session=session, run=run)
+            if budget == "downgrade":
+                chain = self.downgrade_chain
+        if remaining <= 0:
+            note = "⏱️ 검색이 오래 걸려 검색 결과만 보여드려요."
+        elif chain is None or budget == "stop":
+            note = "💸 사용량 예산을 넘어 검색 결과만 보여드려요."
+        else:
+            context = format_docs(docs)
+            collector, config = None, {"callbacks": list(callbacks or [])}
+            if self.meter is not None:
+                collector = self.meter.collector()
+                config["callbacks"].append(collector)
+
+            def record(_future=None):
+                if collector is None:
+                    return None
+                return self.meter.record(collector.usage(context), session=session, run=run, question=question)
+
+            # docs 는 문단 단위로 프롬프트를 구성하는 체인용 (prompt_cache.CachedPromptChain)
+            future = _executor.submit(chain.invoke, {"context": context, "input": question, "docs": docs}, config)
+            gen_start = time.monotonic()
+            try:
+                result = future.result(timeout=remaining)
+                timings["generation_ms"] = (time.monotonic() - gen_start) * 1000
+                return {"answer": result, "docs": docs, "fallback": False, "timings": timings,
+                        "usage": record(), "budget": budget}
+            except TimeoutError:
+                # 실행 중인 스레드는 강제로 멈출 수 없으므로 LLM 클라이언트 timeout 으로 정리되게 둔다
+                # (끝나면 그때 쓴 토큰을 기록)
+                if not future.cancel():
+                    future.add_done_callback(record)
+                note = "⏱️ 답변 생성이 지연되어 우선 검색 결과를 보여드려요."
+                logger.warning("generation missed deadline (%.1fs): %s", budget_s, question)
+            except Exception as e:
+                note = "⚠️ 답변 생성 중 오류가 발생해 검색 결과를 보여드려요."
+                logger.warning("generation failed: %s", e)
+                usage = record()
+            timings["generation_ms"] = (time.monotonic() - gen_start) * 1000
+
+        return {"answer": format_retrieval_only(docs, note=note, top_n=self.top_n), "docs": docs,
+                "fallback": True, "timings": timings, "usage": usage, "budget": budget}
+
+    # 기존 rag_chain.invoke(q) 호출부와 호환
+    def invoke(self, question, mode="rag"):
+        return self.answer(question, mode=mode)["answer"]
@@ -0,0 +1,154 @@
+# 📈 저장된 평가 실행(eval_store.py)으로 비교 표/그래프 만들기 + 회귀 확인
+# 정민/Untitled22.ipynb 처럼 F1 을 손으로 옮겨 적지 않고 DB 에서 바로 그린다 (같은 색/축 범위).
+#
+# 예) python eval_report.py import                       # "test 파일" 옛 기록 옮기기 (한 번)
+#     python eval_report.py list
+#     python eval_report.py table 2 3 4 --system "RAG 기반 Claude"
+#     python eval_report.py chart 4 --out claude_vs_rag.png                         # 한 실행의 일반 vs RAG
+#     python eval_report.py chart 2 3 4 --system "RAG 기반 Claude" --out chunk.png  # 실행끼리 질문별 비교
+#     python eval_report.py check "Claude test 파일 [500, 100]" 7 --system "RAG 기반 Claude"
+
+import argparse
+import sys
+import time
+
+from eval_store import F1_DROP, LATENCY_RISE, EvalStore, import_text_results
+
+# 노트북과 같은 색 (회색, 연파랑) 다음부터는 진한 색
+COLORS = ["#d0d0d0", "#a5d8ff", "#ffc9c9", "#b2f2bb", "#ffec99", "#d0bfff"]
+FONTS = ["Malgun Gothic", "AppleGothic", "NanumGothic", "DejaVu Sans"]
+
+
+def _fmt(value, spec):
+    return "-" if value is None else format(value, spec)
+
+
+# ✅ 그릴 계열: (라벨, run id, system). 실행 하나면 그 실행의 시스템 전부, 여러 개면 --system 하나로 실행끼리
+def series(store, keys, system=None):
+    runs = [store.find_run(key) for key in keys]
+    if len(runs) == 1 and system is None:
+        return [(name, runs[0]["id"], name) for name in store.systems(runs[0]["id"])]
+    out = []
+    for run in runs:
+        for name in ([system] if system else store.systems(run["id"])):
+            label = run["name"] if system or len(store.systems(run["id"])) == 1 else f"{run['name']} · {name}"
+            out.append((label, run["id"], name))
+    return out
+
+
+def print_runs(store):
+    print(f"{'id':>4}  {'날짜':<18}{'git':<14}{'시스템':<22}{'질문':>4}{'F1':>8}{'p95(ms)':>9}  이름")
+    for run in store.runs():
+        when = time.strftime("%Y-%m-%d %H:%M", time.localtime(run["created_at"]))
+        for system in store.systems(run["id"]):
+            s = store.summary(run["id"], system)
+            print(f"{run['id']:>4}  {when:<18}{run['git_rev'] or '-':<14}{system:<22}{s['questions']:>4}"
+                  f"{_fmt(s['f1'], '.4f'):>8}{_fmt(s['latency_p95_ms'], '.0f'):>9}  {run['name']}")
+
+
+# ✅ 계열별 요약 표 + 질문별 F1 표
+def print_table(store, rows):
+    print(f"{'계열':<36}{'질문':>4}{'P':>8}{'R':>8}{'F1':>8}{'재현율':>8}{'p50':>8}{'p95':>8}{'토큰':>8}{'비용$':>9}")
+    for label, run_id, system in rows:
+        s = store.summary(run_id, system)
+        print(f"{label[:34]:<36}{s['questions']:>4}{_fmt(s['precision'], '.4f'):>8}{_fmt(s['recall'], '.4f'):>8}"
+              f"{_fmt(s['f1'], '.4f'):>8}{_fmt(s['context_recall'], '.1%'):>8}"
+              f"{_fmt(s['latency_p50_ms'], '.0f'):>8}{_fmt(s['latency_p95_ms'], '.0f'):>8}"
+              f"{s['input_tokens'] + s['output_tokens']:>8}{s['cost_usd']:>9.4f}")
+
+    questions, scores = question_scores(store, rows)
+    print("\n질문별 F1")
+    for question in questions:
+        cells = "".join(f"{_fmt(scores[label].get(question), '.4f'):>10}" for label, _, _ in rows)
+        print(f"  {question[:30]:<32}{cells}")
+
+
+def question_scores(store, rows):
+    questions, scores = [], {}
+    for label, run_id, system in rows:
+        scores[label] = {}
+        for r in store.results(run_id, system):
+            scores[label][r["question"]] = r["f1"]
+            if r["question"] not in questions:
+                questions.append(r["question"])
+    return questions, scores
+
+
+# ✅ 질문별 가로 막대 (노트북 F1_score_comparison_ppt_style 과 같은 모양)
+def draw_chart(store, rows, out, title=None, xlim=(0.80, 1.00)):
+    import matplotlib
+
+    matplotlib.use("Agg")
+    import matplotlib.pyplot as plt
+
+    plt.rcParams["font.family"] = FONTS
+    plt.rcParams["axes.unicode_minus"] = False
+
+    questions, scores = question_scores(store, rows)
+    height = 0.8 / len(rows)
+    plt.figure(figsize=(10, max(6, len(questions) * len(rows) * 0.3)))
+    for i, (label, _, _) in enumerate(rows):
+        # 첫 계열이 위로 오게
+        offset = (len(rows) - 1) / 2 - i
+        values = [scores[label].get(q) for q in questions]
+        y = [j + offset * height for j, v in enumerate(values) if v is not None]
+        plt.barh(y, [v for v in values if v is not None], height=height, color=COLORS[i % len(COLORS)], label=label)
+
+    plt.yticks(ticks=range(len(questions)), labels=questions, fontsize=11)
+    plt.xlabel("BERTScore (F1)", fontsize=12)
+    plt.title(title or " vs ".join(label for label, _, _ in rows) + " 응답 성능 비교 (F1 기준)", fontsize=14)
+    plt.grid(axis="x", linestyle="--", alpha=0.5)
+    plt.xlim(*xlim)
+    plt.legend()
+    plt.tight_layout()
+    plt.savefig(out, dpi=150)
+    plt.close()
+    print(f"🖼️ {out}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="평가 결과 표/그래프/회귀 확인")
+    parser.add_argument("--db", default=None, help="결과 DB 경로 (기본 EVAL_DB)")
+    commands = parser.add_subparsers(dest="command", required=True)
+    commands.add_parser("import", help='"test 파일" 옛 기록 옮기기')
+    commands.add_parser("list", help="저장된 실행 목록")
+    for name in ("table", "chart"):
+        command = commands.add_parser(name)
+        command.add_argument("runs", nargs="+", help="실행 이름 또는 id")
+        command.add_argument("--system", default=None)
+        if name == "chart":
+            command.add_argument("--out", default="F1_score_comparison.png")
+            command.add_argument("--title", default=None)
+            command.add_argument("--xmin", type=float, default=0.80)
+    check = commands.add_parser("check", help="기준 대비 회귀 확인 (회귀면 종료 코드 1)")
+    check.add_argument("baseline")
+    check.add_argument("candidate")
+    check.add_argument("--system", default="RAG 기반 Claude")
+    check.add_argument("--f1-drop", type=float, default=F1_DROP)
+    check.add_argument("--latency-rise", type=float, default=LATENCY_RISE)
+    args = parser.parse_args()
+
+    store = EvalStore(args.db) if args.db else EvalStore()
+    if args.command == "import":
+        for run_id, name in import_text_results(store):
+            print(f"#{run_id} {name}")
+    elif args.command == "list":
+        print_runs(store)
+    elif args.command == "table":
+        print_table(store, series(store, args.runs, args.system))
+    elif args.command == "chart":
+        draw_chart(store, series(store, args.runs, args.system), args.out, args.title, (args.xmin, 1.00))
+    elif args.command == "check":
+        baseline, candidate = store.find_run(args.baseline), store.find_run(args.candidate)
+        result = store.check_regression(baseline["id"], candidate["id"], args.system, f1_drop=args.f1_drop,
+                                        latency_rise=args.latency_rise)
+        print(f"#{baseline['id']} {baseline['name']} → #{candidate['id']} {candidate['name']} "
+              f"(공통 질문 {result['questions']}개): {'통과 ✅' if result['ok'] else '회귀 ⚠️'}")
+        for problem in result["problems"]:
+            print(f"  - {problem}")
+        if not result["ok"]:
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
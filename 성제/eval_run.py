@@ -0,0 +1,96 @@
+# 🧪 평가 실행: 평가 세트 질문을 파이프라인(load_test.build_pipeline, rag.py 와 같은 구성)으로 답하고
+# 질문별 BERTScore(모범 답변 기준)·검색 재현율·지연시간·토큰/비용을 결과 저장소(eval_store.py)에 기록한다.
+# --baseline 을 주면 끝나고 기준 실행과 비교해 회귀가 있으면 종료 코드 1 (설정 바꾸기 전 확인용)
+#
+# 예) python eval_run.py --name "chunk 500 / k 적응형" --corpus 경북대학교
+#     python eval_run.py --name "prompt cache 끔" --baseline "Claude test 파일 [500, 100]"
+#     python eval_run.py --name smoke --corpus eval --fake-embeddings --fake-llm --no-bertscore
+
+import argparse
+import logging
+import os
+import sys
+import time
+
+from deadline import format_docs
+from eval_set import context_recall, load_eval_set
+from eval_store import F1_DROP, LATENCY_RISE, EvalStore
+from load_test import EMBEDDING_MODEL, add_pipeline_args, build_pipeline
+from usage_meter import UsageMeter
+
+logger = logging.getLogger(__name__)
+
+BERT_SCORE_MODEL = "xlm-roberta-large"
+# 실행 설정과 함께 남길 환경 변수 (답변 품질/지연시간에 영향을 주는 것들)
+CONFIG_ENV = ["PROMPT_CACHE", "COMPACT_DOCSTORE", "COMPACT_DOCSTORE_ZSTD", "ANSWER_BUDGET_S", "GENERATION_WORKERS"]
+
+
+# ✅ test_claude.py 와 같은 설정(xlm-roberta-large, lang="ko")으로 한 번에 채점
+def bert_scores(answers, references):
+    from bert_score import score as bert_score
+
+    P, R, F1 = bert_score(answers, references, lang="ko", model_type=BERT_SCORE_MODEL)
+    return [{"precision": float(p), "recall": float(r), "f1": float(f)} for p, r, f in zip(P, R, F1)]
+
+
+def run_config(args):
+    config = {key: value for key, value in vars(args).items()
+              if key not in ("name", "db", "baseline", "system", "no_bertscore")}
+    config["embedding_model"] = "fake" if args.fake_embeddings else EMBEDDING_MODEL
+    config["model"] = "claude-3-haiku-20240307" if args.real_llm else "fake-chat"
+    config["bert_score_model"] = None if args.no_bertscore else BERT_SCORE_MODEL
+    config["env"] = {key: os.environ[key] for key in CONFIG_ENV if key in os.environ}
+    return config
+
+
+def main():
+    parser = argparse.ArgumentParser(description="평가 실행 → 결과 저장소")
+    parser.add_argument("--name", required=True, help="실행 이름 (표/그래프 라벨)")
+    parser.add_argument("--db", default=None, help="결과 DB 경로 (기본 EVAL_DB)")
+    parser.add_argument("--system", default="RAG 기반 Claude", help="결과 라벨 (옛 기록과 비교하려면 같은 라벨)")
+    parser.add_argument("--baseline", default=None, help="비교할 기준 실행 (이름 또는 id)")
+    parser.add_argument("--no-bertscore", action="store_true", help="BERTScore 없이 검색 재현율/지연시간만")
+    add_pipeline_args(parser, corpus="경북대학교", real_llm=True)
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.WARNING, format="%(message)s")
+    store = EvalStore(args.db) if args.db else EvalStore()
+    baseline = store.find_run(args.baseline) if args.baseline else None
+    eval_set = load_eval_set()
+    # 평가 스윕도 USAGE_BUDGET_RUN_USD 로 막을 수 있게 환경 변수 예산을 쓴다 (run=실행 이름으로 집계)
+    rag, _, _ = build_pipeline(args, meter=UsageMeter())
+
+    run_id = store.start_run(args.name, run_config(args))
+    rows = []
+    for item in eval_set:
+        started = time.perf_counter()
+        result = rag.answer(item["question"], run=args.name)
+        latency_ms = (time.perf_counter() - started) * 1000
+        rows.append({"question": item["question"], "reference": item["reference"], "answer": result["answer"],
+                     "context_recall": context_recall(item["reference"], format_docs(result["docs"])),
+                     "latency_ms": latency_ms, "fallback": result["fallback"], "usage": result.get("usage")})
+        print(f"  {latency_ms:8.0f}ms  {item['question']}")
+
+    scores = [{}] * len(rows) if args.no_bertscore else bert_scores([r["answer"] for r in rows],
+                                                                     [r["reference"] for r in rows])
+    for row, score in zip(rows, scores):
+        store.add_result(run_id, row.pop("question"), args.system, **row, **score)
+
+    summary = store.summary(run_id, args.system)
+    f1 = f"{summary['f1']:.4f}" if summary["f1"] is not None else "-"
+    print(f"\n실행 #{run_id} {args.name}: 질문 {summary['questions']}개, F1 {f1}, "
+          f"검색 재현율 {summary['context_recall']:.1%}, p95 {summary['latency_p95_ms']:.0f}ms, "
+          f"비용 ${summary['cost_usd']:.4f}")
+
+    if baseline is not None:
+        check = store.check_regression(baseline["id"], run_id, args.system, f1_drop=F1_DROP,
+                                       latency_rise=LATENCY_RISE)
+        print(f"기준 #{baseline['id']} {baseline['name']} 대비: {'통과 ✅' if check['ok'] else '회귀 ⚠️'}")
+        for problem in check["problems"]:
+            print(f"  - {problem}")
+        if not check["ok"]:
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,52 @@
+# 🧪 평가 세트: "test 파일/*/*.txt" (1줄: 질문, "## 답지 ##" 다음부터 "📢" 전까지: 모범 답변)
+import glob
+import os
+import re
+
+EVAL_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "test 파일")
+
+# 챗봇 화면의 자주 묻는 질문 버튼 (rag.py)
+FAQ_QUESTIONS = ["휴학은 어떻게 하나요?", "복학 신청은 어디서 하나요?", "수강신청 일정은 언제인가요?",
+                 "성적 열람은 어디서 하나요?", "학생증 발급은 어떻게 하나요?"]
+
+
+def _parse(path):
+    with open(path, encoding="utf-8") as f:
+        text = f.read()
+    if "## 답지 ##" not in text:
+        return None
+    first = text.splitlines()[0]
+    if "## 답지 ##" in first:
+        # 질문 줄 없이 답지부터 시작하는 파일은 파일명이 질문
+        first = os.path.splitext(os.path.basename(path))[0]
+    question = re.sub(r"^\s*\d+\.\s*", "", first).strip()
+    reference = text.split("## 답지 ##", 1)[1].split("📢", 1)[0].strip()
+    if not question or not reference:
+        return None
+    return {"question": question, "reference": reference, "path": path}
+
+
+# ✅ 같은 질문은 한 번만 (폴더마다 같은 질문을 다른 설정으로 돌린 기록이라서)
+def load_eval_set(root=EVAL_DIR):
+    items = {}
+    for path in sorted(glob.glob(os.path.join(root, "*", "*.txt"))):
+        item = _parse(path)
+        if item and item["question"] not in items:
+            items[item["question"]] = item
+    return list(items.values())
+
+
+# 모범 답변의 글자 bigram 중 검색 문맥에 들어 있는 비율 (검색 재현율 근사)
+def _bigrams(text):
+    text = re.sub(r"\s+", "", text)
+    return {text[i:i + 2] for i in range(len(text) - 1)}
+
+
+def context_recall(reference, context):
+    ref = _bigrams(reference)
+    return len(ref & _bigrams(context)) / len(ref) if ref else 0.0
+
+
+# ✅ 부하 테스트용 질문 목록: 자주 묻는 질문은 faq_weight 배로 더 자주 (실제 버튼 클릭 비중 흉내)
+def question_mix(faq_weight=3, root=EVAL_DIR):
+    return FAQ_QUESTIONS * faq_weight + [item["question"] for item in load_eval_set(root)]
@@ -0,0 +1,287 @@
+# 🗃️ 평가 결과 저장소 (SQLite)
+# 평가 실행(run)마다 설정(config)·git 리비전과 질문별 점수(BERTScore P/R/F1, 검색 재현율)·지연시간·토큰을 저장한다.
+# 비교 표/그래프(eval_report.py)는 여기 저장된 실행에서 바로 만들고,
+# check_regression 으로 기준(baseline) 실행보다 품질이 떨어지거나 느려진 설정을 잡아낸다.
+# 예전 기록("test 파일/*/*.txt" 터미널 출력 복사본)은 import_text_results 로 옮겨 온다.
+
+import glob
+import json
+import os
+import re
+import sqlite3
+import subprocess
+import threading
+import time
+
+import numpy as np
+
+from eval_set import EVAL_DIR, _parse
+
+EVAL_DB = os.getenv("EVAL_DB", os.path.join(os.path.dirname(os.path.abspath(__file__)), "eval_results.sqlite3"))
+
+# 기준 대비 허용 범위: 평균 F1 이 이만큼 넘게 떨어지거나, p95 지연시간이 이 배수를 넘으면 회귀
+F1_DROP = float(os.getenv("EVAL_F1_DROP", "0.01"))
+LATENCY_RISE = float(os.getenv("EVAL_LATENCY_RISE", "1.2"))
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS runs (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    name TEXT NOT NULL,
+    created_at REAL NOT NULL,
+    git_rev TEXT,
+    config TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS results (
+    run_id INTEGER NOT NULL REFERENCES runs(id) ON DELETE CASCADE,
+    question TEXT NOT NULL,
+    system TEXT NOT NULL,
+    answer TEXT,
+    reference TEXT,
+    precision REAL,
+    recall REAL,
+    f1 REAL,
+    context_recall REAL,
+    latency_ms REAL,
+    input_tokens INTEGER,
+    output_tokens INTEGER,
+    cost_usd REAL,
+    fallback INTEGER
+);
+CREATE INDEX IF NOT EXISTS results_run ON results(run_id, system);
+"""
+
+_COLUMNS = ["answer", "reference", "precision", "recall", "f1", "context_recall", "latency_ms",
+            "input_tokens", "output_tokens", "cost_usd", "fallback"]
+
+
+# ✅ 지금 작업 트리의 git 리비전 (커밋 안 된 변경이 있으면 -dirty)
+def git_revision(cwd=None):
+    cwd = cwd or os.path.dirname(os.path.abspath(__file__))
+    try:
+        rev = subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=cwd, capture_output=True,
+                             text=True, timeout=5, check=True).stdout.strip()
+        dirty = subprocess.run(["git", "status", "--porcelain", "--untracked-files=no"], cwd=cwd,
+                               capture_output=True, text=True, timeout=5).stdout.strip()
+    except (OSError, subprocess.SubprocessError):
+        return None
+    return rev + ("-dirty" if dirty else "")
+
+
+def _p95(values):
+    values = [v for v in values if v is not None]
+    return float(np.percentile(values, 95)) if values else None
+
+
+def _mean(values):
+    values = [v for v in values if v is not None]
+    return float(np.mean(values)) if values else None
+
+
+class EvalStore:
+    def __init__(self, path=EVAL_DB):
+        self.path = path
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.row_factory = sqlite3.Row
+        self._conn.execute("PRAGMA foreign_keys = ON")
+        self._conn.executescript(_SCHEMA)
+
+    def close(self):
+        self._conn.close()
+
+    # ✅ 실행 하나 시작 → run id. created_at/git_rev 를 주면 그대로(옛 기록 옮길 때)
+    def start_run(self, name, config, git_rev="auto", created_at=None):
+        git_rev = git_revision() if git_rev == "auto" else git_rev
+        with self._lock, self._conn:
+            cursor = self._conn.execute(
+                "INSERT INTO runs (name, created_at, git_rev, config) VALUES (?, ?, ?, ?)",
+                (name, created_at or time.time(), git_rev, json.dumps(config, ensure_ascii=False, sort_keys=True)))
+        return cursor.lastrowid
+
+    # usage: usage_meter.UsageCollector.usage() 결과를 그대로 넘겨도 된다
+    def add_result(self, run_id, question, system, usage=None, **scores):
+        unknown = set(scores) - set(_COLUMNS)
+        if unknown:
+            raise ValueError(f"unknown result fields: {sorted(unknown)}")
+        if usage:
+            for key in ("input_tokens", "output_tokens", "cost_usd"):
+                scores.setdefault(key, usage.get(key))
+        if "fallback" in scores and scores["fallback"] is not None:
+            scores["fallback"] = int(bool(scores["fallback"]))
+        values = [scores.get(column) for column in _COLUMNS]
+        with self._lock, self._conn:
+            self._conn.execute(
+                f"INSERT INTO results (run_id, question, system, {', '.join(_COLUMNS)}) "
+                f"VALUES (?, ?, ?, {', '.join('?' * len(_COLUMNS))})", [run_id, question, system, *values])
+
+    def delete_run(self, run_id):
+        with self._lock, self._conn:
+            self._conn.execute("DELETE FROM runs WHERE id = ?", (run_id,))
+
+    def runs(self):
+        with self._lock:
+            rows = self._conn.execute("SELECT * FROM runs ORDER BY id").fetchall()
+        return [{**dict(row), "config": json.loads(row["config"])} for row in rows]
+
+    # 이름 또는 id 로 실행 찾기 (같은 이름이면 가장 최근 것)
+    def find_run(self, key):
+        with self._lock:
+            if str(key).isdigit():
+                row = self._conn.execute("SELECT * FROM runs WHERE id = ?", (int(key),)).fetchone()
+            else:
+                row = self._conn.execute("SELECT * FROM runs WHERE name = ? ORDER BY id DESC LIMIT 1",
+                                         (key,)).fetchone()
+        if row is None:
+            raise KeyError(f"no evaluation run {key!r}")
+        return {**dict(row), "config": json.loads(row["config"])}
+
+    def results(self, run_id, system=None):
+        query, params = "SELECT * FROM results WHERE run_id = ?", [run_id]
+        if system is not None:
+            query += " AND system = ?"
+            params.append(system)
+        with self._lock:
+            rows = self._conn.execute(query + " ORDER BY rowid", params).fetchall()
+        return [dict(row) for row in rows]
+
+    def systems(self, run_id):
+        with self._lock:
+            rows = self._conn.execute("SELECT DISTINCT system FROM results WHERE run_id = ? ORDER BY rowid",
+                                      (run_id,)).fetchall()
+        return [row["system"] for row in rows]
+
+    # ✅ 실행 × 시스템별 요약: 질문 수, 평균 P/R/F1, 검색 재현율, 지연시간 p50/p95, 토큰/비용 합계
+    def summary(self, run_id, system=None):
+        rows = self.results(run_id, system)
+        latencies = [r["latency_ms"] for r in rows if r["latency_ms"] is not None]
+        return {
+            "questions": len(rows),
+            "precision": _mean([r["precision"] for r in rows]),
+            "recall": _mean([r["recall"] for r in rows]),
+            "f1": _mean([r["f1"] for r in rows]),
+            "context_recall": _mean([r["context_recall"] for r in rows]),
+            "latency_p50_ms": float(np.percentile(latencies, 50)) if latencies else None,
+            "latency_p95_ms": _p95(latencies),
+            "input_tokens": sum(r["input_tokens"] or 0 for r in rows),
+            "output_tokens": sum(r["output_tokens"] or 0 for r in rows),
+            "cost_usd": sum(r["cost_usd"] or 0.0 for r in rows),
+            "fallback_ratio": _mean([r["fallback"] for r in rows]),
+        }
+
+    # ✅ 두 실행을 같은 질문끼리 비교 (한쪽에만 있는 질문은 빼고)
+    def compare(self, baseline_id, candidate_id, system):
+        base = {r["question"]: r for r in self.results(baseline_id, system)}
+        cand = {r["question"]: r for r in self.results(candidate_id, system)}
+        questions = [q for q in base if q in cand]
+        rows = []
+        for question in questions:
+            b, c = base[question], cand[question]
+            rows.append({
+                "question": question,
+                "baseline_f1": b["f1"], "candidate_f1": c["f1"],
+                "delta_f1": c["f1"] - b["f1"] if b["f1"] is not None and c["f1"] is not None else None,
+                "baseline_latency_ms": b["latency_ms"], "candidate_latency_ms": c["latency_ms"],
+            })
+        return rows
+
+    # ✅ 회귀 확인: 평균 F1 이 f1_drop 넘게 떨어지거나 p95 지연시간이 latency_rise 배를 넘으면 문제 목록에 추가
+    # (지연시간이 없는 옛 기록끼리는 품질만 본다)
+    def check_regression(self, baseline_id, candidate_id, system, f1_drop=F1_DROP, latency_rise=LATENCY_RISE,
+                         question_drop=None):
+        rows = self.compare(baseline_id, candidate_id, system)
+        problems = []
+        if not rows:
+            return {"ok": False, "questions": 0, "problems": [f"공통 질문이 없음 (system={system})"], "rows": rows}
+
+        base_f1 = _mean([r["baseline_f1"] for r in rows])
+        cand_f1 = _mean([r["candidate_f1"] for r in rows])
+        if base_f1 is not None and cand_f1 is not None and base_f1 - cand_f1 > f1_drop:
+            problems.append(f"평균 F1 {base_f1:.4f} → {cand_f1:.4f} ({cand_f1 - base_f1:+.4f}, 허용 -{f1_drop})")
+
+        base_p95 = _p95([r["baseline_latency_ms"] for r in rows])
+        cand_p95 = _p95([r["candidate_latency_ms"] for r in rows])
+        if base_p95 and cand_p95 is not None and cand_p95 > base_p95 * latency_rise:
+            problems.append(f"p95 지연시간 {base_p95:.0f}ms → {cand_p95:.0f}ms (허용 ×{latency_rise})")
+
+        # 질문 하나가 크게 떨어진 경우 (평균에 묻히지 않게)
+        question_drop = f1_drop * 3 if question_drop is None else question_drop
+        for r in rows:
+            if r["delta_f1"] is not None and -r["delta_f1"] > question_drop:
+                problems.append(f"질문 F1 {r['baseline_f1']:.4f} → {r['candidate_f1']:.4f}: {r['question']}")
+
+        return {"ok": not problems, "questions": len(rows), "baseline_f1": base_f1, "candidate_f1": cand_f1,
+                "baseline_p95_ms": base_p95, "candidate_p95_ms": cand_p95, "problems": problems, "rows": rows}
+
+
+# ---------------------------------------------------------------------------
+# 예전 기록 옮기기: "test 파일/<설정 폴더>/<질문>.txt"
+# 폴더 이름에서 제공자와 [chunk_size, chunk_overlap], 파일에서 응답과 BERTScore 를 읽는다.
+
+# 폴더별로 바뀐 설정 (# 임베딩 모델 ... .txt 요약 파일 기준)
+_FOLDER_CONFIG = {
+    "Claude": {"provider": "anthropic", "model": "claude-3-haiku-20240307",
+               "embedding_model": "jhgan/ko-sroberta-multitask"},
+    "Openai": {"provider": "openai", "model": "gpt-3.5-turbo", "embedding_model": "text-embedding-3-small"},
+    "모델 변경": {"embedding_model": "snunlp/KR-SBERT-V40K-klueNLI-augSTS"},
+}
+
+_ANSWER_LABELS = {"RAG 응답": "rag", "일반 Claude 응답": "plain", "GPT 단독 응답": "plain"}
+_ANSWER_RE = re.compile(r"^(?:📢|✅) \[(?P<label>[^\]]+)\]:\s*\n(?P<text>.*?)(?=^(?:📢|✅|📊|🧠|📘)|\Z)",
+                        re.M | re.S)
+_SCORE_RE = re.compile(r"(?:🧠 (?P<label>.+?) 응답:\s*\n)?\s*-?\s*Precision\s*:\s*(?P<p>[\d.]+)\s*\n"
+                       r"\s*-?\s*Recall\s*:\s*(?P<r>[\d.]+)\s*\n\s*-?\s*F1(?: Score)?\s*:\s*(?P<f>[\d.]+)")
+
+
+def folder_config(folder):
+    config = {"bert_score_model": "xlm-roberta-large", "source": "test 파일"}
+    for key, values in _FOLDER_CONFIG.items():
+        if key in folder:
+            config.update(values)
+    match = re.search(r"\[\s*(\d+)\s*,\s*(\d+)\s*\]", folder)
+    if match:
+        config["chunk_size"], config["chunk_overlap"] = int(match.group(1)), int(match.group(2))
+    return config
+
+
+def parse_result_file(path):
+    with open(path, encoding="utf-8") as f:
+        text = f.read()
+    item = _parse(path)
+    first = text.splitlines()[0] if text else ""
+    question = item["question"] if item else re.sub(r"^\s*\d+\.\s*", "", first).strip()
+    answers = {}
+    for match in _ANSWER_RE.finditer(text):
+        kind = _ANSWER_LABELS.get(match.group("label").strip())
+        if kind:
+            answers[kind] = match.group("text").strip()
+    scores = []
+    for match in _SCORE_RE.finditer(text):
+        # 라벨 없는 점수 = RAG 응답과 GPT 단독 응답 사이 유사도 (모범 답변 기준 아님)
+        label = match.group("label") or "RAG↔GPT 유사도"
+        kind = "rag" if "RAG 기반" in label else "plain" if "일반" in label else None
+        scores.append({"system": label, "answer": answers.get(kind), "precision": float(match.group("p")),
+                       "recall": float(match.group("r")), "f1": float(match.group("f"))})
+    return {"question": question, "reference": item["reference"] if item else None, "scores": scores}
+
+
+# ✅ 폴더 하나 = 실행 하나. 이미 옮긴 폴더(같은 이름)는 건너뛴다
+def import_text_results(store, root=EVAL_DIR):
+    existing = {run["name"] for run in store.runs()}
+    imported = []
+    for name in sorted(os.listdir(root)):
+        folder = os.path.join(root, name)
+        if name in existing or not os.path.isdir(folder):
+            continue
+        # 폴더 이름의 [500, 100] 이 glob 문자 집합으로 읽히지 않게
+        paths = sorted(glob.glob(os.path.join(glob.escape(folder), "*.txt")))
+        parsed = [parse_result_file(path) for path in paths]
+        parsed = [p for p in parsed if p["scores"]]
+        if not parsed:
+            continue
+        created_at = min(os.path.getmtime(path) for path in paths)
+        run_id = store.start_run(name, folder_config(name), git_rev=None, created_at=created_at)
+        for p in parsed:
+            for score in p["scores"]:
+                store.add_result(run_id, p["question"], score.pop("system"), reference=p["reference"], **score)
+        imported.append((run_id, name))
+    return imported
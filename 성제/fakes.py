@@ -0,0 +1,98 @@
+# 🧪 부하 테스트/오프라인 실행용 가짜 LLM · 임베딩 (API 호출 없음, 같은 입력이면 항상 같은 결과)
+# - FakeChatModel: 첫 토큰까지 first_token_s, 이후 초당 tokens_per_s 속도로 답변을 흘려보낸다(stream).
+#                  usage_metadata 도 채워서 usage_meter / prompt_cache 집계가 그대로 동작한다.
+# - FakeEmbeddings: 글자 bigram 해시로 만든 벡터 (비슷한 문장은 비슷한 벡터), 호출마다 latency_s 대기.
+
+import hashlib
+import time
+
+import numpy as np
+from langchain_core.embeddings import Embeddings
+from langchain_core.language_models.chat_models import BaseChatModel
+from langchain_core.messages import AIMessage, AIMessageChunk
+from langchain_core.outputs import ChatGeneration, ChatGenerationChunk, ChatResult
+
+from adaptive_k import count_tokens
+
+_REPLY_WORDS = ["안녕하세요", "경북대학교", "학사", "안내", "입니다", "신청은", "학생", "포털에서", "가능합니다",
+                "기간", "확인해", "주세요", "😊", "📘", "자세한", "내용은", "공지사항을", "참고하세요."]
+
+
+def _seed(text):
+    return int.from_bytes(hashlib.sha1(text.encode("utf-8")).digest()[:8], "little")
+
+
+def _message_text(message):
+    content = message.content
+    if isinstance(content, str):
+        return content
+    return "".join(block.get("text", "") for block in content if isinstance(block, dict))
+
+
+class FakeChatModel(BaseChatModel):
+    model: str = "fake-chat"
+    first_token_s: float = 0.5
+    tokens_per_s: float = 50.0
+    reply_tokens: int = 80
+    # 생성자에서 streaming=True 를 넘겨야 invoke 도 _stream 을 거쳐 토큰 콜백이 나온다
+    streaming: bool = False
+
+    @property
+    def _llm_type(self):
+        return "fake-chat"
+
+    # 마지막 메시지(질문)로 답변 단어를 고른다 → 같은 질문이면 같은 답
+    def _reply(self, messages):
+        rng = np.random.default_rng(_seed(_message_text(messages[-1])))
+        words = rng.choice(_REPLY_WORDS, size=self.reply_tokens)
+        return [word + " " for word in words]
+
+    def _usage(self, messages, output):
+        return {"input_tokens": sum(count_tokens(_message_text(m)) for m in messages),
+                "output_tokens": len(output), "total_tokens": 0}
+
+    def _stream(self, messages, stop=None, run_manager=None, **kwargs):
+        tokens = self._reply(messages)
+        time.sleep(self.first_token_s)
+        for i, token in enumerate(tokens):
+            if i:
+                time.sleep(1.0 / self.tokens_per_s)
+            chunk = ChatGenerationChunk(message=AIMessageChunk(content=token))
+            if run_manager:
+                run_manager.on_llm_new_token(token, chunk=chunk)
+            yield chunk
+        usage = self._usage(messages, tokens)
+        usage["total_tokens"] = usage["input_tokens"] + usage["output_tokens"]
+        yield ChatGenerationChunk(message=AIMessageChunk(content="", usage_metadata=usage,
+                                                         response_metadata={"model_name": self.model}))
+
+    def _generate(self, messages, stop=None, run_manager=None, **kwargs):
+        tokens = self._reply(messages)
+        time.sleep(self.first_token_s + max(len(tokens) - 1, 0) / self.tokens_per_s)
+        usage = self._usage(messages, tokens)
+        usage["total_tokens"] = usage["input_tokens"] + usage["output_tokens"]
+        message = AIMessage(content="".join(tokens).strip(), usage_metadata=usage,
+                            response_metadata={"model_name": self.model})
+        return ChatResult(generations=[ChatGeneration(message=message)])
+
+
+class FakeEmbeddings(Embeddings):
+    def __init__(self, dim=384, latency_s=0.0):
+        self.dim = dim
+        self.latency_s = latency_s
+
+    def _vector(self, text):
+        vector = np.zeros(self.dim, dtype=np.float32)
+        text = "".join(text.split())
+        for i in range(max(len(text) - 1, 1)):
+            vector[_seed(text[i:i + 2]) % self.dim] += 1.0
+        norm = np.linalg.norm(vector)
+        return (vector / norm if norm else vector).tolist()
+
+    def embed_documents(self, texts):
+        if self.latency_s:
+            time.sleep(self.latency_s)
+        return [self._vector(t) for t in texts]
+
+    def embed_query(self, text):
+        return self.embed_documents([text])[0]
@@ -0,0 +1,247 @@
+# ⚡ 정형 데이터로 바로 답하는 빠른 경로 (RAG 앞단의 의도 라우터)
+# "수강신청 일정은 언제인가요?" → 학사일정 표, "도서관 어디야?" → 캠퍼스 건물 좌표 색인에서 바로 답한다.
+# 검색·LLM 호출 없이 수 µs 안에 끝나고, 규칙에 안 맞는 질문은 None 을 돌려 RAG 로 넘긴다.
+# 학사일정은 rag.py 사이드바, 건물 좌표는 정민/Untitled1.ipynb 지도와 같은 값 (여기가 원본).
+
+import logging
+import math
+import os
+import re
+import threading
+import time
+from datetime import date
+from urllib.parse import quote
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+# 이 요청 수마다 빠른 경로 비율을 로그로 남긴다
+LOG_EVERY = int(os.getenv("FAST_PATH_LOG_EVERY", "100"))
+
+# ✅ 학사일정 (키워드는 공백 없이 소문자로 비교)
+CALENDAR = [
+    {"name": "개강", "emoji": "🗓️", "start": date(2025, 9, 1), "end": date(2025, 9, 1), "keywords": ["개강"]},
+    {"name": "수강꾸러미 신청", "emoji": "📦", "start": date(2025, 7, 22), "end": date(2025, 7, 24),
+     "keywords": ["수강꾸러미", "꾸러미", "장바구니"]},
+    {"name": "수강신청", "emoji": "🖋️", "start": date(2025, 8, 12), "end": date(2025, 8, 14), "keywords": ["수강신청"]},
+    {"name": "중간고사", "emoji": "📝", "start": date(2025, 10, 22), "end": date(2025, 10, 28),
+     "keywords": ["중간고사", "중간시험"]},
+    {"name": "등록금 납부", "emoji": "💳", "start": date(2025, 8, 25), "end": date(2025, 8, 28),
+     "keywords": ["등록금"]},
+]
+
+# ✅ 캠퍼스 건물 (위도, 경도)
+CAMPUS_CENTER = (35.8885, 128.6108)
+BUILDINGS = [
+    {"name": "도서관", "lat": 35.8893, "lon": 128.6104, "aliases": ["도서관", "중앙도서관"]},
+    {"name": "IT대학", "lat": 35.8882, "lon": 128.6125, "aliases": ["it대학", "it대", "아이티대학"]},
+    {"name": "학생회관", "lat": 35.8875, "lon": 128.6095, "aliases": ["학생회관"]},
+    {"name": "공대 10호관", "lat": 35.8868, "lon": 128.6082, "aliases": ["공대10호관", "10호관"]},
+    {"name": "글로벌플라자", "lat": 35.8891, "lon": 128.6135, "aliases": ["글로벌플라자", "글플"]},
+]
+
+_DATE_WORDS = ["언제", "일정", "기간", "날짜", "며칠", "몇일", "몇월", "마감", "끝나"]
+_PLACE_WORDS = ["어디", "위치", "가는길", "가려면", "찾아가려면", "찾아가"]
+_NEAR_WORDS = ["근처", "가까운", "가까이", "주변"]
+# 날짜/위치 말고 다른 걸 묻는 질문은 문서(RAG)로 ("수강신청 방법", "도서관 어디서 대출해?", "중간고사 범위 언제 공지돼?")
+_BLOCK = ["범위", "공지", "준비", "확인", "식당", "추천"]
+_CALENDAR_BLOCK = _BLOCK + ["방법", "어떻게", "어디", "왜", "정정", "취소", "대상", "서류", "조건", "기준", "환불",
+                            "분납", "얼마"]
+_PLACE_BLOCK = _BLOCK + ["대출", "반납", "운영", "몇시", "열람실", "예약", "신청", "발급", "언제"]
+
+
+def _any(words):
+    return "|".join(sorted(map(re.escape, words), key=len, reverse=True))
+
+
+# 일정 키워드 바로 옆에 날짜 말이 붙어 있어야 한다 ("수강신청 일정은", "등록금 납부 마감", "언제 개강")
+_CALENDAR_NEXT = re.compile(rf"^(?:신청|납부)?(?:은|는|이|가|의)?(?:{_any(_DATE_WORDS)})")
+_CALENDAR_PREV = re.compile(rf"(?:{_any(_DATE_WORDS)})$")
+# 건물 이름을 빼고 나면 위치 말·조사·어미만 남아야 한다 ("도서관 어디야?" O, "IT대학 학과사무실 어디야?" X)
+_PARTICLES = ["은", "는", "이", "가", "의", "에", "까지", "으로", "로", "랑", "이랑", "하고", "와", "과"]
+_ENDINGS = ["야", "이야", "예요", "에요", "이에요", "인가요", "인지", "있어", "있어요", "있나요", "있니", "있음", "임",
+            "니", "나요", "요", "좀", "알려줘", "알려주세요", "알려줄래", "가르쳐줘", "돼", "되나요"]
+_LOCATION_ONLY = re.compile(rf"(?:{_any(_PARTICLES)})?(?:(?:{_any(_PLACE_WORDS + _NEAR_WORDS + ['건물'])})"
+                            rf"(?:{_any(_PARTICLES)})?)+(?:{_any(_ENDINGS)})*[?!.~]*")
+_COORDS = re.compile(r"(3\d\.\d+),(12\d\.\d+)")
+_WEEKDAYS = "월화수목금토일"
+_COMPASS = ["북", "북동", "동", "남동", "남", "남서", "서", "북서"]
+
+
+def _normalize(text):
+    return re.sub(r"\s+", "", text).lower()
+
+
+def _day(d, year=False):
+    return f"{d:%Y.%m.%d}({_WEEKDAYS[d.weekday()]})" if year else f"{d:%m.%d}({_WEEKDAYS[d.weekday()]})"
+
+
+# 사이드바 표기 (하루짜리는 연도까지, 기간은 월.일)
+def display_range(entry):
+    if entry["start"] == entry["end"]:
+        return f"{entry['start']:%Y.%m.%d}"
+    return f"{entry['start']:%m.%d} ~ {entry['end']:%m.%d}"
+
+
+def calendar_markdown(calendar=CALENDAR):
+    return "\n".join(f"- {e['emoji']} {e['name']}: **{display_range(e)}**" for e in calendar)
+
+
+def _status(entry, today):
+    if today < entry["start"]:
+        return f"D-{(entry['start'] - today).days}"
+    return "진행 중" if entry["start"] != entry["end"] else "오늘"
+
+
+# ✅ 건물 좌표 색인: 캠퍼스 중심 기준 평면 좌표(m)로 바꿔 두고 numpy 로 거리 계산
+# (건물 수십 개 규모라 한 번의 벡터 연산이 트리 탐색보다 빠르다)
+class BuildingIndex:
+    def __init__(self, buildings=BUILDINGS, center=CAMPUS_CENTER):
+        self.buildings = list(buildings)
+        self.center = center
+        self._xy = np.array([self.project(b["lat"], b["lon"]) for b in self.buildings], dtype=np.float64)
+        self._aliases = sorted(((alias, i) for i, b in enumerate(self.buildings) for alias in b["aliases"]),
+                               key=lambda pair: -len(pair[0]))
+
+    # 위도/경도 → 동쪽 x, 북쪽 y (m), 캠퍼스 안 거리에서는 등장방형 근사로 충분
+    def project(self, lat, lon):
+        lat0, lon0 = self.center
+        x = math.radians(lon - lon0) * 6371000 * math.cos(math.radians(lat0))
+        y = math.radians(lat - lat0) * 6371000
+        return x, y
+
+    # 질문에 나온 건물 (긴 별칭부터, 겹치는 별칭은 한 번만)
+    def find(self, text):
+        found = []
+        for alias, i in self._aliases:
+            if alias in text and i not in found:
+                found.append(i)
+                text = text.replace(alias, " ")
+        return found
+
+    # 건물 이름을 지운 나머지
+    def strip(self, text):
+        for alias, _ in self._aliases:
+            text = text.replace(alias, "")
+        return text
+
+    # ✅ 가장 가까운 건물 k 개: [(건물 번호, 거리 m, 방향)]
+    def nearest(self, lat, lon, k=3, exclude=()):
+        x, y = self.project(lat, lon)
+        delta = self._xy - (x, y)
+        distances = np.hypot(delta[:, 0], delta[:, 1])
+        out = []
+        for i in np.argsort(distances):
+            if int(i) in exclude:
+                continue
+            out.append((int(i), float(distances[i]), self.direction(delta[i, 0], delta[i, 1])))
+            if len(out) == k:
+                break
+        return out
+
+    @staticmethod
+    def direction(dx, dy):
+        bearing = math.degrees(math.atan2(dx, dy)) % 360
+        return _COMPASS[int((bearing + 22.5) // 45) % 8]
+
+    def describe(self, i, near=False):
+        b = self.buildings[i]
+        x, y = self._xy[i]
+        lines = [f"📍 **{b['name']}**: 캠퍼스 중심에서 {self.direction(x, y)}쪽 약 {math.hypot(x, y):.0f}m "
+                 f"({b['lat']:.4f}, {b['lon']:.4f})",
+                 f"🗺️ [지도에서 보기](https://map.kakao.com/link/map/{quote(b['name'])},{b['lat']},{b['lon']})"]
+        neighbours = self.nearest(b["lat"], b["lon"], k=3 if near else 1, exclude={i})
+        if neighbours:
+            label = "가까운 건물" if near else "가장 가까운 건물"
+            lines.append(f"🏫 {label}: " + ", ".join(
+                f"{self.buildings[j]['name']} ({direction}쪽 {distance:.0f}m)" for j, distance, direction in neighbours))
+        return "\n\n".join(lines)
+
+
+class FastPathRouter:
+    def __init__(self, calendar=CALENDAR, buildings=BUILDINGS, log_every=LOG_EVERY, today=None):
+        self.calendar = list(calendar)
+        self.index = BuildingIndex(buildings)
+        self.log_every = log_every
+        self.today = today
+        self._lock = threading.Lock()
+        self.stats = {"requests": 0, "fast": 0, "calendar": 0, "location": 0, "fast_us": 0.0}
+
+    @property
+    def share(self):
+        return self.stats["fast"] / self.stats["requests"] if self.stats["requests"] else 0.0
+
+    @staticmethod
+    def _asks_date(text, keyword):
+        at = text.find(keyword)
+        while at != -1:
+            if _CALENDAR_NEXT.match(text[at + len(keyword):]) or _CALENDAR_PREV.search(text[:at]):
+                return True
+            at = text.find(keyword, at + 1)
+        return False
+
+    def _calendar(self, text):
+        if not any(word in text for word in _DATE_WORDS) or any(word in text for word in _CALENDAR_BLOCK):
+            return None
+        entries = [e for e in self.calendar if any(self._asks_date(text, keyword) for keyword in e["keywords"])]
+        if not entries:
+            if "학사일정" not in text:
+                return None
+            entries = self.calendar
+        # 지난 일정은 표에 올해 날짜가 없을 수 있으니 문서(RAG)에서 찾게 한다
+        today = self.today or date.today()
+        entries = [e for e in entries if today <= e["end"]]
+        if not entries:
+            return None
+        lines = []
+        for e in entries:
+            when = _day(e["start"], year=True) if e["start"] == e["end"] else \
+                f"{_day(e['start'], year=True)} ~ {_day(e['end'])}"
+            lines.append(f"{e['emoji']} {e['name']}: **{when}** · {_status(e, today)}")
+        lines.append("📘 변경될 수 있으니 학교 학사일정 공지도 함께 확인해 주세요.")
+        return "\n\n".join(lines)
+
+    def _location(self, text):
+        near = any(word in text for word in _NEAR_WORDS)
+        if not (near or any(word in text for word in _PLACE_WORDS)) or any(word in text for word in _PLACE_BLOCK):
+            return None
+        coords = _COORDS.search(text)
+        if coords:
+            lat, lon = float(coords.group(1)), float(coords.group(2))
+            neighbours = self.index.nearest(lat, lon, k=3)
+            return "🏫 그 위치에서 가까운 건물:\n\n" + "\n".join(
+                f"{n}. **{self.index.buildings[j]['name']}** ({direction}쪽 {distance:.0f}m)"
+                for n, (j, distance, direction) in enumerate(neighbours, 1))
+        found = self.index.find(text)
+        if not found or not _LOCATION_ONLY.fullmatch(self.index.strip(text)):
+            return None
+        return "\n\n".join(self.index.describe(i, near=near) for i in found)
+
+    # ✅ 답변 문자열 또는 None(→ RAG). 모든 요청을 세어 빠른 경로 비율을 남긴다
+    def route(self, question):
+        start = time.perf_counter()
+        text = _normalize(question)
+        intent, answer = "calendar", self._calendar(text)
+        if answer is None:
+            intent, answer = "location", self._location(text)
+        elapsed_us = (time.perf_counter() - start) * 1e6
+        with self._lock:
+            self.stats["requests"] += 1
+            if answer is not None:
+                self.stats["fast"] += 1
+                self.stats[intent] += 1
+                self.stats["fast_us"] += elapsed_us
+            requests, fast = self.stats["requests"], self.stats["fast"]
+        if answer is not None:
+            logger.debug("fast path (%s, %.0fus): %s", intent, elapsed_us, question)
+        if self.log_every and requests % self.log_every == 0:
+            logger.warning("fast path served %d/%d requests (%.1f%%)", fast, requests, fast / requests * 100)
+        return answer
+
+    def as_dict(self):
+        with self._lock:
+            stats = dict(self.stats)
+        stats["share"] = stats["fast"] / stats["requests"] if stats["requests"] else 0.0
+        stats["avg_us"] = stats.pop("fast_us") / stats["fast"] if stats["fast"] else 0.0
+        return stats
@@ -0,0 +1,143 @@
+# 🌐 여러 학과/학교 벡터 저장소를 병렬로 검색하는 통합(federated) 검색기
+# 저장소마다 점수 척도(거리 vs 유사도)가 달라 정규화 후 합치고, 같은 문단은 하나로 합친다.
+
+import hashlib
+import logging
+import os
+import re
+import threading
+import time
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor, TimeoutError
+
+from langchain_core.documents import Document
+from langchain_core.retrievers import BaseRetriever
+
+logger = logging.getLogger(__name__)
+
+ROOT_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..")
+
+# 저장소마다 따로 쓰는 작은 풀: 느린 저장소 하나가 스레드를 다 잡아 다른 저장소 검색까지 밀리지 않게 한다
+# 그 저장소의 이전 검색이 아직 풀을 다 쓰고 있으면 이번 질문에서는 건너뛴다 ("busy")
+STORE_WORKERS = int(os.getenv("FEDERATED_STORE_WORKERS", "2"))
+_executors = {}
+_running = defaultdict(int)
+_executors_lock = threading.Lock()
+
+
+def _submit(name, fn, *args):
+    with _executors_lock:
+        if _running[name] >= STORE_WORKERS:
+            return None
+        executor = _executors.get(name)
+        if executor is None:
+            executor = _executors[name] = ThreadPoolExecutor(max_workers=STORE_WORKERS,
+                                                             thread_name_prefix=f"federated-{len(_executors)}")
+        _running[name] += 1
+    future = executor.submit(fn, *args)
+    future.add_done_callback(lambda _: _finished(name))
+    return future
+
+
+def _finished(name):
+    with _executors_lock:
+        _running[name] -= 1
+
+
+def _content_key(text):
+    return hashlib.sha1(re.sub(r"\s+", " ", text).strip().encode("utf-8")).hexdigest()
+
+
+# ✅ 저장소별 점수 → 공통 척도
+# rank  : 순위 기반(RRF), 척도가 전혀 달라도 안정적
+# minmax: 저장소 안에서 관련도 점수를 0~1로 다시 맞춤
+def normalize_scores(hits, method="rank", rrf_k=60):
+    if not hits:
+        return []
+    if method == "rank":
+        return [(doc, 1.0 / (rrf_k + rank)) for rank, (doc, _) in enumerate(hits, 1)]
+    scores = [s for _, s in hits]
+    low, high = min(scores), max(scores)
+    if high == low:
+        return [(doc, 1.0) for doc, _ in hits]
+    return [(doc, (s - low) / (high - low)) for doc, s in hits]
+
+
+class FederatedRetriever(BaseRetriever):
+    stores: dict
+    k: int = 4
+    per_store_k: int = 4
+    timeout_s: float = 3.0
+    timeouts: dict = {}
+    normalize: str = "rank"
+
+    def _search_store(self, name, store, query):
+        start = time.perf_counter()
+        hits = store.similarity_search_with_relevance_scores(query, k=self.per_store_k)
+        return hits, (time.perf_counter() - start) * 1000
+
+    # ✅ (문서 목록, 저장소별 통계) 반환
+    def search_with_stats(self, query):
+        start = time.monotonic()
+        futures = {name: _submit(name, self._search_store, name, store, query)
+                   for name, store in self.stores.items()}
+        stats = {}
+        merged = {}
+        for name, future in futures.items():
+            if future is None:
+                stats[name] = {"status": "busy", "hits": 0}
+                continue
+            timeout = self.timeouts.get(name, self.timeout_s)
+            remaining = max(timeout - (time.monotonic() - start), 0)
+            try:
+                hits, latency_ms = future.result(timeout=remaining)
+            except TimeoutError:
+                future.cancel()
+                stats[name] = {"status": "timeout", "latency_ms": timeout * 1000, "hits": 0}
+                continue
+            except Exception as e:
+                logger.warning("store %s failed: %s", name, e)
+                stats[name] = {"status": "error", "error": str(e), "hits": 0}
+                continue
+            stats[name] = {"status": "ok", "latency_ms": latency_ms, "hits": len(hits)}
+
+            for doc, score in normalize_scores(hits, self.normalize):
+                key = _content_key(doc.page_content)
+                if key in merged:
+                    merged[key].metadata["stores"].append(name)
+                    merged[key].metadata["federated_score"] += score
+                    continue
+                # 저장소가 돌려준 Document 는 저장소 안의 원본일 수 있어(FAISS InMemoryDocstore) 새로 만든다
+                merged[key] = Document(page_content=doc.page_content,
+                                       metadata={**doc.metadata, "store": name, "stores": [name],
+                                                 "federated_score": score})
+
+        docs = sorted(merged.values(), key=lambda d: d.metadata["federated_score"], reverse=True)[:self.k]
+        stats["_total"] = {"latency_ms": (time.monotonic() - start) * 1000, "merged": len(merged)}
+        logger.info("federated search %s", stats)
+        return docs, stats
+
+    def _get_relevant_documents(self, query, *, run_manager=None):
+        return self.search_with_stats(query)[0]
+
+
+# ✅ 현재 프로젝트에 있는 저장소들 (모두 OpenAI 임베딩 기반)
+def build_knu_stores(include=("전자공학과", "학교 규정", "현석 data")):
+    from langchain_community.vectorstores import Chroma, FAISS
+    from langchain_openai import OpenAIEmbeddings
+
+    stores = {}
+    if "전자공학과" in include:
+        # 수민/전자공학과/loader.py 로 만든 Blue Book DB (기본 OpenAI 임베딩)
+        stores["전자공학과"] = Chroma(persist_directory=os.path.join(ROOT_DIR, "수민", "전자공학과", "db"),
+                                  embedding_function=OpenAIEmbeddings())
+    if "학교 규정" in include:
+        stores["학교 규정"] = Chroma(persist_directory=os.path.join(ROOT_DIR, "knu_vectorstore"),
+                                 embedding_function=OpenAIEmbeddings(model="text-embedding-3-small"))
+    if "현석 data" in include:
+        from langchain.text_splitter import RecursiveCharacterTextSplitter
+        from text_cache import load_pdf_folder
+        pages = load_pdf_folder(os.path.join(ROOT_DIR, "현석", "data"))
+        docs = RecursiveCharacterTextSplitter(chunk_size=1000, chunk_overlap=100).split_documents(pages)
+        stores["현석 data"] = FAISS.from_documents(docs, OpenAIEmbeddings(model="text-embedding-3-small"))
+    return stores
@@ -0,0 +1,166 @@
+# 🗂️ 2단계(계층) 검색: 문서 고르기 → 고른 문서 안에서만 청크 검색
+# 1단계는 문서마다 벡터 하나(청크 임베딩 평균 + 파일명 임베딩)만 비교하므로
+# 비용이 전체 청크 수가 아니라 문서 수에 비례한다. 출처/학과 메타데이터 필터도 1단계에서 적용.
+# 문서 인덱스는 저장소 객체마다 프로세스에 하나 (shared_index): 세션이 몇 개든 같은 저장소면 같이 쓴다.
+
+import os
+import re
+import threading
+import weakref
+from collections import defaultdict
+from concurrent.futures import Future
+
+import numpy as np
+from langchain_core.retrievers import BaseRetriever
+
+from ingest_worker import IndexHolder
+from numpy_store import _normalize
+
+# "경북대학교 기계공학부 졸업 요건.pdf" → "기계공학부"
+_DEPARTMENT_PATTERN = re.compile(r"(\S+?(?:학부|학과|대학))")
+
+
+def document_title(source):
+    return os.path.splitext(os.path.basename(str(source)))[0].strip()
+
+
+def department_of(source):
+    title = document_title(source).replace("경북대학교", " ")
+    match = _DEPARTMENT_PATTERN.search(title)
+    return match.group(1) if match else None
+
+
+def _matches(info, filter):
+    for key, expected in (filter or {}).items():
+        value = info.get(key)
+        if isinstance(expected, (list, tuple, set)):
+            if value not in expected:
+                return False
+        elif value != expected:
+            return False
+    return True
+
+
+class HierarchicalIndex:
+    def __init__(self, store, title_weight=0.5):
+        # 저장소는 약한 참조로만 (shared_index 의 키가 저장소라서, 강한 참조면 교체된 저장소가 안 풀린다)
+        self._store = weakref.ref(store)
+        self.embedding = store.embedding
+        groups = defaultdict(list)
+        for i, meta in enumerate(store._metadatas):
+            groups[meta.get("source", "")].append(i)
+
+        vectors = store._vectors
+        self.documents = []
+        # 문서별 청크 = 원본 행렬의 행 번호 (벡터/본문을 복사하지 않는다)
+        self._rows = []
+        centroids = []
+        for source, rows in groups.items():
+            rows = np.asarray(rows, dtype=np.int64)
+            self._rows.append(rows)
+            centroids.append(_normalize(np.asarray(vectors[rows], dtype=np.float32).mean(axis=0))[0])
+            self.documents.append({"source": os.path.basename(str(source)), "title": document_title(source),
+                                   "department": department_of(source), "n_chunks": len(rows)})
+
+        self._centroids = np.asarray(centroids, dtype=np.float32)
+        # ✅ 파일명(예: "경북대학교 전자공학부 졸업요건 안내")이 문서 주제를 잘 요약하므로 함께 섞는다
+        if self.documents and title_weight:
+            titles = _normalize(store.embedding.embed_documents([d["title"] for d in self.documents]))
+            self._centroids = _normalize(self._centroids + title_weight * titles)
+
+    @property
+    def store(self):
+        return self._store()
+
+    def __len__(self):
+        return len(self.documents)
+
+    @property
+    def nbytes(self):
+        return self._centroids.nbytes + sum(rows.nbytes for rows in self._rows)
+
+    # ✅ 1단계: 필터를 통과한 문서 중 질문과 가까운 n_docs 개
+    def route(self, vector, n_docs=3, filter=None):
+        candidates = [i for i, info in enumerate(self.documents) if _matches(info, filter)]
+        if not candidates:
+            return []
+        scores = self._centroids[candidates] @ _normalize(vector)[0]
+        order = np.argsort(-scores)[:n_docs]
+        return [(candidates[i], float(scores[i])) for i in order]
+
+    # ✅ 2단계: 고른 문서의 청크만 검색 후 점수순으로 합친다
+    def search_with_score(self, query, k=4, n_docs=3, filter=None, vector=None):
+        store = self.store
+        if not self.documents or store is None:
+            return []
+        vector = self.embedding.embed_query(query) if vector is None else vector
+        query_vector = _normalize(vector)[0]
+        candidates = []
+        for doc_index, doc_score in self.route(vector, n_docs=n_docs, filter=filter):
+            rows = self._rows[doc_index]
+            scores = np.asarray(store._vectors[rows], dtype=np.float32) @ query_vector
+            top = np.argsort(-scores)[:k]
+            candidates.extend((float(scores[i]), int(rows[i]), doc_score) for i in top)
+        candidates.sort(key=lambda hit: hit[0], reverse=True)
+        hits = []
+        for score, row, doc_score in candidates[:k]:
+            doc = store._document(row)
+            doc.metadata["document_score"] = doc_score
+            hits.append((doc, score))
+        return hits
+
+
+# ✅ 저장소 객체 하나당 문서 인덱스 하나 (프로세스 전체 공용). 저장소가 사라지면 인덱스도 같이 정리된다
+# 값은 Future: 잠금은 찾기/넣기 동안만 잡고, 만들기(제목 임베딩)는 잠금 밖에서 처음 요청한 쪽이 한다.
+# 같은 저장소를 동시에 요청한 쪽은 그 Future 를 기다리고, 다른 저장소의 검색은 기다리지 않는다
+_indexes = weakref.WeakKeyDictionary()
+_indexes_lock = threading.Lock()
+
+
+def shared_index(store, title_weight=0.5):
+    with _indexes_lock:
+        per_store = _indexes.setdefault(store, {})
+        future = per_store.get(title_weight)
+        owner = future is None
+        if owner:
+            future = per_store[title_weight] = Future()
+    if not owner:
+        return future.result()
+    try:
+        future.set_result(HierarchicalIndex(store, title_weight=title_weight))
+    except BaseException as e:
+        # 실패하면 다음 요청이 다시 만들게 자리를 비운다 (기다리던 쪽에는 같은 예외)
+        with _indexes_lock:
+            _indexes.get(store, {}).pop(title_weight, None)
+        future.set_exception(e)
+    return future.result()
+
+
+# 이미 만들어진 인덱스만 (메모리 집계용, 없거나 만드는 중이면 세지 않는다)
+def indexes_for(store):
+    with _indexes_lock:
+        futures = list(_indexes.get(store, {}).values())
+    return [f.result() for f in futures if f.done() and f.exception() is None]
+
+
+# 질문마다 holder 의 현재 저장소를 쓰고, 문서 인덱스는 그 저장소의 공용 인덱스 (저장소가 바뀌면 처음 한 번만 생성)
+class HierarchicalRetriever(BaseRetriever):
+    holder: IndexHolder
+    k: int = 4
+    n_docs: int = 3
+    filter: dict = {}
+    title_weight: float = 0.5
+
+    def index(self):
+        return shared_index(self.holder.get(), title_weight=self.title_weight)
+
+    # vector: 이미 계산한 질문 임베딩 (있으면 다시 임베딩하지 않는다)
+    def search_with_score(self, query, filter=None, k=None, vector=None):
+        return self.index().search_with_score(query, k=k or self.k, n_docs=self.n_docs, filter=filter or self.filter,
+                                              vector=vector)
+
+    def search_with_vector(self, query, vector):
+        return [doc for doc, _ in self.search_with_score(query, vector=vector)]
+
+    def _get_relevant_documents(self, query, *, run_manager=None):
+        return [doc for doc, _ in self.search_with_score(query)]
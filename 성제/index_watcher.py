@@ -0,0 +1,132 @@
+# 🔄 문서 폴더(data/) 변경 감지 → 백그라운드 재색인 → 인덱스 원자적 교체
+# 바뀐 PDF만 다시 분할/임베딩하고, 나머지 파일 조각은 그대로 재사용한다.
+
+import glob
+import logging
+import os
+import threading
+import time
+
+import numpy as np
+
+from compact_docstore import MetadataColumns, TextColumn
+from ingest_worker import IndexHolder
+from numpy_store import NumpyVectorStore
+from text_cache import hash_file, load_pdf
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_INTERVAL_S = float(os.getenv("INDEX_WATCH_INTERVAL_S", "5"))
+# 청크 본문/메타데이터를 열 단위로 저장 (COMPACT_DOCSTORE_ZSTD=1 이면 본문 zstd 압축)
+COMPACT_DOCSTORE = os.getenv("COMPACT_DOCSTORE", "1") == "1"
+COMPACT_DOCSTORE_ZSTD = os.getenv("COMPACT_DOCSTORE_ZSTD", "0") == "1"
+
+
+class CorpusWatcher:
+    def __init__(self, folders, splitter, embeddings, interval_s=DEFAULT_INTERVAL_S, pattern="*.pdf",
+                 compact=COMPACT_DOCSTORE, compress=COMPACT_DOCSTORE_ZSTD):
+        self.folders = list(folders)
+        self.splitter = splitter
+        self.embeddings = embeddings
+        self.interval_s = interval_s
+        self.pattern = pattern
+        self.compact = compact
+        self.compress = compress
+        self.holder = IndexHolder(self._new_store())
+        self.last_reload = None
+        self._snapshot = {}
+        self._pieces = {}
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = None
+
+    # 파일 목록 + (수정 시각, 크기)
+    def _scan(self):
+        snapshot = {}
+        for folder in self.folders:
+            for path in glob.glob(os.path.join(folder, self.pattern)):
+                try:
+                    stat = os.stat(path)
+                except FileNotFoundError:
+                    continue
+                snapshot[path] = (stat.st_mtime_ns, stat.st_size)
+        return snapshot
+
+    # ✅ 파일 한 개 → 청크 텍스트/메타데이터/임베딩 조각
+    def _build_piece(self, path, digest):
+        docs = self.splitter.split_documents(load_pdf(path))
+        texts = [d.page_content for d in docs]
+        vectors = np.asarray(self.embeddings.embed_documents(texts), dtype=np.float32) if texts else None
+        metadatas = [d.metadata for d in docs]
+        if self.compact:
+            # 재사용을 위해 들고 있는 조각도 열 단위로 (원래 문자열/dict 는 여기서 버려진다)
+            texts, metadatas = TextColumn(texts, compress=self.compress), MetadataColumns(metadatas)
+        return {"digest": digest, "texts": texts, "metadatas": metadatas, "vectors": vectors}
+
+    def _new_store(self):
+        return NumpyVectorStore(self.embeddings, compact=self.compact, compress=self.compress)
+
+    def _assemble(self):
+        store = self._new_store()
+        for path in sorted(self._pieces):
+            piece = self._pieces[path]
+            if piece["texts"]:
+                store.add_vectors(piece["texts"], piece["vectors"], metadatas=piece["metadatas"])
+        return store
+
+    # ✅ 변경된 파일만 다시 색인하고 새 인덱스로 교체. 바뀐 게 없으면 False
+    def refresh(self):
+        with self._lock:
+            snapshot = self._scan()
+            if snapshot == self._snapshot:
+                return False
+            start = time.perf_counter()
+            changed = [p for p in snapshot if self._snapshot.get(p) != snapshot[p]]
+            removed = [p for p in self._pieces if p not in snapshot]
+            for path in removed:
+                del self._pieces[path]
+
+            rebuilt = []
+            for path in changed:
+                try:
+                    digest = hash_file(path)
+                    piece = self._pieces.get(path)
+                    if piece is None or piece["digest"] != digest:
+                        self._pieces[path] = self._build_piece(path, digest)
+                        rebuilt.append(path)
+                except Exception as e:
+                    # 복사 중인 파일 등은 다음 검사 때 다시 시도
+                    logger.warning("reindex failed for %s: %s", path, e)
+                    snapshot.pop(path)
+                    if path in self._snapshot:
+                        snapshot[path] = self._snapshot[path]
+            self._snapshot = snapshot
+
+            if not rebuilt and not removed:
+                return False
+            version = self.holder.swap(self._assemble())
+            self.last_reload = {
+                "version": version,
+                "rebuilt": [os.path.basename(p) for p in rebuilt],
+                "removed": [os.path.basename(p) for p in removed],
+                "seconds": time.perf_counter() - start,
+                "at": time.time(),
+            }
+            logger.info("index reloaded %s", self.last_reload)
+            return True
+
+    def _loop(self):
+        while not self._stop.wait(self.interval_s):
+            try:
+                self.refresh()
+            except Exception:
+                logger.exception("index watcher refresh failed")
+
+    def start(self):
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._loop, name="index-watcher", daemon=True)
+            self._thread.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
@@ -0,0 +1,138 @@
+# 📥 업로드 문서 백그라운드 색인 (작업 ID + 진행률 + 완료 시 인덱스 원자적 교체)
+# Streamlit 스크립트를 막지 않고, 색인하는 동안에도 기존 인덱스로 계속 답변한다.
+
+import logging
+import os
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+
+from langchain_core.retrievers import BaseRetriever
+
+from text_cache import load_pdf_bytes
+
+logger = logging.getLogger(__name__)
+
+EMBED_BATCH_SIZE = 32
+# 끝난 작업은 진행 표시용으로 잠깐만 남긴다 (오래됐거나 개수가 넘치면 정리)
+JOB_TTL_S = float(os.getenv("INGEST_JOB_TTL_S", "600"))
+MAX_JOBS = int(os.getenv("INGEST_MAX_JOBS", "100"))
+
+
+# ✅ 현재 사용 중인 인덱스를 가리키는 참조. 교체는 참조 하나만 바꾸므로 원자적이다
+class IndexHolder:
+    def __init__(self, value=None):
+        self._lock = threading.Lock()
+        self._value = value
+        self.version = 0
+
+    def get(self):
+        return self._value
+
+    def swap(self, value):
+        with self._lock:
+            if value is self._value:
+                return self.version
+            self._value = value
+            self.version += 1
+            return self.version
+
+
+# 질문마다 holder 에서 그 시점의 인덱스를 꺼내 쓴다 (진행 중인 검색은 이전 인덱스로 끝남)
+class HolderRetriever(BaseRetriever):
+    holder: IndexHolder
+    k: int = 4
+
+    def _get_relevant_documents(self, query, *, run_manager=None):
+        return self.holder.get().similarity_search(query, k=self.k)
+
+
+class IngestJob:
+    def __init__(self, name):
+        self.id = uuid.uuid4().hex[:8]
+        self.name = name
+        self.status = "queued"
+        self.progress = 0.0
+        self.message = "대기 중"
+        self.error = None
+        self.result = None
+        self.created = time.time()
+        self.finished = None
+
+    def update(self, status, progress, message):
+        self.status = status
+        self.progress = progress
+        self.message = message
+
+    @property
+    def done(self):
+        return self.status in ("done", "error")
+
+    def as_dict(self):
+        return {"id": self.id, "name": self.name, "status": self.status, "progress": self.progress,
+                "message": self.message, "error": self.error}
+
+
+class IngestWorker:
+    def __init__(self, max_workers=int(os.getenv("INGEST_WORKERS", "2")), job_ttl_s=JOB_TTL_S, max_jobs=MAX_JOBS):
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="ingest")
+        self._lock = threading.Lock()
+        self._jobs = {}
+        self.job_ttl_s = job_ttl_s
+        self.max_jobs = max_jobs
+
+    # ✅ fn(job, *args) 를 백그라운드에서 실행하고, 끝나면 on_done(result) 호출
+    def submit(self, name, fn, *args, on_done=None):
+        job = IngestJob(name)
+        with self._lock:
+            self._jobs[job.id] = job
+            self._prune()
+        self._executor.submit(self._run, job, fn, args, on_done)
+        return job.id
+
+    # 끝난 지 job_ttl_s 가 지난 작업, 그래도 max_jobs 를 넘으면 가장 먼저 끝난 작업부터 지운다 (실행 중인 작업은 유지)
+    def _prune(self):
+        now = time.time()
+        finished = sorted((job for job in self._jobs.values() if job.finished is not None),
+                          key=lambda job: job.finished)
+        overflow = len(self._jobs) - self.max_jobs
+        for job in finished:
+            if now - job.finished > self.job_ttl_s or overflow > 0:
+                del self._jobs[job.id]
+                overflow -= 1
+
+    def _run(self, job, fn, args, on_done):
+        try:
+            job.result = fn(job, *args)
+            if on_done is not None:
+                on_done(job.result)
+                # 넘겨준 결과(문서 + 임베딩)는 인덱스가 갖고 있으므로 작업에는 남기지 않는다
+                job.result = None
+            job.update("done", 1.0, "완료")
+        except Exception as e:
+            logger.exception("ingest job %s failed", job.id)
+            job.error = str(e)
+            job.update("error", job.progress, f"실패: {e}")
+        finally:
+            job.finished = time.time()
+
+    def get(self, job_id):
+        with self._lock:
+            self._prune()
+            return self._jobs.get(job_id)
+
+
+# ✅ 업로드된 PDF 한 개: 파싱 → 분할 → 배치 임베딩 (진행률 갱신)
+def ingest_pdf(job, data, name, splitter, embeddings):
+    job.update("parsing", 0.05, "PDF 읽는 중")
+    pages = load_pdf_bytes(data, name)
+    job.update("splitting", 0.15, "문서 나누는 중")
+    docs = splitter.split_documents(pages)
+    vectors = []
+    for start in range(0, len(docs), EMBED_BATCH_SIZE):
+        batch = docs[start:start + EMBED_BATCH_SIZE]
+        vectors.extend(embeddings.embed_documents([d.page_content for d in batch]))
+        done = min(start + EMBED_BATCH_SIZE, len(docs))
+        job.update("embedding", 0.15 + 0.8 * done / max(len(docs), 1), f"임베딩 {done}/{len(docs)}")
+    return docs, vectors
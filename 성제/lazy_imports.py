@@ -0,0 +1,133 @@
+# 🐢→🐇 무거운 모듈(langchain, torch, transformers, bert_score, 벡터DB, LLM SDK)은 처음 쓸 때 불러오기
+# + 시작 시간 측정 모드 (STARTUP_PROFILE=1): 모듈별 import 시간과 초기화 단계별 시간을 기록한다.
+# (더 자세한 import 트리는 python -X importtime 으로 볼 수 있다)
+
+import builtins
+import importlib
+import logging
+import os
+import sys
+import threading
+import time
+from contextlib import contextmanager
+
+logger = logging.getLogger(__name__)
+
+PROFILE_ENABLED = os.getenv("STARTUP_PROFILE", "0") == "1"
+
+_started = time.perf_counter()
+_lock = threading.Lock()
+_import_times = {}
+_steps = []
+_local = threading.local()
+
+
+def _record_import(name, seconds):
+    with _lock:
+        _import_times[name] = _import_times.get(name, 0.0) + seconds
+
+
+class LazyModule:
+    def __init__(self, name):
+        self._name = name
+        self._module = None
+
+    def _load(self):
+        if self._module is None:
+            start = time.perf_counter()
+            self._module = importlib.import_module(self._name)
+            _record_import(f"lazy:{self._name}", time.perf_counter() - start)
+        return self._module
+
+    def __getattr__(self, attr):
+        return getattr(self._load(), attr)
+
+
+# 클래스/함수 하나를 가리키는 대리 객체: 호출(생성자), 클래스 메서드 접근 모두 처음에 실제 import
+class LazyAttr:
+    def __init__(self, module, name):
+        self._module = module
+        self._name = name
+
+    def _target(self):
+        return getattr(self._module._load(), self._name)
+
+    def __call__(self, *args, **kwargs):
+        return self._target()(*args, **kwargs)
+
+    def __getattr__(self, attr):
+        return getattr(self._target(), attr)
+
+
+# ✅ bert_score = lazy_import("bert_score") → bert_score.score(...) 를 처음 호출할 때 import
+def lazy_import(name):
+    return LazyModule(name)
+
+
+# ✅ HierarchicalRetriever, = lazy_from("hierarchical", "HierarchicalRetriever")
+def lazy_from(module_name, *names):
+    module = LazyModule(module_name)
+    return tuple(LazyAttr(module, name) for name in names)
+
+
+# ✅ 최상위 import 마다 걸린 시간(하위 import 포함) 기록
+def enable_import_profiling():
+    if getattr(builtins.__import__, "_startup_profiler", False):
+        return
+    original = builtins.__import__
+
+    def timed_import(name, globals=None, locals=None, fromlist=(), level=0):
+        if level != 0 or name in sys.modules:
+            return original(name, globals, locals, fromlist, level)
+        depth = getattr(_local, "depth", 0)
+        _local.depth = depth + 1
+        start = time.perf_counter()
+        try:
+            return original(name, globals, locals, fromlist, level)
+        finally:
+            _local.depth = depth
+            if depth == 0:
+                _record_import(name, time.perf_counter() - start)
+
+    timed_import._startup_profiler = True
+    builtins.__import__ = timed_import
+
+
+# ✅ 초기화 단계 시간 (모델 로딩, 인덱스 생성 등)
+@contextmanager
+def startup_step(name):
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        with _lock:
+            _steps.append((name, time.perf_counter() - start))
+
+
+def mark(name):
+    # 프로세스 시작(이 모듈 import) 이후 경과 시간. Streamlit rerun 에서도 처음 한 번만 기록
+    with _lock:
+        if all(step != name for step, _ in _steps):
+            _steps.append((name, time.perf_counter() - _started))
+
+
+def startup_report(top_n=15):
+    with _lock:
+        imports = sorted(_import_times.items(), key=lambda item: item[1], reverse=True)[:top_n]
+        steps = list(_steps)
+    return {"imports": imports, "steps": steps}
+
+
+def format_startup_report(top_n=15):
+    report = startup_report(top_n)
+    lines = [f"import {name:<32} {seconds * 1000:8.1f}ms" for name, seconds in report["imports"]]
+    lines += [f"step   {name:<32} {seconds * 1000:8.1f}ms" for name, seconds in report["steps"]]
+    return "\n".join(lines)
+
+
+def log_startup_report(top_n=15):
+    logger.warning("startup profile\n%s", format_startup_report(top_n))
+
+
+if PROFILE_ENABLED:
+    enable_import_profiling()
@@ -0,0 +1,125 @@
+# 🔌 프로세스 공용 LLM 클라이언트 레지스트리
+# (제공자, 모델, 파라미터)마다 모델 객체를 하나만 만들고, HTTP 연결 풀(keep-alive)을 공유한다.
+# 체인/세션마다 ChatOpenAI·ChatAnthropic 을 새로 만들면 요청마다 TCP·TLS 연결부터 다시 맺는다.
+
+import logging
+import os
+import threading
+
+import httpx
+
+logger = logging.getLogger(__name__)
+
+POOL_MAX_CONNECTIONS = int(os.getenv("LLM_POOL_MAX_CONNECTIONS", "20"))
+POOL_MAX_KEEPALIVE = int(os.getenv("LLM_POOL_MAX_KEEPALIVE", "10"))
+POOL_KEEPALIVE_EXPIRY_S = float(os.getenv("LLM_POOL_KEEPALIVE_EXPIRY_S", "60"))
+CONNECT_TIMEOUT_S = float(os.getenv("LLM_CONNECT_TIMEOUT_S", "5"))
+READ_TIMEOUT_S = float(os.getenv("LLM_READ_TIMEOUT_S", "60"))
+
+_lock = threading.Lock()
+_models = {}
+_http_clients = {}
+_stats = {}
+
+
+# ✅ 연결 재사용 통계: 요청 수 대비 새로 맺은 TCP/TLS 연결 수
+class ConnectionStats:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.requests = 0
+        self.new_connections = 0
+        self.tls_handshakes = 0
+        self.models_created = 0
+        self.models_reused = 0
+
+    # httpcore trace 이벤트: 새 연결일 때만 connect_tcp / start_tls 가 발생한다
+    def _trace(self, event_name, info):
+        if event_name == "connection.connect_tcp.complete":
+            with self._lock:
+                self.new_connections += 1
+        elif event_name == "connection.start_tls.complete":
+            with self._lock:
+                self.tls_handshakes += 1
+
+    def on_request(self, request):
+        with self._lock:
+            self.requests += 1
+        request.extensions["trace"] = self._trace
+
+    def as_dict(self):
+        reused = max(self.requests - self.new_connections, 0)
+        return {
+            "requests": self.requests,
+            "new_connections": self.new_connections,
+            "tls_handshakes": self.tls_handshakes,
+            "reused_connections": reused,
+            "reuse_ratio": reused / self.requests if self.requests else 0.0,
+            "models_created": self.models_created,
+            "models_reused": self.models_reused,
+        }
+
+
+def _pool_timeout(timeout):
+    read = READ_TIMEOUT_S if timeout is None else float(timeout)
+    return httpx.Timeout(read, connect=min(CONNECT_TIMEOUT_S, read))
+
+
+# ✅ 제공자별 공용 httpx 클라이언트 (timeout 이 다르면 따로)
+def get_http_client(provider, timeout=None):
+    key = (provider, timeout)
+    with _lock:
+        client = _http_clients.get(key)
+        if client is None:
+            stats = _stats.setdefault(provider, ConnectionStats())
+            client = httpx.Client(
+                limits=httpx.Limits(max_connections=POOL_MAX_CONNECTIONS,
+                                    max_keepalive_connections=POOL_MAX_KEEPALIVE,
+                                    keepalive_expiry=POOL_KEEPALIVE_EXPIRY_S),
+                timeout=_pool_timeout(timeout),
+                event_hooks={"request": [stats.on_request]},
+            )
+            _http_clients[key] = client
+        return client
+
+
+def _instrument(provider, http_client):
+    # 라이브러리가 내부에서 만든 httpx 클라이언트에도 통계 훅을 단다
+    if isinstance(http_client, httpx.Client):
+        stats = _stats.setdefault(provider, ConnectionStats())
+        http_client.event_hooks["request"].append(stats.on_request)
+
+
+def _build(provider, model, params):
+    if provider == "openai":
+        from langchain_openai import ChatOpenAI
+        return ChatOpenAI(model=model, http_client=get_http_client(provider, params.get("timeout")), **params)
+    if provider == "anthropic":
+        from langchain_anthropic import ChatAnthropic
+        llm = ChatAnthropic(model=model, **params)
+        # ChatAnthropic 은 http_client 를 받지 않으므로, 객체를 공유해 내부 연결 풀을 같이 쓴다
+        _instrument(provider, getattr(getattr(llm, "_client", None), "_client", None))
+        return llm
+    raise ValueError(f"unknown provider: {provider}")
+
+
+# ✅ (provider, model, params) 당 하나의 모델 객체를 돌려준다
+def get_chat_model(provider, model, **params):
+    key = (provider, model, tuple(sorted((k, repr(v)) for k, v in params.items())))
+    with _lock:
+        llm = _models.get(key)
+        stats = _stats.setdefault(provider, ConnectionStats())
+        if llm is not None:
+            stats.models_reused += 1
+            return llm
+    llm = _build(provider, model, params)
+    with _lock:
+        # 동시에 만든 경우 먼저 등록된 쪽을 쓴다
+        llm = _models.setdefault(key, llm)
+        stats.models_created += 1
+    logger.info("llm client created %s %s", provider, model)
+    return llm
+
+
+def client_stats():
+    with _lock:
+        return {provider: stats.as_dict() for provider, stats in _stats.items()}
@@ -0,0 +1,297 @@
+# 🏋️ 부하 테스트: 질문 목록(자주 묻는 질문 + "test 파일" 질문)을 정해진 동시성/도착률로 재생
+# 대상: RAG 파이프라인(rag.py 와 같은 구성, 같은 프로세스) 또는 --url 로 지정한 HTTP 서비스
+# 기본은 가짜 LLM(fakes.FakeChatModel)이라 API 비용 없이 검색/프롬프트 구성/스레드 풀 병목을 본다.
+# 결과: 처리량, 지연시간 p50/p95/p99, 첫 토큰까지 시간(TTFT), 시간별 메모리(RSS)
+#
+# 예) python load_test.py --requests 200 --concurrency 16 --rate 8 --corpus eval --fake-embeddings
+#     python load_test.py --url http://localhost:8000/ask --concurrency 32 --pid 12345
+
+import argparse
+import json
+import logging
+import os
+import random
+import resource
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+from langchain_core.callbacks import BaseCallbackHandler
+
+from eval_set import load_eval_set, question_mix
+
+logger = logging.getLogger(__name__)
+
+EMBEDDING_MODEL = "jhgan/ko-sbert-nli"
+# rag.py 와 같은 지시문 (프롬프트 길이를 맞추기 위해)
+ANSWER_INSTRUCTIONS = ("당신은 경북대학교에 관한 정보를 제공하는 AI 도우미입니다. "
+                       "아래 문서 내용을 참고하여 정확하고 공손하게 한국어로 답변해 주세요. 이모지도 함께 사용하세요.")
+
+
+# ✅ 스트리밍 중 첫 토큰이 나온 시각
+class FirstTokenTimer(BaseCallbackHandler):
+    def __init__(self):
+        self.first_token_at = None
+
+    def on_llm_new_token(self, token, **kwargs):
+        if self.first_token_at is None and token:
+            self.first_token_at = time.perf_counter()
+
+
+# ✅ 주기적으로 RSS(MB) 기록. pid 를 주면 그 프로세스(예: HTTP 서버)를 본다
+class MemorySampler:
+    def __init__(self, interval_s=0.5, pid=None):
+        self.interval_s = interval_s
+        self.pid = pid or os.getpid()
+        self.samples = []
+        self._stop = threading.Event()
+        self._thread = None
+
+    def rss_mb(self):
+        try:
+            with open(f"/proc/{self.pid}/status") as f:
+                for line in f:
+                    if line.startswith("VmRSS:"):
+                        return int(line.split()[1]) / 1024
+        except OSError:
+            pass
+        # /proc 가 없으면(macOS 등) 이 프로세스의 최대 RSS
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+    def _run(self, start):
+        while not self._stop.is_set():
+            self.samples.append((time.perf_counter() - start, self.rss_mb()))
+            self._stop.wait(self.interval_s)
+
+    def start(self, start):
+        self._thread = threading.Thread(target=self._run, args=(start,), name="memory-sampler", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+        self._thread.join()
+        return self.samples
+
+
+# ✅ rag.py 와 같은 구성의 파이프라인 (평가 실행 eval_run.py 도 같이 쓴다) → (DeadlineRAG, IndexHolder, 임베딩)
+# meter 를 안 주면: 가짜 LLM 부하 테스트는 예산 없이, 실제 LLM 이면 환경 변수 예산(USAGE_BUDGET_*)으로
+def build_pipeline(args, meter=None):
+    from adaptive_k import AdaptiveKRetriever
+    from deadline import DeadlineRAG
+    from fakes import FakeChatModel, FakeEmbeddings
+    from hierarchical import HierarchicalRetriever
+    from ingest_worker import IndexHolder
+    from numpy_store import NumpyVectorStore
+    from prompt_cache import CachedPromptChain
+    from usage_meter import UsageMeter
+
+    embeddings = FakeEmbeddings(latency_s=args.embed_latency) if args.fake_embeddings else None
+    if embeddings is None:
+        from onnx_embeddings import load_embeddings
+        embeddings = load_embeddings(EMBEDDING_MODEL)
+
+    if args.corpus == "eval":
+        # PDF 로더/토크나이저 없이: 평가 세트 모범 답변을 문단으로
+        items = load_eval_set()
+        store = NumpyVectorStore.from_texts([item["reference"] for item in items], embeddings,
+                                            metadatas=[{"source": item["path"]} for item in items])
+        holder = IndexHolder(store)
+    else:
+        from index_watcher import CorpusWatcher
+        from token_splitter import TokenAwareSplitter
+        corpus = CorpusWatcher([args.corpus], TokenAwareSplitter.from_model(EMBEDDING_MODEL), embeddings)
+        corpus.refresh()
+        holder = corpus.holder
+    logger.warning("index: %d chunks", len(holder.get()))
+
+    if args.real_llm:
+        from llm_clients import get_chat_model
+        llm = get_chat_model("anthropic", "claude-3-haiku-20240307", timeout=args.deadline, max_retries=0,
+                             streaming=True)
+    else:
+        llm = FakeChatModel(first_token_s=args.first_token_s, tokens_per_s=args.tokens_per_s,
+                            reply_tokens=args.reply_tokens, streaming=not args.no_stream)
+
+    hierarchical = HierarchicalRetriever(holder=holder)
+    retriever = AdaptiveKRetriever(search=lambda query, k, vector=None:
+                                   hierarchical.search_with_score(query, k=k, vector=vector))
+    rag = DeadlineRAG(retriever, CachedPromptChain(llm, ANSWER_INSTRUCTIONS), budget_s=args.deadline,
+                      meter=meter or UsageMeter(budgets=None if args.real_llm else {}))
+    return rag, holder, embeddings
+
+
+# ✅ 같은 프로세스 안의 RAG 파이프라인: 질문 → {"ttft_s", "fallback", "cached"}
+def pipeline_target(args):
+    from semantic_cache import SemanticCache
+
+    rag, holder, embeddings = build_pipeline(args)
+    cache = SemanticCache(embeddings) if args.semantic_cache else None
+    router = None
+    if args.fast_path:
+        from fast_path import FastPathRouter
+        router = FastPathRouter()
+
+    def call(question, started):
+        if router is not None and router.route(question) is not None:
+            return {"ttft_s": time.perf_counter() - started, "fallback": False, "cached": False, "fast_path": True}
+        vector = None
+        if cache is not None:
+            vector = embeddings.embed_query(question)
+            if cache.lookup(question, holder.version, vector=vector) is not None:
+                return {"ttft_s": time.perf_counter() - started, "fallback": False, "cached": True}
+        timer = FirstTokenTimer()
+        result = rag.answer(question, callbacks=[timer], vector=vector)
+        if cache is not None and not result["fallback"]:
+            cache.put(question, result["answer"], holder.version, vector=vector)
+        ttft = timer.first_token_at - started if timer.first_token_at else None
+        return {"ttft_s": ttft, "fallback": result["fallback"], "cached": False}
+
+    return call
+
+
+# ✅ HTTP 서비스: POST {"question": ...} → 응답 본문을 스트림으로 읽으며 첫 바이트 시각 = TTFT
+def http_target(args):
+    import httpx
+
+    client = httpx.Client(timeout=args.deadline + 30,
+                          limits=httpx.Limits(max_connections=args.concurrency,
+                                              max_keepalive_connections=args.concurrency))
+
+    def call(question, started):
+        ttft = None
+        with client.stream("POST", args.url, json={"question": question}) as response:
+            response.raise_for_status()
+            for chunk in response.iter_bytes():
+                if ttft is None and chunk:
+                    ttft = time.perf_counter() - started
+        return {"ttft_s": ttft, "fallback": False, "cached": False}
+
+    return call
+
+
+# ✅ rate 가 있으면 포아송 도착(열린 부하: 밀리면 대기열이 쌓이고 그 대기도 지연시간에 포함)
+# rate 가 없으면 concurrency 개 작업자가 쉬지 않고 다음 질문을 보낸다(닫힌 부하)
+def run_load(call, questions, requests, concurrency, rate=None, seed=0):
+    rng = random.Random(seed)
+    picks = [rng.choice(questions) for _ in range(requests)]
+    arrivals = np.cumsum([rng.expovariate(rate) for _ in range(requests)]) if rate else None
+    results = []
+    lock = threading.Lock()
+
+    def one(question, scheduled):
+        began = time.perf_counter()
+        started = scheduled if scheduled is not None else began
+        record = {"question": question, "queue_s": began - started}
+        try:
+            record.update(call(question, started))
+            record["ok"] = True
+        except Exception as e:
+            record.update({"ok": False, "error": repr(e)})
+        record["latency_s"] = time.perf_counter() - started
+        with lock:
+            results.append(record)
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency, thread_name_prefix="load") as executor:
+        for i, question in enumerate(picks):
+            scheduled = None
+            if arrivals is not None:
+                scheduled = start + arrivals[i]
+                delay = scheduled - time.perf_counter()
+                if delay > 0:
+                    time.sleep(delay)
+            executor.submit(one, question, scheduled)
+    return results, time.perf_counter() - start
+
+
+def percentiles(values):
+    values = [v for v in values if v is not None]
+    if not values:
+        return None
+    return {f"p{p}": float(np.percentile(values, p)) * 1000 for p in (50, 95, 99)}
+
+
+def summarize(results, duration, memory):
+    ok = [r for r in results if r["ok"]]
+    return {
+        "requests": len(results),
+        "errors": len(results) - len(ok),
+        "duration_s": duration,
+        "throughput_rps": len(ok) / duration if duration else 0.0,
+        "latency_ms": percentiles([r["latency_s"] for r in ok]),
+        "ttft_ms": percentiles([r.get("ttft_s") for r in ok]),
+        "queue_ms": percentiles([r["queue_s"] for r in ok]),
+        "fallback_ratio": sum(r.get("fallback", False) for r in ok) / len(ok) if ok else 0.0,
+        "cache_hit_ratio": sum(r.get("cached", False) for r in ok) / len(ok) if ok else 0.0,
+        "fast_path_ratio": sum(r.get("fast_path", False) for r in ok) / len(ok) if ok else 0.0,
+        "memory_mb": [(round(t, 2), round(mb, 1)) for t, mb in memory],
+    }
+
+
+def print_report(summary, memory_every_s=5.0):
+    print(f"요청 {summary['requests']}개 (오류 {summary['errors']}), {summary['duration_s']:.1f}초, "
+          f"처리량 {summary['throughput_rps']:.2f} req/s")
+    for name, label in [("latency_ms", "지연시간"), ("ttft_ms", "첫 토큰"), ("queue_ms", "대기열")]:
+        p = summary[name]
+        line = f"p50 {p['p50']:8.1f}  p95 {p['p95']:8.1f}  p99 {p['p99']:8.1f} ms" if p else "n/a"
+        print(f"{label:<8}{line}")
+    print(f"검색 결과만 답변 {summary['fallback_ratio']:.1%}, 질문 캐시 적중 {summary['cache_hit_ratio']:.1%}, "
+          f"빠른 경로 {summary['fast_path_ratio']:.1%}")
+    memory = summary["memory_mb"]
+    if memory:
+        print(f"메모리(RSS) 최대 {max(mb for _, mb in memory):.1f}MB")
+        next_at = 0.0
+        for t, mb in memory:
+            if t >= next_at:
+                print(f"  {t:6.1f}s {mb:8.1f}MB")
+                next_at = t + memory_every_s
+
+
+# build_pipeline 설정 (eval_run.py 와 공유)
+def add_pipeline_args(parser, corpus="data", real_llm=False):
+    parser.add_argument("--corpus", default=corpus, help='PDF 폴더 또는 "eval" (평가 세트 모범 답변)')
+    parser.add_argument("--fake-embeddings", action="store_true")
+    parser.add_argument("--embed-latency", type=float, default=0.0)
+    if real_llm:
+        parser.add_argument("--fake-llm", dest="real_llm", action="store_false", help="실제 Claude 대신 가짜 LLM")
+    else:
+        parser.add_argument("--real-llm", action="store_true", help="가짜 대신 실제 Claude (비용 발생)")
+    parser.add_argument("--first-token-s", type=float, default=0.5)
+    parser.add_argument("--tokens-per-s", type=float, default=50.0)
+    parser.add_argument("--reply-tokens", type=int, default=80)
+    parser.add_argument("--no-stream", action="store_true", help="가짜 LLM 을 스트리밍 없이 (TTFT 측정 안 됨)")
+    parser.add_argument("--deadline", type=float, default=15.0)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="RAG 부하 테스트")
+    parser.add_argument("--requests", type=int, default=100)
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--rate", type=float, default=None, help="초당 도착 요청 수 (없으면 닫힌 부하)")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--faq-weight", type=int, default=3)
+    parser.add_argument("--url", default=None, help="HTTP 서비스 주소 (없으면 같은 프로세스의 파이프라인)")
+    parser.add_argument("--pid", type=int, default=None, help="메모리를 잴 프로세스 (HTTP 서버)")
+    add_pipeline_args(parser)
+    parser.add_argument("--semantic-cache", action="store_true")
+    parser.add_argument("--fast-path", action="store_true", help="학사일정/건물 위치 질문은 정형 데이터로 바로 답변")
+    parser.add_argument("--json", default=None, help="결과를 JSON 으로 저장")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.WARNING, format="%(message)s")
+    questions = question_mix(args.faq_weight)
+    call = http_target(args) if args.url else pipeline_target(args)
+
+    sampler = MemorySampler(pid=args.pid).start(time.perf_counter())
+    results, duration = run_load(call, questions, args.requests, args.concurrency, args.rate, args.seed)
+    summary = summarize(results, duration, sampler.stop())
+    print_report(summary)
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump({"args": vars(args), "summary": summary, "results": results}, f, ensure_ascii=False, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,117 @@
+# 🧪 로컬 Messages API 흉내(mock): 프롬프트 캐시 동작을 실제 API 비용 없이 확인하기 위한 서버
+# POST /v1/messages 만 지원 (stream 없음). cache_control 이 붙은 블록까지를 접두부로 보고
+# - 처음 보는 접두부 → cache_creation_input_tokens (쓰기)
+# - TTL 안에 같은 접두부 → cache_read_input_tokens (읽기)
+# - 최소 길이보다 짧으면 캐시하지 않음
+# 토큰 수는 adaptive_k.count_tokens 추정치라 실제 값과는 다르다.
+#
+# ChatAnthropic(model=..., anthropic_api_url=mock.url, api_key="test") 로 연결한다.
+
+import hashlib
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from adaptive_k import count_tokens
+from prompt_cache import DEFAULT_MIN_CACHEABLE_TOKENS, MIN_CACHEABLE_TOKENS
+
+CACHE_TTL_S = 300
+
+
+def _blocks(content):
+    if isinstance(content, str):
+        return [{"type": "text", "text": content}]
+    return list(content or [])
+
+
+def _tokens(blocks):
+    return sum(count_tokens(block.get("text", "")) for block in blocks)
+
+
+class MockMessagesAPI:
+    def __init__(self, reply="모의 답변입니다 😊", ttl_s=CACHE_TTL_S, host="127.0.0.1", port=0):
+        self.reply = reply
+        self.ttl_s = ttl_s
+        self.requests = []
+        self._cache = {}
+        self._lock = threading.Lock()
+        self._server = ThreadingHTTPServer((host, port), self._handler())
+        self._thread = None
+
+    @property
+    def url(self):
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def _handler(self):
+        api = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_POST(self):
+                if self.path.rstrip("/") != "/v1/messages":
+                    self.send_error(404)
+                    return
+                body = json.loads(self.rfile.read(int(self.headers.get("content-length", 0))))
+                payload = json.dumps(api.respond(body), ensure_ascii=False).encode("utf-8")
+                self.send_response(200)
+                self.send_header("content-type", "application/json")
+                self.send_header("content-length", str(len(payload)))
+                self.end_headers()
+                self.wfile.write(payload)
+
+            def log_message(self, *args):
+                pass
+
+        return Handler
+
+    # ✅ 요청 본문 → 응답 (usage 에 캐시 읽기/쓰기 토큰)
+    def respond(self, body):
+        # 실제 API 와 같은 순서: tools → system → messages
+        sequence = [("tools", tool) for tool in body.get("tools", [])]
+        sequence += [("system", block) for block in _blocks(body.get("system"))]
+        for message in body.get("messages", []):
+            sequence += [(message["role"], block) for block in _blocks(message["content"])]
+
+        marked = [i for i, (_, block) in enumerate(sequence) if isinstance(block, dict) and block.get("cache_control")]
+        prefix = sequence[:marked[-1] + 1] if marked else []
+        total = _tokens(block for _, block in sequence)
+        prefix_tokens = _tokens(block for _, block in prefix)
+        min_tokens = MIN_CACHEABLE_TOKENS.get(body.get("model"), DEFAULT_MIN_CACHEABLE_TOKENS)
+
+        read = write = 0
+        if prefix and prefix_tokens >= min_tokens:
+            key = hashlib.sha256(json.dumps([body.get("model"), [(role, {k: v for k, v in block.items()
+                                                                            if k != "cache_control"})
+                                                                   for role, block in prefix]],
+                                            ensure_ascii=False, sort_keys=True).encode("utf-8")).hexdigest()
+            now = time.time()
+            with self._lock:
+                if now - self._cache.get(key, float("-inf")) <= self.ttl_s:
+                    read = prefix_tokens
+                else:
+                    write = prefix_tokens
+                self._cache[key] = now  # 읽을 때마다 TTL 갱신
+
+        usage = {"input_tokens": total - read - write, "output_tokens": count_tokens(self.reply),
+                 "cache_creation_input_tokens": write, "cache_read_input_tokens": read}
+        with self._lock:
+            self.requests.append({"model": body.get("model"), "prefix_tokens": prefix_tokens, **usage})
+        return {"id": f"msg_mock_{len(self.requests)}", "type": "message", "role": "assistant",
+                "model": body.get("model"), "content": [{"type": "text", "text": self.reply}],
+                "stop_reason": "end_turn", "stop_sequence": None, "usage": usage}
+
+    def start(self):
+        self._thread = threading.Thread(target=self._server.serve_forever, name="mock-anthropic", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._server.shutdown()
+        self._server.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
@@ -0,0 +1,201 @@
+# 🧮 NumPy 전수 검색(brute-force) 벡터 저장소
+# 청크 수천 개 규모에서는 Chroma(SQLite + HNSW)나 FAISS 래퍼보다
+# 정규화된 임베딩 행렬 하나 + 행렬곱 + argpartition 이 더 가볍고 정확하다.
+
+import json
+import os
+import uuid
+
+import numpy as np
+from langchain_core.documents import Document
+from langchain_core.vectorstores import VectorStore
+
+from compact_docstore import MetadataColumns, TextColumn
+
+# ✅ float16 행렬은 BLAS를 못 타기 때문에 블록 단위로 float32 변환 후 곱한다
+_FP16_BLOCK_ROWS = 4096
+
+
+def _normalize(matrix):
+    matrix = np.asarray(matrix, dtype=np.float32)
+    if matrix.ndim == 1:
+        matrix = matrix[None, :]
+    norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return matrix / norms
+
+
+def _take(column, rows):
+    return column.take(rows) if hasattr(column, "take") else [column[i] for i in rows]
+
+
+class NumpyVectorStore(VectorStore):
+    # compact=True: 본문/메타데이터를 열 단위로 저장 (compact_docstore.py), compress=True 면 본문 zstd 압축
+    def __init__(self, embedding, vectors=None, texts=None, metadatas=None, ids=None, dtype="float32",
+                 compact=False, compress=False):
+        self.embedding = embedding
+        self.dtype = np.dtype(dtype)
+        self.compact = compact or isinstance(texts, TextColumn)
+        self.compress = compress
+        if vectors is None:
+            vectors = np.zeros((0, 0), dtype=self.dtype)
+        self._vectors = vectors
+        if self.compact:
+            self._texts = texts.copy() if isinstance(texts, TextColumn) else TextColumn(texts or [], compress=compress)
+            self._metadatas = (metadatas.copy() if isinstance(metadatas, MetadataColumns)
+                               else MetadataColumns(metadatas or [{} for _ in range(len(self._texts))]))
+        else:
+            self._texts = list(texts or [])
+            self._metadatas = list(metadatas or [{} for _ in self._texts])
+        self._ids = list(ids or [str(uuid.uuid4()) for _ in range(len(self._texts))])
+        self._id_to_index = {_id: i for i, _id in enumerate(self._ids)}
+
+    @property
+    def embeddings(self):
+        return self.embedding
+
+    def __len__(self):
+        return len(self._ids)
+
+    def __contains__(self, _id):
+        return _id in self._id_to_index
+
+    # ✅ 문서 추가 (행렬은 항상 연속된 하나의 배열로 유지)
+    def add_texts(self, texts, metadatas=None, ids=None, **kwargs):
+        texts = list(texts)
+        if not texts:
+            return []
+        vectors = kwargs.get("embeddings")
+        if vectors is None:
+            vectors = self.embedding.embed_documents(texts)
+        return self.add_vectors(texts, vectors, metadatas=metadatas, ids=ids)
+
+    def add_vectors(self, texts, vectors, metadatas=None, ids=None):
+        texts = list(texts)
+        metadatas = list(metadatas) if metadatas else [{} for _ in texts]
+        ids = list(ids) if ids else [str(uuid.uuid4()) for _ in texts]
+        new = _normalize(vectors).astype(self.dtype)
+        if len(self._ids) == 0:
+            self._vectors = np.ascontiguousarray(new)
+        else:
+            self._vectors = np.concatenate([np.asarray(self._vectors), new])
+        for _id, text, meta in zip(ids, texts, metadatas):
+            self._id_to_index[_id] = len(self._ids)
+            self._ids.append(_id)
+            self._texts.append(text)
+            self._metadatas.append(dict(meta or {}))
+        return ids
+
+    # 검색 중인 저장소는 건드리지 않고, 복사본에 추가한 뒤 통째로 교체할 때 사용
+    def copy(self):
+        return NumpyVectorStore(self.embedding, vectors=self._vectors, texts=self._texts,
+                                metadatas=self._metadatas, ids=self._ids, dtype=self.dtype,
+                                compact=self.compact, compress=self.compress)
+
+    # 일부 행만 가진 새 저장소 (원본 그대로)
+    def subset(self, rows):
+        return NumpyVectorStore(self.embedding, vectors=np.ascontiguousarray(np.asarray(self._vectors)[rows]),
+                                texts=_take(self._texts, rows), metadatas=_take(self._metadatas, rows),
+                                ids=[self._ids[i] for i in rows], dtype=self.dtype,
+                                compact=self.compact, compress=self.compress)
+
+    # 두 저장소를 합친 새 저장소 (원본 둘 다 그대로)
+    def merged(self, other):
+        store = self.copy()
+        if len(other):
+            store.add_vectors(other._texts, np.asarray(other._vectors), metadatas=other._metadatas, ids=other._ids)
+        return store
+
+    def delete(self, ids=None, **kwargs):
+        if not ids:
+            return False
+        drop = {self._id_to_index[_id] for _id in ids if _id in self._id_to_index}
+        if not drop:
+            return False
+        keep = [i for i in range(len(self._ids)) if i not in drop]
+        self._vectors = np.ascontiguousarray(np.asarray(self._vectors)[keep])
+        self._texts = _take(self._texts, keep)
+        self._metadatas = _take(self._metadatas, keep)
+        self._ids = [self._ids[i] for i in keep]
+        self._id_to_index = {_id: i for i, _id in enumerate(self._ids)}
+        return True
+
+    def get_by_ids(self, ids):
+        return [self._document(self._id_to_index[_id]) for _id in ids if _id in self._id_to_index]
+
+    def _document(self, i):
+        return Document(id=self._ids[i], page_content=self._texts[i], metadata=dict(self._metadatas[i]))
+
+    # ✅ 점수 계산: (쿼리 수, 청크 수) 코사인 유사도 행렬
+    def _scores(self, queries):
+        queries = _normalize(queries)
+        if self.dtype == np.float32:
+            return queries @ np.asarray(self._vectors).T
+        scores = np.empty((queries.shape[0], len(self._ids)), dtype=np.float32)
+        for start in range(0, len(self._ids), _FP16_BLOCK_ROWS):
+            block = np.asarray(self._vectors[start:start + _FP16_BLOCK_ROWS], dtype=np.float32)
+            scores[:, start:start + len(block)] = queries @ block.T
+        return scores
+
+    # ✅ 상위 k개만 argpartition 으로 뽑은 뒤 그 안에서만 정렬
+    def _top_k(self, scores, k):
+        k = min(k, scores.shape[1])
+        if k <= 0:
+            return np.zeros((scores.shape[0], 0), dtype=np.int64)
+        if k == scores.shape[1]:
+            part = np.tile(np.arange(k), (scores.shape[0], 1))
+        else:
+            part = np.argpartition(-scores, k - 1, axis=1)[:, :k]
+        order = np.argsort(-np.take_along_axis(scores, part, axis=1), axis=1)
+        return np.take_along_axis(part, order, axis=1)
+
+    def similarity_search_by_vector_batch(self, vectors, k=4):
+        if len(self._ids) == 0:
+            return [[] for _ in range(len(vectors))]
+        scores = self._scores(vectors)
+        top = self._top_k(scores, k)
+        return [
+            [(self._document(int(i)), float(scores[row, i])) for i in top[row]]
+            for row in range(top.shape[0])
+        ]
+
+    def similarity_search_batch(self, queries, k=4):
+        vectors = self.embedding.embed_documents(list(queries))
+        return self.similarity_search_by_vector_batch(vectors, k=k)
+
+    def similarity_search_with_score(self, query, k=4, **kwargs):
+        vector = self.embedding.embed_query(query)
+        return self.similarity_search_by_vector_batch([vector], k=k)[0]
+
+    def similarity_search_by_vector(self, embedding, k=4, **kwargs):
+        return [doc for doc, _ in self.similarity_search_by_vector_batch([embedding], k=k)[0]]
+
+    def similarity_search(self, query, k=4, **kwargs):
+        return [doc for doc, _ in self.similarity_search_with_score(query, k=k, **kwargs)]
+
+    # 코사인 유사도 [-1, 1] → 관련도 [0, 1]
+    def _select_relevance_score_fn(self):
+        return lambda score: (score + 1.0) / 2.0
+
+    @classmethod
+    def from_texts(cls, texts, embedding, metadatas=None, ids=None, dtype="float32", compact=False, compress=False,
+                   **kwargs):
+        store = cls(embedding, dtype=dtype, compact=compact, compress=compress)
+        store.add_texts(texts, metadatas=metadatas, ids=ids)
+        return store
+
+    # ✅ 디스크 저장 / 불러오기 (mmap=True 이면 행렬을 메모리 매핑으로 연다)
+    def save_local(self, folder_path):
+        os.makedirs(folder_path, exist_ok=True)
+        np.save(os.path.join(folder_path, "vectors.npy"), np.asarray(self._vectors))
+        with open(os.path.join(folder_path, "docs.json"), "w", encoding="utf-8") as f:
+            json.dump({"ids": self._ids, "texts": list(self._texts), "metadatas": list(self._metadatas)}, f,
+                      ensure_ascii=False)
+
+    @classmethod
+    def load_local(cls, folder_path, embedding, mmap=True, compact=False, compress=False):
+        vectors = np.load(os.path.join(folder_path, "vectors.npy"), mmap_mode="r" if mmap else None)
+        with open(os.path.join(folder_path, "docs.json"), encoding="utf-8") as f:
+            data = json.load(f)
+        return cls(embedding, vectors=vectors, texts=data["texts"], metadatas=data["metadatas"],
+                   ids=data["ids"], dtype=vectors.dtype, compact=compact, compress=compress)
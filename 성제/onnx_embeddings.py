@@ -0,0 +1,94 @@
+# ⚡ ONNX Runtime + int8 동적 양자화 임베딩 (CPU 추론용)
+# HuggingFaceEmbeddings(PyTorch fp32) 대신 쓸 수 있는 선택적 백엔드.
+# 필요 패키지: pip install "optimum[onnxruntime]"
+
+import os
+
+import numpy as np
+from langchain_core.embeddings import Embeddings
+
+from token_splitter import model_max_tokens
+
+DEFAULT_ONNX_DIR = os.getenv("ONNX_MODEL_DIR", "onnx_models")
+
+
+def _model_dir(model_name, quantize, base_dir=DEFAULT_ONNX_DIR):
+    suffix = "int8" if quantize else "fp32"
+    return os.path.join(base_dir, model_name.replace("/", "__") + "-" + suffix)
+
+
+# ✅ ONNX 변환 + (선택) int8 동적 양자화. 이미 변환된 모델이 있으면 그대로 사용
+def export_onnx(model_name, quantize=True, base_dir=DEFAULT_ONNX_DIR):
+    out_dir = _model_dir(model_name, quantize, base_dir)
+    model_path = os.path.join(out_dir, "model_quantized.onnx" if quantize else "model.onnx")
+    if os.path.exists(model_path):
+        return model_path
+
+    from optimum.onnxruntime import ORTModelForFeatureExtraction, ORTQuantizer
+    from optimum.onnxruntime.configuration import AutoQuantizationConfig
+    from transformers import AutoTokenizer
+
+    fp32_dir = _model_dir(model_name, False, base_dir)
+    if not os.path.exists(os.path.join(fp32_dir, "model.onnx")):
+        model = ORTModelForFeatureExtraction.from_pretrained(model_name, export=True)
+        model.save_pretrained(fp32_dir)
+        AutoTokenizer.from_pretrained(model_name).save_pretrained(fp32_dir)
+    if not quantize:
+        return model_path
+
+    quantizer = ORTQuantizer.from_pretrained(fp32_dir, file_name="model.onnx")
+    config = AutoQuantizationConfig.avx2(is_static=False, per_channel=False)
+    quantizer.quantize(save_dir=out_dir, quantization_config=config)
+    AutoTokenizer.from_pretrained(fp32_dir).save_pretrained(out_dir)
+    return model_path
+
+
+class OnnxEmbeddings(Embeddings):
+    def __init__(self, model_name, quantize=True, num_threads=None, batch_size=32, base_dir=DEFAULT_ONNX_DIR):
+        import onnxruntime as ort
+        from transformers import AutoTokenizer
+
+        model_path = export_onnx(model_name, quantize=quantize, base_dir=base_dir)
+        self.model_name = model_name
+        self.batch_size = batch_size
+        self.max_length = model_max_tokens(model_name)
+        self.tokenizer = AutoTokenizer.from_pretrained(os.path.dirname(model_path))
+
+        options = ort.SessionOptions()
+        if num_threads:
+            options.intra_op_num_threads = num_threads
+            options.inter_op_num_threads = 1
+        options.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+        self.session = ort.InferenceSession(model_path, options, providers=["CPUExecutionProvider"])
+        self.input_names = {i.name for i in self.session.get_inputs()}
+
+    # ✅ sentence-transformers 와 같은 mean pooling (ko-sbert-nli / ko-sroberta-multitask 설정)
+    def _encode(self, texts):
+        enc = self.tokenizer(texts, padding=True, truncation=True, max_length=self.max_length, return_tensors="np")
+        feeds = {k: v.astype(np.int64) for k, v in enc.items() if k in self.input_names}
+        hidden = self.session.run(None, feeds)[0]
+        mask = enc["attention_mask"][..., None].astype(np.float32)
+        return (hidden * mask).sum(axis=1) / np.clip(mask.sum(axis=1), 1e-9, None)
+
+    def embed_documents(self, texts):
+        texts = list(texts)
+        # 길이가 비슷한 문장끼리 묶어야 패딩 낭비가 줄어든다
+        order = sorted(range(len(texts)), key=lambda i: len(texts[i]))
+        vectors = [None] * len(texts)
+        for start in range(0, len(order), self.batch_size):
+            batch = order[start:start + self.batch_size]
+            for i, vector in zip(batch, self._encode([texts[i] for i in batch])):
+                vectors[i] = vector.tolist()
+        return vectors
+
+    def embed_query(self, text):
+        return self._encode([text])[0].tolist()
+
+
+# ✅ 환경변수로 임베딩 백엔드 선택 (EMBEDDING_BACKEND=onnx, ONNX_THREADS=4)
+def load_embeddings(model_name):
+    if os.getenv("EMBEDDING_BACKEND", "torch") == "onnx":
+        threads = os.getenv("ONNX_THREADS")
+        return OnnxEmbeddings(model_name, num_threads=int(threads) if threads else None)
+    from langchain_community.embeddings import HuggingFaceEmbeddings
+    return HuggingFaceEmbeddings(model_name=model_name)
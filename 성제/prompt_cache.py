@@ -0,0 +1,164 @@
+# 📦 Claude 프롬프트 접두부(prefix) 캐시
+# 요청마다 같은 시스템 지시문과 자주 검색되는 문단을 다시 보내면 매번 입력 처리 비용을 전부 낸다.
+# 바뀌지 않는 부분(지시문 → 자주 찾는 문단, 항상 같은 순서)을 앞에 모으고 cache_control 을 달아
+# 제공자 쪽 프롬프트 캐시를 쓰게 한다. 질문마다 다른 문단과 질문은 그 뒤(human 메시지)에 붙인다.
+# 캐시 읽기/쓰기 토큰은 응답의 usage(cache_read_input_tokens / cache_creation_input_tokens)로 집계한다.
+
+import hashlib
+import logging
+import os
+import threading
+from collections import Counter
+
+from langchain_core.messages import HumanMessage, SystemMessage
+
+from adaptive_k import count_tokens
+from deadline import format_docs
+
+logger = logging.getLogger(__name__)
+
+HOT_PASSAGES = int(os.getenv("PROMPT_CACHE_HOT_PASSAGES", "24"))
+REFRESH_EVERY = int(os.getenv("PROMPT_CACHE_REFRESH_EVERY", "50"))
+# 갱신 때 상위 문단 말고도 이만큼까지만 횟수/본문을 남긴다 (나머지는 버려 메모리가 계속 늘지 않게)
+TRACKED_PASSAGES = int(os.getenv("PROMPT_CACHE_TRACKED_PASSAGES", "512"))
+
+# 이보다 짧은 접두부는 캐시되지 않는다 (Claude 3 Haiku 2048, Sonnet/Opus 1024 토큰)
+MIN_CACHEABLE_TOKENS = {"claude-3-haiku-20240307": 2048, "claude-3-5-haiku-20241022": 2048}
+DEFAULT_MIN_CACHEABLE_TOKENS = 1024
+
+
+def passage_key(doc):
+    # 재색인으로 청크 id 가 바뀌어도 같은 본문이면 같은 키
+    return hashlib.sha1(doc.page_content.encode("utf-8")).hexdigest()[:16]
+
+
+# ✅ 자주 검색되는 문단 집계. 접두부가 자주 바뀌면 캐시를 매번 새로 써야 하므로 refresh_every 질문마다만 갱신
+class PassageFrequency:
+    def __init__(self, hot_size=HOT_PASSAGES, refresh_every=REFRESH_EVERY, tracked=TRACKED_PASSAGES):
+        self.hot_size = hot_size
+        self.refresh_every = refresh_every
+        self.tracked = max(tracked, hot_size)
+        self._lock = threading.Lock()
+        self._counts = Counter()
+        self._texts = {}
+        self.queries = 0
+        self.version = 0
+        self.hot = []  # [(키, 본문)] 키 순서로 고정
+
+    def record(self, docs):
+        with self._lock:
+            for doc in docs:
+                key = passage_key(doc)
+                self._counts[key] += 1
+                self._texts[key] = doc.page_content
+            self.queries += 1
+            if self.queries % self.refresh_every == 0:
+                self._refresh()
+
+    def _refresh(self):
+        ranked = sorted(self._counts.items(), key=lambda item: (-item[1], item[0]))[:self.tracked]
+        hot = sorted((key, self._texts[key]) for key, _ in ranked[:self.hot_size])
+        self._counts = Counter(dict(ranked))
+        self._texts = {key: self._texts[key] for key in self._counts}
+        if hot != self.hot:
+            self.hot = hot
+            self.version += 1
+            logger.info("prompt cache prefix v%d: %d passages", self.version, len(hot))
+
+
+# ✅ 캐시 읽기/쓰기 토큰 집계
+class PromptCacheStats:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.requests = 0
+        self.input_tokens = 0
+        self.cache_read_tokens = 0
+        self.cache_write_tokens = 0
+        self.output_tokens = 0
+
+    def record(self, usage):
+        with self._lock:
+            self.requests += 1
+            self.input_tokens += usage["input_tokens"]
+            self.cache_read_tokens += usage["cache_read"]
+            self.cache_write_tokens += usage["cache_write"]
+            self.output_tokens += usage["output_tokens"]
+
+    def as_dict(self):
+        prompt = self.input_tokens + self.cache_read_tokens + self.cache_write_tokens
+        return {
+            "requests": self.requests,
+            "input_tokens": self.input_tokens,
+            "cache_read_tokens": self.cache_read_tokens,
+            "cache_write_tokens": self.cache_write_tokens,
+            "output_tokens": self.output_tokens,
+            "read_ratio": self.cache_read_tokens / prompt if prompt else 0.0,
+        }
+
+
+# 응답 메시지의 usage (ChatAnthropic 은 response_metadata["usage"] 에 원본 usage 를 넣는다)
+def cache_usage(message):
+    usage = dict((getattr(message, "response_metadata", None) or {}).get("usage") or {})
+    return {
+        "input_tokens": usage.get("input_tokens") or 0,
+        "cache_read": usage.get("cache_read_input_tokens") or 0,
+        "cache_write": usage.get("cache_creation_input_tokens") or 0,
+        "output_tokens": usage.get("output_tokens") or 0,
+    }
+
+
+# ✅ DeadlineRAG 의 generate_chain 자리에 쓰는 답변 체인 (invoke({"context", "input", "docs"}) → 답변 문자열)
+# 여러 세션이 같이 쓰면 shared_store(공용 문서 저장소를 돌려주는 함수)를 준다:
+# 그 저장소에 있는 청크만 집계해서 한 세션의 업로드 문서가 다른 세션 요청의 접두부에 들어가지 않게 한다
+class CachedPromptChain:
+    def __init__(self, llm, instructions, model=None, frequency=None, stats=None, shared_store=None):
+        self.llm = llm
+        self.instructions = instructions
+        model = model or getattr(llm, "model", None)
+        self.min_tokens = MIN_CACHEABLE_TOKENS.get(model, DEFAULT_MIN_CACHEABLE_TOKENS)
+        self.frequency = frequency or PassageFrequency()
+        self.stats = stats or PromptCacheStats()
+        self.shared_store = shared_store
+
+    # 현재 접두부 추정 토큰 수와 캐시 가능 여부
+    def prefix_tokens(self):
+        tokens = count_tokens(self.instructions) + sum(count_tokens(text) for _, text in self.frequency.hot)
+        return tokens, tokens >= self.min_tokens
+
+    def build_messages(self, inputs):
+        hot = list(self.frequency.hot)
+        docs = inputs.get("docs")
+        system = [{"type": "text", "text": self.instructions}]
+        if hot:
+            passages = "\n\n".join(f"[{i}] {text}" for i, (_, text) in enumerate(hot, 1))
+            system.append({"type": "text", "text": f"자주 찾는 문서:\n\n{passages}"})
+        # 최소 길이(min_tokens)보다 짧으면 제공자가 캐시하지 않고 그냥 처리한다 (비용 차이 없음)
+        system[-1]["cache_control"] = {"type": "ephemeral"}
+
+        if docs is None:
+            context = inputs.get("context", "")
+        else:
+            numbers = {key: i for i, (key, _) in enumerate(hot, 1)}
+            cited = [numbers[passage_key(d)] for d in docs if passage_key(d) in numbers]
+            rest = [d for d in docs if passage_key(d) not in numbers]
+            context = format_docs(rest)
+            if cited:
+                context = f"관련 문서 번호: {', '.join(f'[{n}]' for n in cited)}\n\n{context}".rstrip()
+        human = f"참고 문서:\n{context}\n\n질문: {inputs['input']}" if context else inputs["input"]
+        return [SystemMessage(content=system), HumanMessage(content=human)]
+
+    def invoke(self, inputs, config=None):
+        messages = self.build_messages(inputs)
+        docs = inputs.get("docs")
+        if docs is not None:
+            if self.shared_store is not None:
+                store = self.shared_store()
+                docs = [d for d in docs if d.id is not None and d.id in store]
+            self.frequency.record(docs)
+        response = self.llm.invoke(messages, config=config)
+        usage = cache_usage(response)
+        self.stats.record(usage)
+        logger.info("prompt cache read %d / write %d / uncached %d tokens",
+                    usage["cache_read"], usage["cache_write"], usage["input_tokens"])
+        return response.content if isinstance(response.content, str) else "".join(
+            block.get("text", "") for block in response.content if isinstance(block, dict))
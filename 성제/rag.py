@@ -1,19 +1,42 @@
 import streamlit as st
 import base64
-import random
 import os
 import glob
-import tempfile
+import time
 
+from lazy_imports import PROFILE_ENABLED, format_startup_report, lazy_from, mark, startup_step
 from dotenv import load_dotenv
-from langchain_community.document_loaders import PyPDFLoader
-from langchain.text_splitter import RecursiveCharacterTextSplitter
-from langchain_community.vectorstores import FAISS
-from langchain_community.embeddings import HuggingFaceEmbeddings
-from langchain_core.prompts import ChatPromptTemplate
-from langchain_core.runnables import RunnablePassthrough
-from langchain_core.output_parsers import StrOutputParser
-from langchain_anthropic import ChatAnthropic
+
+from chat_render import DEFAULT_MASCOT, image_bytes, message_html, pick_mascot, render_history
+from deadline import DEFAULT_BUDGET_S, DeadlineRAG
+from eval_set import FAQ_QUESTIONS
+from fast_path import FastPathRouter, calendar_markdown
+from session_registry import SessionRegistry
+from warmup import Warmup, rag_warmup_steps
+
+# ✅ langchain / numpy / transformers 를 끌어오는 모듈은 처음 쓸 때 불러온다 (첫 화면을 먼저 띄우기 위해)
+AdaptiveKRetriever, AdaptiveStats = lazy_from("adaptive_k", "AdaptiveKRetriever", "AdaptiveStats")
+ConversationMemory, = lazy_from("conversation", "ConversationMemory")
+NumpyVectorStore, = lazy_from("numpy_store", "NumpyVectorStore")
+CorpusWatcher, = lazy_from("index_watcher", "CorpusWatcher")
+HierarchicalRetriever, = lazy_from("hierarchical", "HierarchicalRetriever")
+IndexHolder, IngestWorker, ingest_pdf = lazy_from("ingest_worker", "IndexHolder", "IngestWorker", "ingest_pdf")
+client_stats, get_chat_model = lazy_from("llm_clients", "client_stats", "get_chat_model")
+load_embeddings, = lazy_from("onnx_embeddings", "load_embeddings")
+CachedPromptChain, = lazy_from("prompt_cache", "CachedPromptChain")
+CrossEncoderReranker, RerankRetriever = lazy_from("reranker", "CrossEncoderReranker", "RerankRetriever")
+SemanticCache, = lazy_from("semantic_cache", "SemanticCache")
+TokenAwareSplitter, = lazy_from("token_splitter", "TokenAwareSplitter")
+UsageMeter, = lazy_from("usage_meter", "UsageMeter")
+
+EMBEDDING_MODEL = "jhgan/ko-sbert-nli"
+ANSWER_MODES = {"AI 답변": "rag", "검색만 (빠름)": "search"}
+RERANK_ENABLED = os.getenv("RERANK", "0") == "1"
+ADMIN_VIEW = os.getenv("ADMIN_VIEW", "0") == "1"
+PROMPT_CACHE_ENABLED = os.getenv("PROMPT_CACHE", "1") == "1"
+FAST_PATH_ENABLED = os.getenv("FAST_PATH", "1") == "1"
+ANSWER_INSTRUCTIONS = ("당신은 경북대학교에 관한 정보를 제공하는 AI 도우미입니다. "
+                       "아래 문서 내용을 참고하여 정확하고 공손하게 한국어로 답변해 주세요. 이모지도 함께 사용하세요.")
 
 # ✅ API 키 불러오기
 load_dotenv()
@@ -30,48 +53,154 @@ def load_logo_base64(path):
 
 logo_base64 = load_logo_base64("assets/knu_logo.png")
 
-# ✅ PDF 전부 로딩 함수 (data/*.pdf)
-def load_all_pdfs_from_folder(folder_path):
-    pages = []
-    for path in glob.glob(os.path.join(folder_path, "*.pdf")):
-        loader = PyPDFLoader(path)
-        pages.extend(loader.load_and_split())
-    return pages
+# ✅ 분할기 / 임베딩 모델 (프로세스 당 한 번, 준비 단계(start_warmup)가 백그라운드에서 만든다)
+def build_components():
+    # 임베딩 모델이 128 토큰에서 자르므로 같은 토크나이저 기준으로 분할
+    with startup_step("tokenizer"):
+        splitter = TokenAwareSplitter.from_model(EMBEDDING_MODEL)
+    with startup_step("embedding model"):
+        embeddings = load_embeddings(EMBEDDING_MODEL)
+    return splitter, embeddings
 
-# ✅ RAG 체인 생성
-@st.cache_resource
-def create_rag_chain(uploaded_file=None, use_only_uploaded=False):
-    pages = []
+# ✅ 기본 문서 인덱스 (data/ 를 감시하다가 바뀐 파일만 백그라운드에서 재색인 후 교체)
+def build_corpus(splitter, embeddings):
+    corpus = CorpusWatcher(["data"], splitter, embeddings)
+    with startup_step("corpus index"):
+        corpus.refresh()
+    return corpus.start()
 
-    if uploaded_file:
-        with tempfile.NamedTemporaryFile(delete=False, suffix=".pdf") as tmp:
-            tmp.write(uploaded_file.getvalue())
-            tmp_path = tmp.name
-        loader = PyPDFLoader(tmp_path)
-        pages.extend(loader.load_and_split())
+# 준비가 끝난 뒤 스크립트 스레드에서 꺼내 쓴다 (백그라운드 작업에는 꺼낸 객체를 넘긴다)
+def load_components():
+    return start_warmup().results["components"]
+
+def load_corpus():
+    return start_warmup().results["corpus"]
+
+# ✅ 업로드 문서 색인 작업자 (모든 세션 공용)
+@st.cache_resource
+def load_ingest_worker():
+    return IngestWorker()
 
-    if not use_only_uploaded:
-        pages.extend(load_all_pdfs_from_folder("data"))
+# ✅ 답변 생성 모델 (공용 클라이언트, 준비 단계의 연결 확인도 같은 클라이언트로)
+# 생성이 응답 예산을 넘기면 검색 결과만으로 답변 (LLM 요청도 같은 시간에 끊김)
+def answer_llm():
+    return get_chat_model("anthropic", "claude-3-haiku-20240307", timeout=DEFAULT_BUDGET_S, max_retries=0)
 
-    splitter = RecursiveCharacterTextSplitter(chunk_size=1000, chunk_overlap=100)
-    docs = splitter.split_documents(pages)
-    embeddings = HuggingFaceEmbeddings(model_name="jhgan/ko-sbert-nli")
-    vectorstore = FAISS.from_documents(docs, embeddings)
-    retriever = vectorstore.as_retriever()
+# ✅ 답변 생성 체인 (프롬프트 + Claude)
+# PROMPT_CACHE=1 이면 지시문 + 자주 찾는 문단을 고정 접두부로 보내 Claude 프롬프트 캐시를 쓴다
+# (모든 세션 공용이라 자주 찾는 문단은 기본 문서 인덱스의 청크만 센다, 업로드 문서는 세지 않음)
+@st.cache_resource
+def create_answer_chain():
+    if PROMPT_CACHE_ENABLED:
+        corpus = load_corpus()
+        return CachedPromptChain(answer_llm(), ANSWER_INSTRUCTIONS, shared_store=lambda: corpus.holder.get())
+    from langchain_core.output_parsers import StrOutputParser
+    from langchain_core.prompts import ChatPromptTemplate
 
     prompt = ChatPromptTemplate.from_messages([
-        ("system", "당신은 경북대학교에 관한 정보를 제공하는 AI 도우미입니다. "
-                   "아래 문서 내용을 참고하여 정확하고 공손하게 한국어로 답변해 주세요. 이모지도 함께 사용하세요.\n\n{context}"),
+        ("system", ANSWER_INSTRUCTIONS + "\n\n{context}"),
         ("human", "{input}")
     ])
+    return prompt | answer_llm() | StrOutputParser()
+
+# ✅ 고정 k(4) 대비 절약한 문맥 토큰 (모든 세션 누적)
+@st.cache_resource
+def load_adaptive_stats():
+    return AdaptiveStats(fixed_k=4)
+
+# ✅ 토큰/비용 집계 + 예산 (USAGE_BUDGET_SESSION_USD / USAGE_BUDGET_DAILY_USD 를 넘으면 검색 결과만으로 답변)
+@st.cache_resource
+def load_usage_meter():
+    return UsageMeter()
+
+# ✅ 재정렬 모델 (RERANK=1 일 때만, 프로세스 당 한 번)
+@st.cache_resource
+def load_reranker():
+    return CrossEncoderReranker()
+
+# ✅ RAG 체인 생성: 검색은 holder 가 가리키는 최신 인덱스에서 (관련 문서 먼저 고른 뒤 청크 검색)
+# 보낼 문단 수는 점수 분포를 보고 질문마다 1~6개로 정한다
+# RERANK=1 이면 12개를 가져와 cross-encoder 로 다시 매긴 뒤 상위 3개만 보낸다
+def create_rag_chain(holder):
+    if RERANK_ENABLED:
+        retriever = RerankRetriever(base=HierarchicalRetriever(holder=holder, k=12), reranker=load_reranker())
+        return DeadlineRAG(retriever, create_answer_chain(), meter=load_usage_meter())
+    hierarchical = HierarchicalRetriever(holder=holder)
+    retriever = AdaptiveKRetriever(search=lambda query, k, vector=None:
+                                   hierarchical.search_with_score(query, k=k, vector=vector),
+                                   stats=load_adaptive_stats())
+    return DeadlineRAG(retriever, create_answer_chain(), meter=load_usage_meter())
+
+# ✅ 학사일정/건물 위치 질문은 검색·LLM 없이 정형 데이터로 바로 답변 (모든 세션 공용)
+@st.cache_resource
+def load_fast_path():
+    return FastPathRouter()
+
+# ✅ 의미 기반 질문 캐시 (모든 세션 공용, 질문 임베딩은 검색과 같은 모델)
+@st.cache_resource
+def load_semantic_cache():
+    _, embeddings = load_components()
+    return SemanticCache(embeddings)
+
+# ✅ 세션별 대화 기억 (후속 질문 바꿔쓰기 + 오래된 대화 요약용 가벼운 호출, 사용량은 이 세션으로 집계)
+def create_memory(session_id):
+    return ConversationMemory(get_chat_model("anthropic", "claude-3-haiku-20240307", timeout=5, max_retries=0,
+                                             max_tokens=400), meter=load_usage_meter(), session=session_id)
 
-    return (
-        {"context": retriever | (lambda docs: "\n\n".join(d.page_content for d in docs)),
-         "input": RunnablePassthrough()}
-        | prompt
-        | ChatAnthropic(model="claude-3-haiku-20240307")
-        | StrOutputParser()
-    )
+# ✅ 세션별 인덱스/체인/대화 기억 (모든 세션 공용 레지스트리, 메모리 상한을 넘으면 오래 안 쓴 세션부터 정리)
+@st.cache_resource
+def load_session_registry():
+    # 기본 문서 인덱스(와 그 문서 인덱스)·재정렬 모델은 모든 세션이 같이 쓰므로 세션 사용량에 넣지 않는다
+    # (색인 작업자 스레드에서도 refresh 하므로 공용 객체는 여기서 미리 꺼내 둔다)
+    corpus = load_corpus()
+    shared = [load_reranker()] if RERANK_ENABLED else []
+    return SessionRegistry(shared=lambda: [corpus.holder.get()] + shared)
+
+def current_session_id():
+    from streamlit.runtime.scriptrunner import get_script_run_ctx
+    return get_script_run_ctx().session_id
+
+def session_resources(session_id):
+    registry = load_session_registry()
+    resources = registry.get(session_id)
+    if resources is None:
+        if st.session_state.get("session_registered"):
+            # 정리된 세션: 업로드 파일은 위젯에 남아 있으므로 다시 색인하게 한다
+            st.session_state["last_upload_key"] = None
+            st.info("ℹ️ 오래 사용하지 않아 세션 자원을 정리했습니다. 대화 맥락과 업로드 문서 색인을 새로 시작합니다.")
+        holder = IndexHolder(load_corpus().holder.get())
+        resources = {"indexes": {}, "holder": holder, "rag_chain": create_rag_chain(holder),
+                     "memory": create_memory(session_id)}
+        registry.put(session_id, resources)
+        st.session_state["session_registered"] = True
+    return resources
+
+# ✅ 세션이 검색할 인덱스: 기본 문서 / 업로드 문서만 / 기본 + 업로드
+def session_index(indexes, base, use_only_uploaded):
+    uploaded = indexes.get("uploaded")
+    if uploaded is None:
+        return base
+    if use_only_uploaded:
+        return uploaded
+    # 기본 문서 인덱스가 새 버전으로 바뀌었으면 합친 인덱스도 다시 만든다
+    if indexes.get("combined_base") is not base:
+        indexes["combined"], indexes["combined_base"] = base.merged(uploaded), base
+    return indexes["combined"]
+
+# ✅ 업로드 색인이 끝나면 세션 인덱스를 만들어 교체
+# (done 은 색인 작업자 스레드에서 불리므로 st.cache_resource 객체는 스크립트 스레드에서 꺼내 넘긴다)
+def on_upload_indexed(indexes, holder, upload_key, use_only_uploaded, session_id, embeddings, corpus, registry):
+    def done(result):
+        # 그 사이 다른 파일이 올라왔으면 이 결과는 버린다
+        if indexes.get("upload_key") != upload_key:
+            return
+        docs, vectors = result
+        uploaded = NumpyVectorStore(embeddings)
+        uploaded.add_vectors([d.page_content for d in docs], vectors, metadatas=[d.metadata for d in docs])
+        indexes["uploaded"] = uploaded
+        holder.swap(session_index(indexes, corpus.holder.get(), use_only_uploaded))
+        registry.refresh(session_id)
+    return done
 
 # ✅ 페이지 설정
 st.set_page_config(page_title="📘 경북대 챗봇", layout="centered")
@@ -80,17 +209,13 @@ st.set_page_config(page_title="📘 경북대 챗봇", layout="centered")
 with st.sidebar:
     st.image("assets/knu_logo2.png", width=200)
     st.markdown("### 학사일정")
-    st.markdown("""
-    - 🗓️ 개강: **2025.09.01**
-    - 📦 수강꾸러미 신청: **07.22 ~ 07.24**
-    - 🖋️ 수강신청: **08.12 ~ 08.14**
-    - 📝 중간고사: **10.22 ~ 10.28**
-    - 💳 등록금 납부: **08.25 ~ 08.28**
-    """)
+    # 빠른 경로(fast_path.py)가 답하는 학사일정과 같은 표
+    st.markdown(calendar_markdown())
 
     st.markdown("### 📤 PDF 업로드")
     uploaded_file = st.file_uploader("문서 업로드 (선택)", type=["pdf"])
     mode = st.radio("문서 사용 방식", ["기본 문서 + 업로드 문서", "업로드 문서만 사용"])
+    answer_mode = st.radio("답변 방식", ["AI 답변", "검색만 (빠름)"])
 
     st.markdown("### 📄 기본 문서 다운로드")
     for path in glob.glob("data/*.pdf"):
@@ -99,21 +224,114 @@ with st.sidebar:
 
 # ✅ 세션 상태 초기화 및 체인 구성
 if "messages" not in st.session_state:
-    st.session_state["messages"] = [{"role": "assistant", "content": "안녕하세요! 📘 경북대 학사 도우미입니다. 무엇이든 물어보세요!"}]
-
-if (
-    "rag_chain" not in st.session_state or
-    "last_uploaded_name" not in st.session_state or
-    "last_mode" not in st.session_state or
-    st.session_state["last_uploaded_name"] != (uploaded_file.name if uploaded_file else None) or
-    st.session_state["last_mode"] != mode
-):
-    st.session_state["rag_chain"] = create_rag_chain(
-        uploaded_file=uploaded_file,
-        use_only_uploaded=(mode == "업로드 문서만 사용")
-    )
-    st.session_state["last_uploaded_name"] = uploaded_file.name if uploaded_file else None
-    st.session_state["last_mode"] = mode
+    st.session_state["messages"] = [{"role": "assistant", "content": "안녕하세요! 📘 경북대 학사 도우미입니다. 무엇이든 물어보세요!",
+                                     "mascot": "assets/mascot_hello.png"}]
+
+mark("first render (sidebar)")
+
+# ✅ 서버 준비 (프로세스 당 한 번, 백그라운드): 모델 → 인덱스 → 더미 검색 → (WARMUP_PING=1) LLM 연결
+# 준비 스레드는 st.cache_resource 함수를 부르지 않고 만든 객체를 results 에 남긴다 (load_components / load_corpus)
+@st.cache_resource
+def start_warmup():
+    results = {}
+    steps = rag_warmup_steps(build_components, build_corpus, answer_llm, results=results)
+    return Warmup(steps, results=results).start()
+
+warmup = start_warmup()
+if not warmup.ready.is_set():
+    placeholder = st.empty()
+    while not warmup.wait(0.5) and not warmup.failed:
+        placeholder.progress(warmup.progress(), text=f"🔥 챗봇 준비 중... ({warmup.current or '시작'})")
+    placeholder.empty()
+    if warmup.failed:
+        start_warmup.clear()  # 다음 접속 때 다시 시도
+        st.error(f"❌ 챗봇 준비 실패: {warmup.error}")
+        st.stop()
+
+corpus = load_corpus()
+session_id = current_session_id()
+resources = session_resources(session_id)
+indexes = resources["indexes"]
+holder = resources["holder"]
+use_only_uploaded = mode == "업로드 문서만 사용"
+
+# 📥 새 파일이 올라오면 백그라운드 색인만 걸어두고, 답변은 기존 인덱스로 계속한다
+upload_key = (uploaded_file.name, uploaded_file.size) if uploaded_file else None
+if st.session_state.get("last_upload_key") != upload_key:
+    st.session_state["last_upload_key"] = upload_key
+    indexes.clear()
+    indexes["upload_key"] = upload_key
+    st.session_state["ingest_job"] = None
+    if uploaded_file:
+        splitter, embeddings = load_components()
+        st.session_state["ingest_job"] = load_ingest_worker().submit(
+            uploaded_file.name, ingest_pdf, uploaded_file.getvalue(), uploaded_file.name, splitter, embeddings,
+            on_done=on_upload_indexed(indexes, holder, upload_key, use_only_uploaded, session_id, embeddings, corpus,
+                                      load_session_registry()),
+        )
+
+# 문서 사용 방식 + 최신 기본 인덱스 버전에 맞게 교체 (업로드 색인 중이면 기존 인덱스 유지)
+holder.swap(session_index(indexes, corpus.holder.get(), use_only_uploaded))
+load_session_registry().refresh(session_id)
+
+# ✅ 색인 진행률 (1초마다 이 부분만 다시 그림)
+@st.fragment(run_every=1)
+def show_ingest_progress():
+    job_id = st.session_state.get("ingest_job")
+    job = load_ingest_worker().get(job_id) if job_id else None
+    if job is None:
+        return
+    if job.status == "error":
+        st.error(f"❌ {job.name} 색인 실패: {job.error}")
+    elif job.done:
+        if st.session_state.get("ingest_announced") != job.id:
+            st.session_state["ingest_announced"] = job.id
+            st.rerun()
+        st.success(f"✅ {job.name} 색인 완료")
+    else:
+        st.progress(job.progress, text=f"📥 {job.name}: {job.message} (기존 문서로 계속 답변 중)")
+
+with st.sidebar:
+    show_ingest_progress()
+    if corpus.last_reload:
+        st.caption(f"🔄 문서 인덱스 v{corpus.last_reload['version']} ({len(corpus.holder.get())}개 청크)")
+    adaptive = load_adaptive_stats().as_dict()
+    if adaptive["queries"]:
+        st.caption(f"🎚️ 평균 문단 {adaptive['avg_k']:.1f}개, 문맥 토큰 {adaptive['saved_ratio']:.0%} 절약")
+    llm_stats = client_stats().get("anthropic")
+    if llm_stats and llm_stats["requests"]:
+        st.caption(f"🔌 LLM 연결 재사용 {llm_stats['reuse_ratio']:.0%} "
+                   f"({llm_stats['requests']}회 요청 / 새 연결 {llm_stats['new_connections']}개)")
+    if PROMPT_CACHE_ENABLED and create_answer_chain().stats.requests:
+        prompt_stats = create_answer_chain().stats.as_dict()
+        st.caption(f"📦 프롬프트 캐시 읽기 {prompt_stats['cache_read_tokens']:,} / 쓰기 "
+                   f"{prompt_stats['cache_write_tokens']:,} / 일반 {prompt_stats['input_tokens']:,} 토큰 "
+                   f"(입력의 {prompt_stats['read_ratio']:.0%} 캐시)")
+    session_usage = load_usage_meter().totals("session", session_id)
+    if session_usage["requests"]:
+        day_usage = load_usage_meter().totals("day", time.strftime("%Y-%m-%d"))
+        st.caption(f"💰 이 대화 ${session_usage['cost_usd']:.4f} ({session_usage['input_tokens']:,}+"
+                   f"{session_usage['output_tokens']:,} 토큰), 오늘 전체 ${day_usage['cost_usd']:.2f}")
+    fast_path = load_fast_path().as_dict()
+    if fast_path["fast"]:
+        st.caption(f"⚡ 바로 답변 {fast_path['share']:.0%} ({fast_path['fast']}/{fast_path['requests']}, "
+                   f"학사일정 {fast_path['calendar']} · 위치 {fast_path['location']}, 평균 {fast_path['avg_us']:.0f}µs)")
+    semantic_cache = load_semantic_cache()
+    if semantic_cache.stats["lookups"]:
+        st.caption(f"🧠 질문 캐시 적중률 {semantic_cache.hit_rate:.0%} "
+                   f"({semantic_cache.stats['hits']}/{semantic_cache.stats['lookups']}, {len(semantic_cache)}개 저장)")
+    st.caption(f"🔥 준비 단계 {sum(step['seconds'] for step in warmup.timings):.1f}초 "
+               f"({', '.join(step['step'] for step in warmup.timings)})")
+    if ADMIN_VIEW or st.query_params.get("admin") == "1":
+        usage = load_session_registry().usage()
+        with st.expander(f"🗃️ 세션 메모리 {usage['total_mb']:.1f} / {usage['cap_mb']:.0f}MB"):
+            st.caption(f"세션 {len(usage['sessions'])}개, 정리된 세션 {usage['evictions']}개")
+            st.dataframe([{"세션": s["session"], "MB": round(s["mb"], 2), "유휴(초)": int(s["idle_s"]),
+                           "생성 후(초)": int(s["age_s"])} for s in usage["sessions"]], hide_index=True)
+    if PROFILE_ENABLED:
+        mark("sidebar ready (index loaded)")
+        with st.expander("⏱️ 시작 시간 (STARTUP_PROFILE=1)"):
+            st.code(format_startup_report())
 
 # ✅ 상단 로고 및 타이틀
 st.markdown(f"""
@@ -123,41 +341,79 @@ st.markdown(f"""
     </div>
 """, unsafe_allow_html=True)
 
-# ✅ 이전 메시지 출력
-for i, msg in enumerate(st.session_state["messages"]):
-    if msg["role"] == "assistant":
-        mascot = "assets/mascot_hello.png" if i == 0 else (
-            "assets/mascot_graduate.png" if any(k in st.session_state["messages"][i-1]["content"] for k in ["졸업", "학위"]) else random.choice([
-                "assets/mascot.png", "assets/mascot_love.png", "assets/mascot_alarm.png"])
-        )
-        col1, col2 = st.columns([1, 8])
-        with col1: st.image(mascot, width=120)
-        with col2:
-            st.markdown(f"<div style='background:#fff;padding:15px;border-radius:20px;border:1px solid #ddd;'>{msg['content']}</div>", unsafe_allow_html=True)
-    else:
-        st.markdown(f"""
+# ✅ 이전 메시지 출력 (최근 메시지만, 말풍선 HTML 은 메시지마다 한 번만 생성)
+def assistant_html(content):
+    return f"<div style='background:#fff;padding:15px;border-radius:20px;border:1px solid #ddd;'>{content}</div>"
+
+def user_html(content):
+    return f"""
             <div style='text-align:right;margin-bottom:15px;'>
                 <div style='display:inline-block;background:#b71c1c;color:white;padding:15px 20px;border-radius:20px;'>
-                    {msg['content']}
+                    {content}
                 </div>
             </div>
-        """, unsafe_allow_html=True)
+        """
+
+def render_message(msg):
+    if msg["role"] == "assistant":
+        col1, col2 = st.columns([1, 8])
+        with col1: st.image(image_bytes(msg.get("mascot", DEFAULT_MASCOT)), width=120)
+        with col2:
+            st.markdown(message_html(msg, assistant_html), unsafe_allow_html=True)
+    else:
+        st.markdown(message_html(msg, user_html), unsafe_allow_html=True)
+
+render_history(st.session_state["messages"], render_message)
+
+# ✅ 질문 → (대화 맥락 반영한 독립 질문) → 답변 → 대화 기억에 기록
+# 캐시된 답은 같은 인덱스로 만든 것만 쓴다 (기본 문서는 세션끼리 공유, 업로드 문서는 세션 전용)
+def index_version():
+    if holder.get() is corpus.holder.get():
+        return ("base", corpus.holder.version)
+    return ("session", id(holder), holder.version)
+
+def ask(question):
+    mode = ANSWER_MODES[answer_mode]
+    memory = resources["memory"]
+    # 업로드 문서를 쓰는 세션은 내장 표 대신 그 문서에서 찾는다
+    if FAST_PATH_ENABLED and not use_only_uploaded and indexes.get("uploaded") is None:
+        answer = load_fast_path().route(question)
+        if answer is not None:
+            memory.add(question, answer)
+            return answer
+    standalone = memory.condense(question, use_llm=mode == "rag")
+    if mode == "rag":
+        cache = load_semantic_cache()
+        version = index_version()
+        # 질문 캐시와 검색이 같은 임베딩 모델(load_components)이라 질문 임베딩은 한 번만
+        vector = cache.embeddings.embed_query(standalone)
+        answer = cache.lookup(standalone, version, vector=vector)
+        if answer is None:
+            result = resources["rag_chain"].answer(standalone, mode=mode, session=session_id, vector=vector)
+            answer = result["answer"]
+            # 시간 초과로 검색 결과만 보낸 답은 저장하지 않는다
+            if not result["fallback"]:
+                cache.put(standalone, answer, version, vector=vector)
+    else:
+        answer = resources["rag_chain"].invoke(standalone, mode=mode)
+    memory.add(question, answer)
+    return answer
 
 # ✅ 자주 묻는 질문 버튼
-faq = ["휴학은 어떻게 하나요?", "복학 신청은 어디서 하나요?", "수강신청 일정은 언제인가요?", "성적 열람은 어디서 하나요?", "학생증 발급은 어떻게 하나요?"]
+faq = FAQ_QUESTIONS
 cols = st.columns(len(faq))
 for i, q in enumerate(faq):
     if cols[i].button(q):
         st.session_state["messages"].append({"role": "user", "content": q})
         with st.spinner("답변 생성 중..."):
-            res = st.session_state["rag_chain"].invoke(q)
-            st.session_state["messages"].append({"role": "assistant", "content": res})
+            res = ask(q)
+            st.session_state["messages"].append({"role": "assistant", "content": res, "mascot": pick_mascot(q)})
             st.rerun()
 
 # ✅ 사용자 입력
 if user_input := st.chat_input("질문을 입력하세요 (예: 수강신청 일정은?)"):
     st.session_state["messages"].append({"role": "user", "content": user_input})
     with st.spinner("답변 생성 중..."):
-        res = st.session_state["rag_chain"].invoke(user_input)
-        st.session_state["messages"].append({"role": "assistant", "content": res})
+        res = ask(user_input)
+        st.session_state["messages"].append({"role": "assistant", "content": res, "mascot": pick_mascot(user_input)})
         st.rerun()
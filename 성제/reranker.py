@@ -0,0 +1,115 @@
+# 🏅 Cross-encoder 재정렬(re-ranking) 단계
+# 벡터 검색으로 넉넉히(예: 12개) 가져온 뒤 (질문, 문단) 쌍을 한 번의 배치로 점수 매기고
+# 상위 몇 개만 LLM 에 보낸다. 점수는 (질문 해시, 청크 ID) 로 캐시하고,
+# 예상 소요 시간이 예산을 넘으면 재정렬을 건너뛰고 벡터 검색 순서를 그대로 쓴다.
+# 필요 패키지: pip install sentence-transformers
+
+import hashlib
+import logging
+import os
+import threading
+import time
+from collections import OrderedDict
+
+from langchain_core.retrievers import BaseRetriever
+
+logger = logging.getLogger(__name__)
+
+RERANK_MODEL = os.getenv("RERANK_MODEL", "Dongjin-kr/ko-reranker")
+RERANK_BUDGET_MS = float(os.getenv("RERANK_BUDGET_MS", "300"))
+RERANK_CACHE_SIZE = int(os.getenv("RERANK_CACHE_SIZE", "20000"))
+
+
+def _hash(text):
+    return hashlib.sha1(text.encode("utf-8")).hexdigest()
+
+
+def chunk_id(doc):
+    return getattr(doc, "id", None) or _hash(doc.page_content)
+
+
+class CrossEncoderReranker:
+    def __init__(self, model_name=RERANK_MODEL, batch_size=32, max_length=512, budget_ms=RERANK_BUDGET_MS,
+                 cache_size=RERANK_CACHE_SIZE, num_threads=None):
+        from sentence_transformers import CrossEncoder
+
+        if num_threads:
+            import torch
+            torch.set_num_threads(num_threads)
+        self.model = CrossEncoder(model_name, max_length=max_length, device="cpu")
+        self.batch_size = batch_size
+        self.budget_ms = budget_ms
+        self.cache_size = cache_size
+        self._cache = OrderedDict()
+        self._lock = threading.Lock()
+        self._pair_ms = None
+        self.stats = {"calls": 0, "pairs": 0, "cache_hits": 0, "skipped": 0}
+
+    # 쌍 하나당 평균 소요 시간 (지수 이동 평균)
+    def _observe(self, n_pairs, elapsed_ms):
+        per_pair = elapsed_ms / n_pairs
+        self._pair_ms = per_pair if self._pair_ms is None else 0.8 * self._pair_ms + 0.2 * per_pair
+
+    def estimate_ms(self, n_pairs):
+        return None if self._pair_ms is None else self._pair_ms * n_pairs
+
+    # ✅ [(doc, score)] 를 점수 내림차순으로. 예산 초과가 예상되면 None
+    def score(self, query, docs, budget_ms=None):
+        budget_ms = self.budget_ms if budget_ms is None else budget_ms
+        query_key = _hash(query)
+        keys = [(query_key, chunk_id(doc)) for doc in docs]
+        scores = {}
+        with self._lock:
+            for key in keys:
+                if key in self._cache:
+                    self._cache.move_to_end(key)
+                    scores[key] = self._cache[key]
+            self.stats["calls"] += 1
+            self.stats["cache_hits"] += len(scores)
+
+        missing = [(key, doc) for key, doc in zip(keys, docs) if key not in scores]
+        if missing:
+            estimate = self.estimate_ms(len(missing))
+            if budget_ms is not None and estimate is not None and estimate > budget_ms:
+                self.stats["skipped"] += 1
+                logger.info("rerank skipped: %d pairs ≈ %.0fms > %.0fms", len(missing), estimate, budget_ms)
+                return None
+            start = time.perf_counter()
+            values = self.model.predict([(query, doc.page_content) for _, doc in missing],
+                                        batch_size=self.batch_size, show_progress_bar=False)
+            self._observe(len(missing), (time.perf_counter() - start) * 1000)
+            with self._lock:
+                self.stats["pairs"] += len(missing)
+                for (key, _), value in zip(missing, values):
+                    scores[key] = float(value)
+                    self._cache[key] = float(value)
+                while len(self._cache) > self.cache_size:
+                    self._cache.popitem(last=False)
+
+        ranked = [(doc, scores[key]) for key, doc in zip(keys, docs)]
+        ranked.sort(key=lambda hit: hit[1], reverse=True)
+        return ranked
+
+
+class RerankRetriever(BaseRetriever):
+    base: BaseRetriever
+    reranker: CrossEncoderReranker
+    top_n: int = 3
+    budget_ms: float | None = None
+
+    def search_with_score(self, query, vector=None):
+        if vector is not None and hasattr(self.base, "search_with_vector"):
+            docs = self.base.search_with_vector(query, vector)
+        else:
+            docs = self.base.invoke(query)
+        ranked = self.reranker.score(query, docs, budget_ms=self.budget_ms)
+        if ranked is None:
+            # 예산 초과: 벡터 검색 순서 그대로
+            return [(doc, None) for doc in docs[:self.top_n]]
+        return ranked[:self.top_n]
+
+    def search_with_vector(self, query, vector):
+        return [doc for doc, _ in self.search_with_score(query, vector=vector)]
+
+    def _get_relevant_documents(self, query, *, run_manager=None):
+        return [doc for doc, _ in self.search_with_score(query)]
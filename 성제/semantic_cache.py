@@ -0,0 +1,112 @@
+# 🧠 의미 기반 질문 캐시: 표현만 다른 같은 질문이면 저장된 답변을 바로 돌려준다
+# ("휴학 신청 방법 좀 알려줘" ≈ "휴학은 어떻게 하나요?")
+# 질문 임베딩이 임계값 이상으로 가깝고, 답변을 만들 때의 인덱스 버전이 같을 때만 적중.
+# 오래된 항목은 TTL, 가득 차면 가장 오래 안 쓴 항목(LRU)부터 지운다.
+
+import json
+import logging
+import os
+import threading
+import time
+from collections import deque
+
+import numpy as np
+
+from numpy_store import _normalize
+
+logger = logging.getLogger(__name__)
+
+CACHE_THRESHOLD = float(os.getenv("SEMANTIC_CACHE_THRESHOLD", "0.92"))
+CACHE_MAX_ENTRIES = int(os.getenv("SEMANTIC_CACHE_MAX_ENTRIES", "1000"))
+CACHE_TTL_S = float(os.getenv("SEMANTIC_CACHE_TTL_S", str(24 * 3600)))
+CACHE_SAMPLE_LOG = os.getenv("SEMANTIC_CACHE_SAMPLE_LOG")
+
+# 임계값 바로 위에서 적중한 경우는 오적중 후보로 따로 모아 검토한다
+REVIEW_MARGIN = 0.03
+
+
+class SemanticCache:
+    def __init__(self, embeddings, threshold=CACHE_THRESHOLD, max_entries=CACHE_MAX_ENTRIES, ttl_s=CACHE_TTL_S,
+                 sample_log=CACHE_SAMPLE_LOG):
+        self.embeddings = embeddings
+        self.threshold = threshold
+        self.max_entries = max_entries
+        self.ttl_s = ttl_s
+        self.sample_log = sample_log
+        self._lock = threading.Lock()
+        self._vectors = None
+        self._entries = []
+        self.samples = deque(maxlen=200)
+        self.stats = {"lookups": 0, "hits": 0, "version_misses": 0, "expired": 0, "evicted": 0}
+
+    def __len__(self):
+        return len(self._entries)
+
+    @property
+    def hit_rate(self):
+        return self.stats["hits"] / self.stats["lookups"] if self.stats["lookups"] else 0.0
+
+    def _drop(self, rows):
+        drop = set(rows)
+        keep = [i for i in range(len(self._entries)) if i not in drop]
+        self._entries = [self._entries[i] for i in keep]
+        self._vectors = self._vectors[keep] if keep else None
+
+    # ✅ 적중하면 저장된 답변, 아니면 None
+    def lookup(self, query, version, vector=None):
+        vector = _normalize(self.embeddings.embed_query(query) if vector is None else vector)[0]
+        now = time.time()
+        with self._lock:
+            self.stats["lookups"] += 1
+            expired = [i for i, e in enumerate(self._entries) if now - e["created"] > self.ttl_s]
+            if expired:
+                self.stats["expired"] += len(expired)
+                self._drop(expired)
+            if not self._entries:
+                return None
+
+            scores = self._vectors @ vector
+            order = np.argsort(-scores)
+            for i in order:
+                score = float(scores[i])
+                if score < self.threshold:
+                    break
+                entry = self._entries[i]
+                if entry["version"] != version:
+                    # 문서가 바뀐 뒤 만든 답이 아니면 쓰지 않는다
+                    self.stats["version_misses"] += 1
+                    continue
+                entry["last_used"] = now
+                entry["hits"] += 1
+                self.stats["hits"] += 1
+                self._sample(query, entry, score)
+                logger.info("semantic cache hit %.3f: %r ≈ %r (hit rate %.1f%%)",
+                            score, query, entry["query"], self.hit_rate * 100)
+                return entry["answer"]
+        return None
+
+    def put(self, query, answer, version, vector=None):
+        vector = _normalize(self.embeddings.embed_query(query) if vector is None else vector)
+        now = time.time()
+        with self._lock:
+            if len(self._entries) >= self.max_entries:
+                lru = min(range(len(self._entries)), key=lambda i: self._entries[i]["last_used"])
+                self._drop([lru])
+                self.stats["evicted"] += 1
+            self._entries.append({"query": query, "answer": answer, "version": version,
+                                  "created": now, "last_used": now, "hits": 0})
+            self._vectors = vector if self._vectors is None else np.concatenate([self._vectors, vector])
+
+    def _sample(self, query, entry, score):
+        sample = {"at": time.time(), "query": query, "cached_query": entry["query"], "score": round(score, 4),
+                  "borderline": score < self.threshold + REVIEW_MARGIN}
+        self.samples.append(sample)
+        if sample["borderline"]:
+            logger.warning("semantic cache borderline hit %.3f: %r ≈ %r", score, query, entry["query"])
+        if self.sample_log:
+            with open(self.sample_log, "a", encoding="utf-8") as f:
+                f.write(json.dumps(sample, ensure_ascii=False) + "\n")
+
+    # 오적중 검토용: 임계값에 가까운 적중부터
+    def review_samples(self, n=20):
+        return sorted(self.samples, key=lambda s: s["score"])[:n]
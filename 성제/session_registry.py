@@ -0,0 +1,181 @@
+# 🗃️ 세션별 인덱스/체인 레지스트리 (프로세스 공용)
+# 브라우저 세션마다 업로드 인덱스·체인·대화 기억을 들고 있으면 세션이 끝나도 메모리가 풀리지 않는다.
+# 세션별로 대략적인 바이트 수를 세고, 상한을 넘거나 오래 쓰지 않으면 가장 오래 안 쓴 세션부터 정리한다.
+
+import json
+import logging
+import os
+import sys
+import threading
+import time
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+SESSION_MEMORY_CAP_MB = float(os.getenv("SESSION_MEMORY_CAP_MB", "1024"))
+SESSION_IDLE_TTL_S = float(os.getenv("SESSION_IDLE_TTL_S", str(30 * 60)))
+
+
+def _text_bytes(texts):
+    return sum(len(t.encode("utf-8")) + 49 for t in texts)
+
+
+def _metadata_bytes(metadatas):
+    return sum(len(json.dumps(m, ensure_ascii=False, default=str).encode("utf-8")) for m in metadatas)
+
+
+# ✅ 대략적인 메모리 사용량 (벡터 + 문서 텍스트 + 메타데이터). shared 에 있는 객체는 세지 않는다
+def estimate_bytes(obj, shared=(), _seen=None):
+    seen = set(shared) if _seen is None else _seen
+    if obj is None or id(obj) in seen:
+        return 0
+    seen.add(id(obj))
+
+    if isinstance(obj, np.ndarray):
+        return obj.nbytes
+    if isinstance(obj, (str, bytes)):
+        return sys.getsizeof(obj)
+    if isinstance(obj, dict):
+        return sum(estimate_bytes(v, _seen=seen) for v in obj.values())
+    if isinstance(obj, (list, tuple, set)):
+        return sum(estimate_bytes(v, _seen=seen) for v in obj)
+
+    # NumpyVectorStore (+ 이 저장소로 만든 계층 검색 문서 인덱스)
+    if hasattr(obj, "_vectors") and hasattr(obj, "_texts"):
+        from hierarchical import indexes_for
+
+        index_bytes = sum(index.nbytes for index in indexes_for(obj))
+        if getattr(obj, "compact", False):
+            return (np.asarray(obj._vectors).nbytes + obj._texts.nbytes + obj._metadatas.nbytes
+                    + 64 * len(obj._ids) + index_bytes)
+        return (np.asarray(obj._vectors).nbytes + _text_bytes(obj._texts)
+                + _metadata_bytes(obj._metadatas) + 64 * len(obj._ids) + index_bytes)
+    # FAISS (langchain_community)
+    if hasattr(obj, "index") and hasattr(obj, "docstore") and hasattr(obj.index, "ntotal"):
+        vectors = obj.index.ntotal * obj.index.d * 4
+        if hasattr(obj.docstore, "nbytes"):
+            return vectors + obj.docstore.nbytes
+        docs = list(getattr(obj.docstore, "_dict", {}).values())
+        return vectors + _text_bytes(d.page_content for d in docs) + _metadata_bytes(d.metadata for d in docs)
+    # IndexHolder / 검색기 / 체인: 참조하는 인덱스를 따라간다
+    if hasattr(obj, "get") and hasattr(obj, "swap"):
+        return estimate_bytes(obj.get(), _seen=seen)
+    # 재정렬 모델의 점수 LRU ((질문, 청크) 키 → 점수)
+    if hasattr(obj, "_cache") and hasattr(obj, "score"):
+        return sum(sys.getsizeof(key) + sum(sys.getsizeof(k) for k in key) + 24 for key in list(obj._cache))
+    # search=lambda ...: 클로저가 잡고 있는 검색기
+    if callable(obj) and getattr(obj, "__closure__", None):
+        return sum(estimate_bytes(cell.cell_contents, _seen=seen) for cell in obj.__closure__
+                   if cell.cell_contents is not None)
+    # DeadlineRAG / AdaptiveK / Rerank / Hierarchical 검색기 (생성 체인은 세션끼리 공용이라 따라가지 않는다)
+    refs = [getattr(obj, name, None) for name in ("retriever", "base", "search", "holder", "reranker")]
+    if any(ref is not None for ref in refs):
+        return sum(estimate_bytes(ref, _seen=seen) for ref in refs)
+    # 대화 기억
+    if hasattr(obj, "turns") and hasattr(obj, "summary"):
+        return sys.getsizeof(obj.summary) + sum(sys.getsizeof(q) + sys.getsizeof(a) for q, a in obj.turns)
+    return 0
+
+
+class SessionRegistry:
+    # shared: 모든 세션이 같이 쓰는 객체(기본 문서 인덱스 등)를 돌려주는 함수. 세션 사용량에서 뺀다
+    def __init__(self, cap_mb=SESSION_MEMORY_CAP_MB, idle_ttl_s=SESSION_IDLE_TTL_S, shared=lambda: ()):
+        self.shared = shared
+        self.cap_bytes = int(cap_mb * 1e6)
+        self.idle_ttl_s = idle_ttl_s
+        self._lock = threading.Lock()
+        self._entries = {}
+        self.evictions = 0
+
+    # ✅ 세션 자원 dict. 없거나 정리된 세션이면 None
+    def get(self, session_id):
+        with self._lock:
+            entry = self._entries.get(session_id)
+            if entry is None:
+                return None
+            entry["last_used"] = time.time()
+            return entry["resources"]
+
+    def put(self, session_id, resources):
+        now = time.time()
+        with self._lock:
+            self._entries[session_id] = {"resources": resources, "bytes": 0, "created": now, "last_used": now}
+        self.refresh(session_id)
+
+    # 인덱스가 바뀐 뒤(업로드 색인 완료 등) 다시 세고, 필요하면 정리
+    # (크기 계산은 잠금 밖에서, 잠금은 항목을 고치는 동안만)
+    def refresh(self, session_id=None):
+        with self._lock:
+            entry = self._entries.get(session_id)
+        size = None
+        if entry is not None:
+            size = estimate_bytes(entry["resources"], shared=[id(o) for o in self.shared()])
+        with self._lock:
+            # 세는 동안 정리되거나 새로 등록된 세션이면 그 값은 버린다
+            if size is not None and self._entries.get(session_id) is entry:
+                entry["bytes"] = size
+            self._evict(keep=session_id)
+
+    def _evict(self, keep=None):
+        now = time.time()
+        idle = [sid for sid, e in self._entries.items() if sid != keep and now - e["last_used"] > self.idle_ttl_s]
+        for sid in idle:
+            self._remove(sid, "idle")
+        by_age = sorted((e["last_used"], sid) for sid, e in self._entries.items() if sid != keep)
+        while self.total_bytes() > self.cap_bytes and by_age:
+            _, sid = by_age.pop(0)
+            self._remove(sid, "memory cap")
+
+    def _remove(self, session_id, reason):
+        entry = self._entries.pop(session_id)
+        self.evictions += 1
+        logger.info("session %s evicted (%s, %.1fMB)", session_id[:8], reason, entry["bytes"] / 1e6)
+
+    def total_bytes(self):
+        return sum(e["bytes"] for e in self._entries.values())
+
+    # ✅ 관리자 화면용 현황
+    def usage(self):
+        now = time.time()
+        with self._lock:
+            sessions = [{"session": sid[:8], "mb": e["bytes"] / 1e6, "idle_s": now - e["last_used"],
+                         "age_s": now - e["created"]}
+                        for sid, e in sorted(self._entries.items(), key=lambda item: -item[1]["last_used"])]
+            return {"sessions": sessions, "total_mb": self.total_bytes() / 1e6,
+                    "cap_mb": self.cap_bytes / 1e6, "evictions": self.evictions}
+
+
+# ✅ 확인용: python session_registry.py → 업로드 세션의 첫 질문 뒤 사용량이 늘어나는지 (가짜 임베딩, API 호출 없음)
+if __name__ == "__main__":
+    from adaptive_k import AdaptiveKRetriever
+    from deadline import DeadlineRAG
+    from eval_set import load_eval_set
+    from fakes import FakeEmbeddings
+    from hierarchical import HierarchicalRetriever
+    from ingest_worker import IndexHolder
+    from numpy_store import NumpyVectorStore
+
+    items = load_eval_set()
+    base = NumpyVectorStore.from_texts([i["reference"] for i in items], FakeEmbeddings(),
+                                       metadatas=[{"source": i["path"]} for i in items])
+    uploaded = base.copy()
+    holder = IndexHolder(uploaded)
+    hierarchical = HierarchicalRetriever(holder=holder)
+    rag = DeadlineRAG(AdaptiveKRetriever(search=lambda query, k, vector=None:
+                                         hierarchical.search_with_score(query, k=k, vector=vector)), None)
+    registry = SessionRegistry(shared=lambda: [base])
+    registry.put("session", {"holder": holder, "rag_chain": rag})
+    before = registry.total_bytes()
+    rag.answer(items[0]["question"], mode="search")
+    registry.refresh("session")
+    after = registry.total_bytes()
+    print(f"첫 질문 전 {before:,}B → 후 {after:,}B")
+    assert after > before, "세션 사용량이 첫 질문(문서 인덱스 생성) 뒤에 늘어나야 한다"
+
+    # 기본 문서만 쓰는 세션은 공용 인덱스라 세지 않는다
+    holder.swap(base)
+    rag.answer(items[0]["question"], mode="search")
+    registry.refresh("session")
+    assert registry.total_bytes() < before, "공용 인덱스가 세션 사용량에 들어가면 안 된다"
+    print("✅ ok")
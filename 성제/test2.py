@@ -1,5 +1,4 @@
 # 🧠 1. 기본 모듈 및 API 키 설정
-from langchain_community.document_loaders import PyPDFDirectoryLoader
 from langchain_text_splitters import RecursiveCharacterTextSplitter
 from langchain_anthropic import ChatAnthropic
 from langchain.vectorstores import Chroma
@@ -9,6 +8,8 @@ from langchain.schema.runnable import RunnableLambda, RunnablePassthrough
 import os
 import getpass
 
+from text_cache import load_pdf_folder
+
 
 # 🔐 Claude API Key 입력 받기
 claude_api_key = getpass.getpass("Claude API Key를 입력하세요: ")
@@ -16,8 +17,7 @@ os.environ["ANTHROPIC_API_KEY"] = claude_api_key
 
 # 📁 2. PDF 로딩 (경북대 PDF 폴더 경로)
 folder_path = r"C:/_vscode/Project_13/성제/경북대학교"
-loader = PyPDFDirectoryLoader(folder_path)
-documents = loader.load()
+documents = load_pdf_folder(folder_path)
 
 # ✅ 불러온 PDF 수 확인
 print(f"📄 불러온 PDF 문서 수: {len(documents)}개")
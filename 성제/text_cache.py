@@ -0,0 +1,118 @@
+# 📚 PDF 추출 텍스트 캐시 (파일 내용 해시 → 페이지별 텍스트 + 메타데이터)
+# 내용이 바뀌지 않은 PDF는 PyPDFLoader로 다시 파싱하지 않는다.
+
+import glob
+import hashlib
+import json
+import os
+import sqlite3
+import tempfile
+import zlib
+
+from langchain_core.documents import Document
+
+# 실행 위치와 상관없이 성제/ 한 곳에 (정민/·수민/·현석/ 앱도 같은 캐시를 쓴다)
+DEFAULT_CACHE_PATH = os.getenv("TEXT_CACHE_PATH", os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                                                               "text_cache.sqlite3"))
+
+
+def hash_bytes(data):
+    return hashlib.sha256(data).hexdigest()
+
+
+def hash_file(path):
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            h.update(block)
+    return h.hexdigest()
+
+
+class TextCache:
+    def __init__(self, path=DEFAULT_CACHE_PATH):
+        self.path = path
+        with self._connect() as conn:
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS pages ("
+                "digest TEXT PRIMARY KEY, name TEXT, n_pages INTEGER, payload BLOB)"
+            )
+
+    # Streamlit 은 여러 스레드에서 호출하므로 연결은 매번 새로 연다
+    def _connect(self):
+        return sqlite3.connect(self.path, timeout=30)
+
+    def get(self, digest):
+        with self._connect() as conn:
+            row = conn.execute("SELECT payload FROM pages WHERE digest = ?", (digest,)).fetchone()
+        if row is None:
+            return None
+        return json.loads(zlib.decompress(row[0]).decode("utf-8"))
+
+    def put(self, digest, name, pages):
+        payload = zlib.compress(json.dumps(pages, ensure_ascii=False).encode("utf-8"), 6)
+        with self._connect() as conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO pages (digest, name, n_pages, payload) VALUES (?, ?, ?, ?)",
+                (digest, name, len(pages), payload),
+            )
+
+
+_default_cache = None
+
+
+def get_cache():
+    global _default_cache
+    if _default_cache is None:
+        _default_cache = TextCache()
+    return _default_cache
+
+
+def _parse_pdf(path):
+    # 캐시 미스일 때만 pypdf 를 불러온다
+    from langchain_community.document_loaders import PyPDFLoader
+    return [{"text": p.page_content, "metadata": p.metadata} for p in PyPDFLoader(path).load()]
+
+
+def _to_documents(pages, source):
+    docs = []
+    for page in pages:
+        metadata = dict(page["metadata"])
+        metadata["source"] = source
+        docs.append(Document(page_content=page["text"], metadata=metadata))
+    return docs
+
+
+# ✅ PDF 한 개 로딩 (PyPDFLoader(path).load() 와 같은 페이지 단위 Document 반환)
+def load_pdf(path, cache=None):
+    cache = cache or get_cache()
+    digest = hash_file(path)
+    pages = cache.get(digest)
+    if pages is None:
+        pages = _parse_pdf(path)
+        cache.put(digest, os.path.basename(path), pages)
+    return _to_documents(pages, path)
+
+
+# ✅ 업로드된 파일(bytes) 로딩: 같은 내용이면 임시 파일도 만들지 않는다
+def load_pdf_bytes(data, name, cache=None):
+    cache = cache or get_cache()
+    digest = hash_bytes(data)
+    pages = cache.get(digest)
+    if pages is None:
+        with tempfile.NamedTemporaryFile(delete=False, suffix=".pdf") as tmp:
+            tmp.write(data)
+            tmp_path = tmp.name
+        try:
+            pages = _parse_pdf(tmp_path)
+        finally:
+            os.remove(tmp_path)
+        cache.put(digest, name, pages)
+    return _to_documents(pages, name)
+
+
+# ✅ 폴더 안의 PDF 전부 로딩 (PyPDFDirectoryLoader 대체)
+def load_pdf_folder(folder_path, cache=None):
+    pages = []
+    for path in sorted(glob.glob(os.path.join(folder_path, "*.pdf"))):
+        pages.extend(load_pdf(path, cache=cache))
+    return pages
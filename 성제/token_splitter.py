@@ -0,0 +1,156 @@
+# ✂️ 임베딩 모델 토크나이저 기준 청크 분할
+# RecursiveCharacterTextSplitter(chunk_size=1000)는 글자 수로 자르지만,
+# ko-sbert 계열 모델은 128 토큰에서 잘라버리기 때문에 청크 뒷부분이 임베딩에 반영되지 않는다.
+
+import json
+import logging
+import re
+
+from langchain_text_splitters import TextSplitter
+
+logger = logging.getLogger(__name__)
+
+# ✅ sentence-transformers 설정(sentence_bert_config.json)의 max_seq_length
+MODEL_MAX_SEQ_LENGTH = {
+    "jhgan/ko-sbert-nli": 128,
+    "jhgan/ko-sroberta-multitask": 128,
+}
+
+# ■ 소제목, ----- 구분선 은 청크 경계로 사용 (경북대학교_학적_정리본.txt 형식)
+_SECTION_RE = re.compile(r"^\s*(■|-{5,}\s*$)")
+_SENTENCE_RE = re.compile(r"(?<=[.!?])\s+")
+
+
+def model_max_tokens(model_name, tokenizer=None):
+    if model_name in MODEL_MAX_SEQ_LENGTH:
+        return MODEL_MAX_SEQ_LENGTH[model_name]
+    try:
+        from huggingface_hub import hf_hub_download
+        with open(hf_hub_download(model_name, "sentence_bert_config.json"), encoding="utf-8") as f:
+            return int(json.load(f)["max_seq_length"])
+    except Exception:
+        pass
+    if tokenizer is not None:
+        return min(int(tokenizer.model_max_length), 512)
+    return 512
+
+
+# ✅ 텍스트를 섹션 → 문장 단위로 나눈다: [[(문장, 앞 구분자), ...], ...]
+def split_units(text):
+    sections = [[]]
+    for line in text.splitlines():
+        if not line.strip():
+            continue
+        if _SECTION_RE.match(line):
+            if sections[-1]:
+                sections.append([])
+            if line.strip().startswith("-"):
+                continue
+        for i, sentence in enumerate(_SENTENCE_RE.split(line.strip())):
+            if sentence:
+                sections[-1].append((sentence, " " if i else "\n"))
+    return [s for s in sections if s]
+
+
+class TokenAwareSplitter(TextSplitter):
+    def __init__(self, tokenizer, max_tokens, overlap_tokens=16, **kwargs):
+        self.tokenizer = tokenizer
+        # [CLS]/[SEP] 같은 특수 토큰 자리를 빼고 실제 본문 예산을 잡는다
+        self.budget = max_tokens - tokenizer.num_special_tokens_to_add()
+        self.last_report = {}
+        super().__init__(chunk_size=self.budget, chunk_overlap=overlap_tokens,
+                         length_function=self.count_tokens, **kwargs)
+
+    @classmethod
+    def from_model(cls, model_name, max_tokens=None, overlap_tokens=16, **kwargs):
+        from transformers import AutoTokenizer
+        tokenizer = AutoTokenizer.from_pretrained(model_name)
+        max_tokens = max_tokens or model_max_tokens(model_name, tokenizer)
+        return cls(tokenizer, max_tokens, overlap_tokens=overlap_tokens, **kwargs)
+
+    def count_tokens(self, text):
+        return len(self.tokenizer(text, add_special_tokens=False)["input_ids"])
+
+    def _batch_lengths(self, texts):
+        if not texts:
+            return []
+        return [len(ids) for ids in self.tokenizer(texts, add_special_tokens=False)["input_ids"]]
+
+    # ✅ 예산보다 긴 문장 하나는 토큰 오프셋 기준으로 자른다
+    def _split_long(self, text):
+        enc = self.tokenizer(text, add_special_tokens=False, return_offsets_mapping=True)
+        offsets = enc["offset_mapping"]
+        step = max(self.budget - self._chunk_overlap, 1)
+        pieces = []
+        for start in range(0, len(offsets), step):
+            window = offsets[start:start + self.budget]
+            pieces.append(text[window[0][0]:window[-1][1]].strip())
+            if start + self.budget >= len(offsets):
+                break
+        return pieces
+
+    def split_text(self, text):
+        sections = split_units(text)
+        lengths = iter(self._batch_lengths([u for section in sections for u, _ in section]))
+        chunks = []
+        current, current_len = [], 0
+        for number, section in enumerate(sections):
+            for unit, sep in section:
+                n = next(lengths)
+                if n > self.budget:
+                    if current:
+                        chunks.append(self._join(current))
+                    chunks.extend(self._split_long(unit))
+                    current, current_len = [], 0
+                    continue
+                if current and current_len + n > self.budget:
+                    chunks.append(self._join(current))
+                    current, current_len = self._overlap(current)
+                    if current_len + n > self.budget:
+                        current, current_len = [], 0
+                current.append((unit, sep, n))
+                current_len += n
+            # "1. 휴·복학" 같은 제목만 있는 짧은 섹션은 다음 섹션 앞에 붙인다
+            is_last = number == len(sections) - 1
+            if current and (is_last or current_len >= self._chunk_overlap):
+                chunks.append(self._join(current))
+                current, current_len = [], 0
+        return chunks
+
+    # 직전 청크의 마지막 문장들을 overlap 토큰 수 안에서 이어 붙인다
+    def _overlap(self, units):
+        carried, total = [], 0
+        for unit in reversed(units):
+            if total + unit[2] > self._chunk_overlap:
+                break
+            carried.insert(0, unit)
+            total += unit[2]
+        return carried, total
+
+    @staticmethod
+    def _join(units):
+        return "".join((sep if i else "") + unit for i, (unit, sep, _) in enumerate(units))
+
+    # ✅ 분할 후 실제 토큰 수로 다시 재서 잘리는 청크가 있는지 보고
+    def split_documents(self, documents):
+        docs = super().split_documents(documents)
+        self.last_report = truncation_report([d.page_content for d in docs], self.tokenizer, self.budget)
+        if self.last_report["truncated_chunks"]:
+            logger.warning("✂️ 토큰 예산 초과 청크 %d개 (잘리는 토큰 %d개)",
+                           self.last_report["truncated_chunks"], self.last_report["truncated_tokens"])
+        return docs
+
+
+# ✅ 청크 목록이 모델 최대 길이에서 얼마나 잘리는지 측정
+def truncation_report(texts, tokenizer, budget):
+    lengths = [len(ids) for ids in tokenizer(list(texts), add_special_tokens=False)["input_ids"]] if texts else []
+    over = [n - budget for n in lengths if n > budget]
+    total = sum(lengths)
+    return {
+        "chunks": len(lengths),
+        "budget": budget,
+        "max_tokens": max(lengths, default=0),
+        "truncated_chunks": len(over),
+        "truncated_tokens": sum(over),
+        "truncated_ratio": sum(over) / total if total else 0.0,
+    }
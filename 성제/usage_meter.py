@@ -0,0 +1,200 @@
+# 💰 요청별 토큰/비용 집계 + 예산 제한
+# LLM 호출마다 입력(프롬프트/문맥)·출력·캐시 토큰과 예상 비용을 기록하고 세션별·일별·평가 실행(run)별로 합산한다.
+# 예산(USD)을 넘으면 더 싼 모델로 낮추고(downgrade), 예산 × USAGE_BUDGET_HARD_FACTOR 를 넘으면 LLM 호출을 멈춘다(stop).
+# 토큰 수는 LangChain usage_metadata 를 콜백으로 받아 쓴다 (ChatAnthropic / ChatOpenAI 공통).
+
+import json
+import logging
+import os
+import threading
+import time
+from collections import defaultdict
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from langchain_core.callbacks import BaseCallbackHandler
+
+from adaptive_k import count_tokens
+
+logger = logging.getLogger(__name__)
+
+
+def _env_usd(name):
+    value = os.getenv(name)
+    return float(value) if value else None
+
+
+BUDGETS = {
+    "session": _env_usd("USAGE_BUDGET_SESSION_USD"),
+    "day": _env_usd("USAGE_BUDGET_DAILY_USD"),
+    "run": _env_usd("USAGE_BUDGET_RUN_USD"),
+}
+HARD_FACTOR = float(os.getenv("USAGE_BUDGET_HARD_FACTOR", "1.5"))
+USAGE_LOG = os.getenv("USAGE_LOG")
+
+# 100만 토큰당 USD (2025년 공개 가격 기준, 바뀌면 여기만 고친다)
+PRICES_PER_MTOK = {
+    "claude-3-haiku": {"input": 0.25, "output": 1.25, "cache_write": 0.30, "cache_read": 0.03},
+    "claude-3-5-haiku": {"input": 0.80, "output": 4.00, "cache_write": 1.00, "cache_read": 0.08},
+    "claude-3-5-sonnet": {"input": 3.00, "output": 15.00, "cache_write": 3.75, "cache_read": 0.30},
+    "claude-3-opus": {"input": 15.00, "output": 75.00, "cache_write": 18.75, "cache_read": 1.50},
+    "gpt-4o-mini": {"input": 0.15, "output": 0.60, "cache_write": 0.15, "cache_read": 0.075},
+    "gpt-4o": {"input": 2.50, "output": 10.00, "cache_write": 2.50, "cache_read": 1.25},
+    "gpt-4-turbo": {"input": 10.00, "output": 30.00, "cache_write": 10.00, "cache_read": 10.00},
+    "gpt-4": {"input": 30.00, "output": 60.00, "cache_write": 30.00, "cache_read": 30.00},
+    "gpt-3.5-turbo": {"input": 0.50, "output": 1.50, "cache_write": 0.50, "cache_read": 0.50},
+}
+
+# 예산을 넘었을 때 낮출 모델
+DOWNGRADE = {
+    "gpt-4": "gpt-4o-mini",
+    "gpt-4-turbo": "gpt-4o-mini",
+    "gpt-4o": "gpt-4o-mini",
+    "claude-3-opus": "claude-3-haiku-20240307",
+    "claude-3-5-sonnet": "claude-3-haiku-20240307",
+    "claude-3-5-haiku": "claude-3-haiku-20240307",
+}
+
+_current_run = ContextVar("usage_run", default=None)
+
+
+def current_run():
+    return _current_run.get()
+
+
+# 날짜가 붙은 모델 이름(gpt-4o-2024-08-06)도 가장 긴 접두어로 찾는다
+def _lookup(table, model):
+    matches = [name for name in table if str(model or "").startswith(name)]
+    return table[max(matches, key=len)] if matches else None
+
+
+def downgrade_model(model):
+    return _lookup(DOWNGRADE, model)
+
+
+def estimate_cost(model, usage):
+    price = _lookup(PRICES_PER_MTOK, model)
+    if price is None:
+        return 0.0
+    uncached = usage["input_tokens"] - usage["cache_read"] - usage["cache_write"]
+    return (uncached * price["input"] + usage["cache_read"] * price["cache_read"]
+            + usage["cache_write"] * price["cache_write"] + usage["output_tokens"] * price["output"]) / 1e6
+
+
+# ✅ 호출 하나(체인 실행 하나) 동안의 LLM 사용량 수집: invoke(..., config={"callbacks": [collector]})
+class UsageCollector(BaseCallbackHandler):
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.calls = []
+
+    def on_llm_end(self, response, **kwargs):
+        for generations in response.generations:
+            for generation in generations:
+                message = getattr(generation, "message", None)
+                metadata = getattr(message, "usage_metadata", None) or {}
+                if not metadata:
+                    continue
+                details = metadata.get("input_token_details") or {}
+                response_metadata = getattr(message, "response_metadata", None) or {}
+                model = (response_metadata.get("model_name") or response_metadata.get("model")
+                         or (response.llm_output or {}).get("model_name"))
+                with self._lock:
+                    self.calls.append({
+                        "model": model,
+                        "input_tokens": metadata.get("input_tokens", 0),
+                        "output_tokens": metadata.get("output_tokens", 0),
+                        "cache_read": details.get("cache_read") or 0,
+                        "cache_write": details.get("cache_creation") or 0,
+                    })
+
+    # 합계 + 예상 비용. context 를 주면 입력 중 문맥(검색 문단) 토큰을 따로 센다
+    def usage(self, context=None):
+        with self._lock:
+            calls = list(self.calls)
+        total = {"model": calls[-1]["model"] if calls else None, "calls": len(calls),
+                 "input_tokens": 0, "output_tokens": 0, "cache_read": 0, "cache_write": 0, "cost_usd": 0.0}
+        for call in calls:
+            for key in ("input_tokens", "output_tokens", "cache_read", "cache_write"):
+                total[key] += call[key]
+            total["cost_usd"] += estimate_cost(call["model"], call)
+        context_tokens = min(count_tokens(context), total["input_tokens"]) if context and calls else 0
+        total["context_tokens"] = context_tokens
+        total["prompt_tokens"] = total["input_tokens"] - context_tokens
+        return total
+
+
+def _empty():
+    return {"requests": 0, "input_tokens": 0, "output_tokens": 0, "cost_usd": 0.0}
+
+
+# ✅ 세션/일/평가 실행별 합계와 예산 확인
+class UsageMeter:
+    def __init__(self, budgets=None, hard_factor=HARD_FACTOR, log_path=USAGE_LOG):
+        self.budgets = dict(BUDGETS if budgets is None else budgets)
+        self.hard_factor = hard_factor
+        self.log_path = log_path
+        self._lock = threading.Lock()
+        self._totals = {scope: defaultdict(_empty) for scope in ("session", "day", "run", "model")}
+        self.actions = defaultdict(int)
+
+    def collector(self):
+        return UsageCollector()
+
+    def record(self, usage, session=None, run=None, question=None):
+        if not usage.get("calls"):
+            return usage
+        run = run if run is not None else current_run()
+        keys = {"session": session, "day": time.strftime("%Y-%m-%d"), "run": run, "model": usage["model"]}
+        with self._lock:
+            for scope, key in keys.items():
+                if key is None:
+                    continue
+                total = self._totals[scope][key]
+                total["requests"] += 1
+                total["input_tokens"] += usage["input_tokens"]
+                total["output_tokens"] += usage["output_tokens"]
+                total["cost_usd"] += usage["cost_usd"]
+        if self.log_path:
+            entry = {"at": time.time(), **keys, "question": question, **usage}
+            with self._lock, open(self.log_path, "a", encoding="utf-8") as f:
+                f.write(json.dumps(entry, ensure_ascii=False) + "\n")
+        return usage
+
+    def totals(self, scope, key):
+        with self._lock:
+            return dict(self._totals[scope].get(key) or _empty())
+
+    # ✅ "ok" / "downgrade"(예산 초과) / "stop"(예산 × hard_factor 초과)
+    def check(self, session=None, run=None):
+        run = run if run is not None else current_run()
+        keys = {"session": session, "day": time.strftime("%Y-%m-%d"), "run": run}
+        action = "ok"
+        for scope, key in keys.items():
+            limit = self.budgets.get(scope)
+            if limit is None or key is None:
+                continue
+            spent = self.totals(scope, key)["cost_usd"]
+            if spent >= limit * self.hard_factor:
+                action = "stop"
+                break
+            if spent >= limit:
+                action = "downgrade"
+        if action != "ok":
+            with self._lock:
+                self.actions[action] += 1
+            logger.warning("usage budget %s (session=%s, run=%s)", action, session, run)
+        return action
+
+    # 평가 스윕: with meter.run("k=4 sweep"): ... 안의 호출은 이 run 으로 집계
+    @contextmanager
+    def run(self, name):
+        token = _current_run.set(name)
+        try:
+            yield self
+        finally:
+            _current_run.reset(token)
+
+    def as_dict(self):
+        with self._lock:
+            return {scope: {key: dict(total) for key, total in totals.items()}
+                    for scope, totals in self._totals.items()} | {"actions": dict(self.actions)}
@@ -0,0 +1,126 @@
+# 🔥 서버 준비(warm-up) 단계: 임베딩 모델 로딩 → 인덱스 열기 → 더미 검색 → (선택) LLM 연결 확인
+# 첫 사용자가 모델 다운로드/로딩, 인덱스 생성, 첫 TLS 연결 비용을 떠안지 않도록 미리 해 둔다.
+# 준비가 끝나면 ready 이벤트가 켜지고, READY_FILE 을 지정하면 헬스체크용 파일도 만든다.
+#
+# 단독 실행(python warmup.py)하면 같은 단계를 미리 돌려서 모델 다운로드, ONNX 변환,
+# PDF 텍스트 캐시 같은 디스크 캐시를 서버 시작 전에 채워 둔다.
+
+import logging
+import os
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+
+READY_FILE = os.getenv("READY_FILE")
+WARMUP_PING = os.getenv("WARMUP_PING", "0") == "1"
+WARMUP_QUERY = "휴학 신청은 어떻게 하나요?"
+
+
+class Warmup:
+    def __init__(self, steps, ready_file=READY_FILE, results=None):
+        # steps: [(이름, 인자 없는 함수)] 순서대로 실행, results: 단계가 만든 객체를 넣는 dict (준비가 끝난 뒤 꺼내 쓴다)
+        self.steps = list(steps)
+        self.ready_file = ready_file
+        self.results = {} if results is None else results
+        self.ready = threading.Event()
+        self.state = "pending"
+        self.timings = []
+        self.error = None
+        self.current = None
+        self._thread = None
+
+    def run(self):
+        self.state = "running"
+        start = time.perf_counter()
+        if self.ready_file and os.path.exists(self.ready_file):
+            os.remove(self.ready_file)
+        for name, fn in self.steps:
+            self.current = name
+            step_start = time.perf_counter()
+            try:
+                fn()
+            except Exception as e:
+                self.timings.append({"step": name, "seconds": time.perf_counter() - step_start, "ok": False})
+                self.state = "failed"
+                self.error = f"{name}: {e}"
+                logger.exception("warm-up step %s failed", name)
+                return False
+            seconds = time.perf_counter() - step_start
+            self.timings.append({"step": name, "seconds": seconds, "ok": True})
+            logger.info("warm-up %-20s %.2fs", name, seconds)
+        self.current = None
+        self.state = "ready"
+        logger.info("warm-up done in %.2fs", time.perf_counter() - start)
+        if self.ready_file:
+            with open(self.ready_file, "w") as f:
+                f.write(str(time.time()))
+        self.ready.set()
+        return True
+
+    # ✅ 백그라운드에서 실행 (프로세스 당 한 번)
+    def start(self):
+        if self._thread is None:
+            self._thread = threading.Thread(target=self.run, name="warmup", daemon=True)
+            self._thread.start()
+        return self
+
+    def wait(self, timeout=None):
+        return self.ready.wait(timeout)
+
+    @property
+    def failed(self):
+        return self.state == "failed"
+
+    def progress(self):
+        return len(self.timings) / len(self.steps) if self.steps else 1.0
+
+    def as_dict(self):
+        return {"state": self.state, "current": self.current, "error": self.error, "steps": list(self.timings)}
+
+
+# ✅ 성제/rag.py 와 같은 구성의 준비 단계
+# build_components() → (분할기, 임베딩), build_corpus(분할기, 임베딩) → CorpusWatcher.
+# 만든 객체는 results["components"] / results["corpus"] 에 넣는다 (준비 스레드에서 st.cache_resource 를 부르지 않게)
+def rag_warmup_steps(build_components, build_corpus, answer_llm=None, ping=WARMUP_PING, results=None):
+    results = {} if results is None else results
+
+    def components():
+        results["components"] = build_components()
+
+    def corpus():
+        results["corpus"] = build_corpus(*results["components"])
+
+    steps = [
+        ("embedding model", components),
+        ("index", corpus),
+        ("dummy query", lambda: results["corpus"].holder.get().similarity_search(WARMUP_QUERY, k=1)),
+    ]
+    if ping and answer_llm is not None:
+        # 응답 체인과 같은 클라이언트로 1토큰 호출 → TLS 연결을 미리 맺어 둔다
+        steps.append(("llm ping", lambda: answer_llm().bind(max_tokens=1).invoke("ping")))
+    return steps
+
+
+if __name__ == "__main__":
+    from index_watcher import CorpusWatcher
+    from onnx_embeddings import load_embeddings
+    from token_splitter import TokenAwareSplitter
+
+    logging.basicConfig(level=logging.INFO, format="%(message)s")
+    model_name = "jhgan/ko-sbert-nli"
+    cache = {}
+
+    def build_corpus(splitter, embeddings):
+        corpus = CorpusWatcher(["data"], splitter, embeddings)
+        corpus.refresh()
+        return corpus
+
+    results = {}
+    steps = rag_warmup_steps(lambda: (TokenAwareSplitter.from_model(model_name), load_embeddings(model_name)),
+                             build_corpus, ping=False, results=results)
+    warmup = Warmup(steps, ready_file=None, results=results)
+    ok = warmup.run()
+    for step in warmup.timings:
+        print(f"{'✅' if step['ok'] else '❌'} {step['step']:<20} {step['seconds']:.2f}s")
+    raise SystemExit(0 if ok else 1)
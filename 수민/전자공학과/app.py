@@ -8,13 +8,22 @@ from langchain_community.embeddings import OpenAIEmbeddings
 from langchain_community.llms import OpenAI
 from langchain.chains import RetrievalQA
 
+import shared_path  # noqa: F401  (성제/ 공용 모듈 경로)
+from federated import FederatedRetriever, build_knu_stores
+
 # 🔐 OpenAI API Key 입력 받기
 openai_api_key = getpass.getpass("🔑 OpenAI API Key를 입력하세요: ")
 os.environ["OPENAI_API_KEY"] = openai_api_key
 
-# 벡터 DB 불러오기
-embedding = OpenAIEmbeddings(openai_api_key=openai_api_key)
-vectordb = Chroma(persist_directory="./db", embedding_function=embedding)
+# 벡터 DB 불러오기 (전자공학과 DB + 학교 규정 DB + 현석 data 를 병렬 검색)
+@st.cache_resource
+def load_retriever():
+    embedding = OpenAIEmbeddings(openai_api_key=openai_api_key)
+    stores = build_knu_stores(include=("학교 규정", "현석 data"))
+    stores["전자공학과"] = Chroma(persist_directory="./db", embedding_function=embedding)
+    return FederatedRetriever(stores=stores, timeouts={"전자공학과": 5.0})
+
+retriever = load_retriever()
 
 # LLM 준비
 llm = OpenAI(openai_api_key=openai_api_key, temperature=0)
@@ -22,7 +31,7 @@ llm = OpenAI(openai_api_key=openai_api_key, temperature=0)
 # RAG QA 체인 구성
 qa_chain = RetrievalQA.from_chain_type(
     llm=llm,
-    retriever=vectordb.as_retriever(),
+    retriever=retriever,
     chain_type="stuff"
 )
 
@@ -35,6 +44,13 @@ question = st.text_input("무엇이 궁금한가요?", placeholder="예: 졸업
 
 if question:
     with st.spinner("검색 중..."):
-        answer = qa_chain.run(question)
+        # 검색은 한 번만 하고 저장소별 통계도 함께 받는다
+        docs, stats = retriever.search_with_stats(question)
+        answer = qa_chain.combine_documents_chain.run(input_documents=docs, question=question)
     st.success("💬 답변:")
     st.write(answer)
+
+    # 📊 저장소별 검색 시간
+    st.caption(" · ".join(
+        f"{name}: {s['status']} {s.get('latency_ms', 0):.0f}ms" for name, s in stats.items() if name != "_total"
+    ))
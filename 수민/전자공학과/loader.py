@@ -1,10 +1,12 @@
 import os
 import getpass
-from langchain.document_loaders import PyPDFLoader
 from langchain.text_splitter import RecursiveCharacterTextSplitter
 from langchain.vectorstores import Chroma
 from langchain.embeddings import OpenAIEmbeddings
 
+import shared_path  # noqa: F401  (성제/ 공용 모듈 경로)
+from text_cache import load_pdf
+
 # 🔐 OpenAI API Key 입력 받기
 openai_api_key = getpass.getpass("🔑 OpenAI API Key를 입력하세요: ")
 os.environ["OPENAI_API_KEY"] = openai_api_key
@@ -13,8 +15,7 @@ os.environ["OPENAI_API_KEY"] = openai_api_key
 pdf_path = "C:/Users/KDT21/lsm/Project_13/수민/학과별 생활 가이드북(Blue Book) 학사 자료.pdf"
 
 # 2. PDF 불러오기
-loader = PyPDFLoader(pdf_path)
-pages = loader.load()
+pages = load_pdf(pdf_path)
 
 # 3. 텍스트 쪼개기
 text_splitter = RecursiveCharacterTextSplitter(
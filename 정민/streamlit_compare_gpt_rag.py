@@ -1,5 +1,4 @@
 import os
-import tempfile
 import streamlit as st
 from dotenv import load_dotenv
 
@@ -7,14 +6,17 @@ from dotenv import load_dotenv
 load_dotenv()
 openai_api_key = os.getenv("OPENAI_API_KEY")
 
-from langchain.document_loaders import PyPDFLoader
 from langchain.text_splitter import RecursiveCharacterTextSplitter
-from langchain_openai import OpenAIEmbeddings, ChatOpenAI
+from langchain_openai import OpenAIEmbeddings
 from langchain_chroma import Chroma
 from langchain_core.prompts import ChatPromptTemplate
 from langchain_core.runnables import RunnablePassthrough
 from langchain_core.output_parsers import StrOutputParser
 
+import shared_path  # noqa: F401  (성제/ 공용 모듈 경로)
+from text_cache import load_pdf_bytes
+from llm_clients import get_chat_model
+
 # ✅ Streamlit 초기 설정
 st.set_page_config(page_title="📘 GPT-4 vs RAG 챗봇", layout="wide")
 st.title("🤖 GPT-4 vs 📄 RAG 챗봇 비교")
@@ -25,11 +27,7 @@ uploaded_file = st.file_uploader("📄 문서를 업로드하세요 (PDF)", type
 
 # 🔧 함수 정의
 def load_pdf(_file):
-    with tempfile.NamedTemporaryFile(delete=False, suffix=".pdf") as tmp:
-        tmp.write(_file.read())
-        tmp_path = tmp.name
-    loader = PyPDFLoader(tmp_path)
-    return loader.load_and_split()
+    return load_pdf_bytes(_file.getvalue(), _file.name)
 
 def create_vectorstore(pages):
     splitter = RecursiveCharacterTextSplitter(chunk_size=1000, chunk_overlap=200)
@@ -46,7 +44,7 @@ def build_rag_chain(_vectorstore):
         ("system", system_prompt),
         ("human", "{input}"),
     ])
-    llm = ChatOpenAI(model="gpt-4o", temperature=0, openai_api_key=openai_api_key)
+    llm = get_chat_model("openai", "gpt-4o", temperature=0, openai_api_key=openai_api_key)
     return (
         {"context": retriever | format_docs, "input": RunnablePassthrough()}
         | prompt
@@ -58,7 +56,8 @@ def format_docs(docs):
     return "\n\n".join(doc.page_content for doc in docs)
 
 def gpt4_response(query):
-    model = ChatOpenAI(model="gpt-4", temperature=0, openai_api_key=openai_api_key)
+    # 호출마다 새로 만들지 않고 공용 클라이언트(연결 풀 공유) 재사용
+    model = get_chat_model("openai", "gpt-4", temperature=0, openai_api_key=openai_api_key)
     return model.predict(query)
 
 # 💬 질문 입력
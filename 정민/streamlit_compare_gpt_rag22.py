@@ -1,5 +1,6 @@
 import os
-import tempfile
+import uuid
+import weakref
 import streamlit as st
 from dotenv import load_dotenv
 
@@ -7,14 +8,21 @@ from dotenv import load_dotenv
 load_dotenv()
 openai_api_key = os.getenv("OPENAI_API_KEY")
 
-from langchain.document_loaders import PyPDFLoader
-from langchain.text_splitter import RecursiveCharacterTextSplitter
-from langchain_openai import OpenAIEmbeddings, ChatOpenAI
-from langchain_chroma import Chroma
-from langchain_core.prompts import ChatPromptTemplate
-from langchain_core.runnables import RunnablePassthrough
-from langchain_core.output_parsers import StrOutputParser
-from bert_score import score
+import shared_path  # noqa: F401  (성제/ 공용 모듈 경로)
+from lazy_imports import lazy_from, lazy_import
+
+# ✅ 무거운 모듈은 처음 쓸 때 불러온다 (bert_score 는 torch/transformers 까지 끌어옴)
+RecursiveCharacterTextSplitter, = lazy_from("langchain.text_splitter", "RecursiveCharacterTextSplitter")
+OpenAIEmbeddings, = lazy_from("langchain_openai", "OpenAIEmbeddings")
+Chroma, = lazy_from("langchain_chroma", "Chroma")
+chromadb = lazy_import("chromadb")
+ChatPromptTemplate, = lazy_from("langchain_core.prompts", "ChatPromptTemplate")
+RunnablePassthrough, = lazy_from("langchain_core.runnables", "RunnablePassthrough")
+StrOutputParser, = lazy_from("langchain_core.output_parsers", "StrOutputParser")
+text_cache = lazy_import("text_cache")
+get_chat_model, = lazy_from("llm_clients", "get_chat_model")
+UsageMeter, downgrade_model = lazy_from("usage_meter", "UsageMeter", "downgrade_model")
+bert_score = lazy_import("bert_score")
 
 # ✅ Streamlit 초기 설정
 st.set_page_config(page_title="📘 GPT-4 vs RAG 챗봇", layout="wide")
@@ -26,18 +34,55 @@ uploaded_files = st.file_uploader("📄 문서를 업로드하세요 (PDF)", typ
 
 # 🔧 함수 정의
 def load_pdf(_file):
-    with tempfile.NamedTemporaryFile(delete=False, suffix=".pdf") as tmp:
-        tmp.write(_file.read())
-        tmp_path = tmp.name
-    loader = PyPDFLoader(tmp_path)
-    return loader.load_and_split()
+    return text_cache.load_pdf_bytes(_file.getvalue(), _file.name)
+
+# ✅ 메모리 Chroma 클라이언트 (프로세스 당 하나, 세션별 컬렉션은 여기에 만든다)
+@st.cache_resource
+def load_chroma_client():
+    return chromadb.EphemeralClient()
+
+# ✅ 세션의 업로드 인덱스: 세션마다 별도 컬렉션 (같은 프로세스의 다른 세션과 섞이지 않게)
+# 세션이 끝나 session_state 가 정리되면 컬렉션도 지워 임베딩이 서버에 쌓이지 않게 한다
+class UploadIndex:
+    def __init__(self):
+        client = load_chroma_client()
+        name = f"uploads_{uuid.uuid4().hex[:8]}"
+        self.vectorstore = Chroma(client=client, collection_name=name,
+                                  embedding_function=OpenAIEmbeddings(model='text-embedding-3-small',
+                                                                      openai_api_key=openai_api_key))
+        self.rag_chain = build_rag_chain(self.vectorstore)
+        self.files = {}
+        weakref.finalize(self, client.delete_collection, name)
+
+# ✅ 업로드 파일 집합(내용 해시 기준)에 맞춰 인덱스를 증분 갱신
+# 새 파일만 분할/임베딩해서 추가하고, 빠진 파일은 그 청크만 삭제한다. 바뀐 게 없으면 아무것도 안 함
+def sync_vectorstore(files):
+    if "upload_index" not in st.session_state:
+        st.session_state["upload_index"] = UploadIndex()
+    index = st.session_state["upload_index"]
+    vectorstore = index.vectorstore
+
+    current = {}
+    for _file in files:
+        current.setdefault(text_cache.hash_bytes(_file.getvalue()), _file)
+
+    for digest in [d for d in index.files if d not in current]:
+        ids = index.files.pop(digest)
+        if ids:
+            vectorstore.delete(ids=ids)
 
-def create_vectorstore(pages):
     splitter = RecursiveCharacterTextSplitter(chunk_size=1000, chunk_overlap=200)
-    docs = splitter.split_documents(pages)
-    return Chroma.from_documents(docs, OpenAIEmbeddings(model='text-embedding-3-small', openai_api_key=openai_api_key))
-
-def build_rag_chain(_vectorstore):
+    for digest, _file in current.items():
+        if digest in index.files:
+            continue
+        docs = splitter.split_documents(load_pdf(_file))
+        ids = [f"{digest}-{i}" for i in range(len(docs))]
+        if docs:
+            vectorstore.add_documents(docs, ids=ids)
+        index.files[digest] = ids
+    return index.rag_chain
+
+def build_rag_chain(_vectorstore, model="gpt-4o"):
     retriever = _vectorstore.as_retriever()
     system_prompt = """당신은 문서를 기반으로 질문에 대답하는 친절한 챗봇입니다. \
 다음 context를 참고해서 질문에 정중하고 정확하게 답해주세요. \
@@ -47,7 +92,7 @@ def build_rag_chain(_vectorstore):
         ("system", system_prompt),
         ("human", "{input}"),
     ])
-    llm = ChatOpenAI(model="gpt-4o", temperature=0, openai_api_key=openai_api_key)
+    llm = get_chat_model("openai", model, temperature=0, openai_api_key=openai_api_key)
     return (
         {"context": retriever | format_docs, "input": RunnablePassthrough()}
         | prompt
@@ -58,12 +103,36 @@ def build_rag_chain(_vectorstore):
 def format_docs(docs):
     return "\n\n".join(doc.page_content for doc in docs)
 
-def gpt4_response(query):
-    model = ChatOpenAI(model="gpt-4", temperature=0, openai_api_key=openai_api_key)
-    return model.predict(query)
+def gpt4_response(query, model="gpt-4", config=None):
+    # 호출마다 새로 만들지 않고 공용 클라이언트(연결 풀 공유) 재사용
+    llm = get_chat_model("openai", model, temperature=0, openai_api_key=openai_api_key)
+    return llm.invoke(query, config=config).content
+
+# ✅ 토큰/비용 집계 + 예산 (USAGE_BUDGET_SESSION_USD / USAGE_BUDGET_DAILY_USD)
+@st.cache_resource
+def load_usage_meter():
+    return UsageMeter()
+
+# 예산을 넘으면 더 싼 모델(gpt-4 → gpt-4o-mini)로, 한도의 USAGE_BUDGET_HARD_FACTOR 배를 넘으면 호출하지 않는다
+def metered(query, model, invoke):
+    meter = load_usage_meter()
+    session = st.session_state.setdefault("usage_session", uuid.uuid4().hex)
+    action = meter.check(session=session)
+    if action == "stop":
+        return "💸 사용량 예산을 넘어 답변을 생성하지 않았습니다.", None
+    if action == "downgrade":
+        model = downgrade_model(model) or model
+    collector = meter.collector()
+    answer = invoke(model, {"callbacks": [collector]})
+    return answer, meter.record(collector.usage(), session=session, question=query)
+
+def usage_caption(usage):
+    if usage:
+        st.caption(f"🪙 {usage['model']} · 입력 {usage['input_tokens']:,} / 출력 {usage['output_tokens']:,} 토큰 · "
+                   f"약 ${usage['cost_usd']:.4f}")
 
 def calculate_bertscore(pred, ref):
-    P, R, F1 = score([pred], [ref], lang="ko", model_type="klue/bert-base", verbose=False)
+    P, R, F1 = bert_score.score([pred], [ref], lang="ko", model_type="klue/bert-base", verbose=False)
     return P.mean().item(), R.mean().item(), F1.mean().item()
 
 # 💬 질문 입력
@@ -72,28 +141,35 @@ query = st.text_input("❓ 경북대학교 관련 질문을 입력하세요")
 # ✅ 응답 비교 출력
 if uploaded_files and query:
     with st.spinner("PDF 처리 중..."):
-        all_pages = []
-        for _file in uploaded_files:
-            pages = load_pdf(_file)
-            all_pages.extend(pages)
-
-        vectorstore = create_vectorstore(all_pages)
-        rag_chain = build_rag_chain(vectorstore)
+        rag_chain = sync_vectorstore(uploaded_files)
+
+    # 같은 질문 + 같은 파일 집합이면 rerun(토글 등) 때 답변을 다시 만들지 않는다
+    answer_key = (query, tuple(sorted(st.session_state["upload_index"].files)))
+    if st.session_state.get("answer_key") != answer_key:
+        vectorstore = st.session_state["upload_index"].vectorstore
+        gpt = metered(query, "gpt-4", lambda model, config: gpt4_response(query, model, config))
+        rag = metered(query, "gpt-4o", lambda model, config: (
+            rag_chain if model == "gpt-4o" else build_rag_chain(vectorstore, model)).invoke(query, config=config))
+        st.session_state["answers"] = {"gpt": gpt, "rag": rag}
+        st.session_state["answer_key"] = answer_key
+    gpt_answer, gpt_usage = st.session_state["answers"]["gpt"]
+    rag_answer, rag_usage = st.session_state["answers"]["rag"]
 
     col1, col2 = st.columns(2)
     with col1:
         st.subheader("🌐 GPT‑4 기본 응답")
-        gpt_answer = gpt4_response(query)
         st.write(gpt_answer)
+        usage_caption(gpt_usage)
 
     with col2:
         st.subheader("📄 PDF 기반 RAG 응답")
-        rag_answer = rag_chain.invoke(query)
         st.write(rag_answer)
+        usage_caption(rag_usage)
 
-    # 📊 BERTScore 출력
+    # 📊 BERTScore 출력 (켰을 때만 bert_score/torch 로딩 + 계산)
     with st.expander("📊 BERTScore 유사도 비교"):
-        precision, recall, f1 = calculate_bertscore(gpt_answer, rag_answer)
-        st.metric("Precision", f"{precision:.4f}")
-        st.metric("Recall", f"{recall:.4f}")
-        st.metric("F1 Score", f"{f1:.4f}")
+        if st.toggle("BERTScore 계산하기", key="show_bertscore"):
+            precision, recall, f1 = calculate_bertscore(gpt_answer, rag_answer)
+            st.metric("Precision", f"{precision:.4f}")
+            st.metric("Recall", f"{recall:.4f}")
+            st.metric("F1 Score", f"{f1:.4f}")
@@ -1,5 +1,4 @@
 # 🧠 1. 기본 모듈 및 API 키 설정
-from langchain_community.document_loaders import PyPDFDirectoryLoader
 from langchain_text_splitters import RecursiveCharacterTextSplitter
 from langchain_anthropic import ChatAnthropic
 from langchain.vectorstores import Chroma
@@ -9,14 +8,16 @@ from bert_score import score as bert_score
 import os
 import getpass
 
+import shared_path  # noqa: F401  (성제/ 공용 모듈 경로)
+from text_cache import load_pdf_folder
+
 # 🔐 Claude API Key 입력 받기
 claude_api_key = getpass.getpass("Claude API Key를 입력하세요: ")
 os.environ["ANTHROPIC_API_KEY"] = claude_api_key
 
 # 📁 2. PDF 로딩
 folder_path = r"C:/_vscode/Project_13/성제/경북대학교"
-loader = PyPDFDirectoryLoader(folder_path)
-documents = loader.load()
+documents = load_pdf_folder(folder_path)
 print(f"📄 불러온 PDF 문서 수: {len(documents)}개")
 
 # 📚 3. 청크 분할
@@ -1,5 +1,4 @@
 import os
-from langchain.document_loaders import PyPDFLoader
 from langchain.text_splitter import RecursiveCharacterTextSplitter
 from langchain.embeddings import OpenAIEmbeddings
 from langchain.vectorstores import Chroma
@@ -8,6 +7,9 @@ from langchain.chains import RetrievalQA
 from bert_score import score as bert_score
 from getpass import getpass
 
+import shared_path  # noqa: F401  (성제/ 공용 모듈 경로)
+from text_cache import load_pdf
+
 # ✅ 1. OpenAI API 키 설정
 os.environ["OPENAI_API_KEY"] = getpass("🔐 OpenAI API 키를 입력하세요: ")
 
@@ -15,14 +17,13 @@ os.environ["OPENAI_API_KEY"] = getpass("🔐 OpenAI API 키를 입력하세요:
 pdf_dir = r"C:\_vscode\Project_13\성제\경북대학교"
 
 # ✅ 3. 모든 PDF 파일 불러오기
-loaders = [PyPDFLoader(os.path.join(pdf_dir, f))
-           for f in os.listdir(pdf_dir) if f.endswith(".pdf")]
-print(f"📄 불러온 PDF 파일 수: {len(loaders)}")
+pdf_paths = [os.path.join(pdf_dir, f) for f in os.listdir(pdf_dir) if f.endswith(".pdf")]
+print(f"📄 불러온 PDF 파일 수: {len(pdf_paths)}")
 
 # ✅ 4. 문서 로드 + 청크화
 docs = []
-for loader in loaders:
-    docs.extend(loader.load())
+for path in pdf_paths:
+    docs.extend(load_pdf(path))
 print(f"📃 전체 문서 페이지 수: {len(docs)}")
 
 splitter = RecursiveCharacterTextSplitter(
@@ -2,13 +2,20 @@ import os
 import streamlit as st
 from dotenv import load_dotenv
 
-from langchain_community.document_loaders import PyPDFLoader
-from langchain_community.vectorstores import FAISS
-from langchain.text_splitter import RecursiveCharacterTextSplitter
-from langchain_openai import OpenAIEmbeddings, ChatOpenAI
-from langchain_core.prompts import ChatPromptTemplate
-from langchain_core.runnables import RunnablePassthrough
-from langchain_core.output_parsers import StrOutputParser
+import shared_path  # noqa: F401  (성제/ 공용 모듈 경로)
+from lazy_imports import lazy_from
+from deadline import DEFAULT_BUDGET_S, DeadlineRAG
+
+# ✅ 무거운 모듈(langchain, 벡터DB, LLM SDK)은 처음 쓸 때 불러온다 → 첫 화면이 먼저 뜬다
+FAISS, = lazy_from("langchain_community.vectorstores", "FAISS")
+compact_faiss, = lazy_from("compact_docstore", "compact_faiss")
+RecursiveCharacterTextSplitter, = lazy_from("langchain.text_splitter", "RecursiveCharacterTextSplitter")
+OpenAIEmbeddings, = lazy_from("langchain_openai", "OpenAIEmbeddings")
+ChatPromptTemplate, = lazy_from("langchain_core.prompts", "ChatPromptTemplate")
+StrOutputParser, = lazy_from("langchain_core.output_parsers", "StrOutputParser")
+ConversationMemory, = lazy_from("conversation", "ConversationMemory")
+get_chat_model, = lazy_from("llm_clients", "get_chat_model")
+load_pdf, = lazy_from("text_cache", "load_pdf")
 
 # 🔐 API 키 로드
 load_dotenv()
@@ -39,8 +46,7 @@ def build_combined_rag(pdf_dir):
     for filename in os.listdir(pdf_dir):
         if filename.endswith(".pdf"):
             path = os.path.join(pdf_dir, filename)
-            loader = PyPDFLoader(path)
-            pages = loader.load_and_split()
+            pages = load_pdf(path)
             for p in pages:
                 p.metadata["source"] = filename
             all_docs.extend(pages)
@@ -50,13 +56,17 @@ def build_combined_rag(pdf_dir):
 
     # ✅ OpenAI 임베딩 사용
     embeddings = OpenAIEmbeddings(model="text-embedding-3-small", openai_api_key=os.getenv("OPENAI_API_KEY"))
-    vectorstore = FAISS.from_documents(docs, embedding=embeddings)
+    # 청크마다 Document 를 들고 있지 않도록 문서 저장소를 열 단위로 교체
+    vectorstore = compact_faiss(FAISS.from_documents(docs, embedding=embeddings))
     retriever = vectorstore.as_retriever()
 
-    llm = ChatOpenAI(
-        model="gpt-4o",
+    llm = get_chat_model(
+        "openai",
+        "gpt-4o",
         temperature=0.3,
-        openai_api_key=os.getenv("OPENAI_API_KEY")
+        openai_api_key=os.getenv("OPENAI_API_KEY"),
+        timeout=DEFAULT_BUDGET_S,
+        max_retries=0
     )
 
     system_prompt = """당신은 경북대학교 학사 관련 문서를 기반으로 정중한 한국어로 답변하는 AI 도우미입니다. \
@@ -67,12 +77,8 @@ def build_combined_rag(pdf_dir):
         ("human", "{input}")
     ])
 
-    chain = (
-        {"context": retriever | (lambda d: "\n\n".join(doc.page_content for doc in d)), "input": RunnablePassthrough()}
-        | prompt
-        | llm
-        | StrOutputParser()
-    )
+    # ⏱️ 생성이 늦어지면 검색된 문단 + 출처로 대신 답변
+    chain = DeadlineRAG(retriever, prompt | llm | StrOutputParser())
     return chain
 
 # ✅ 체인 초기화
@@ -84,6 +90,13 @@ if "messages" not in st.session_state:
         {"role": "assistant", "content": "안녕하세요! 📘 경북대 학사 관련 문서 기반으로 궁금한 걸 물어보세요 :)"}
     ]
 
+# ✅ 대화 기억 (후속 질문 바꿔쓰기 + 오래된 대화 요약)
+if "memory" not in st.session_state:
+    st.session_state["memory"] = ConversationMemory(
+        get_chat_model("openai", "gpt-4o-mini", temperature=0, openai_api_key=os.getenv("OPENAI_API_KEY"),
+                       timeout=5, max_retries=0, max_tokens=400)
+    )
+
 # ✅ 대화 렌더링 (상황에 따른 마스코트 변경)
 for i, msg in enumerate(st.session_state["messages"]):
     if msg["role"] == "assistant":
@@ -128,7 +141,9 @@ if query := st.chat_input("질문을 입력하세요 (예: 휴학 신청은 어
 
     with st.spinner("문서를 검색하고 있어요..."):
         try:
-            answer = chain.invoke(query)
+            memory = st.session_state["memory"]
+            answer = chain.invoke(memory.condense(query))
+            memory.add(query, answer)
             st.session_state["messages"].append({"role": "assistant", "content": answer})
         except Exception as e:
             st.session_state["messages"].append({
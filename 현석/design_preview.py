@@ -1,6 +1,9 @@
 import streamlit as st
 import base64
-import random  # 🔸 랜덤 마스코트 선택용
+import os
+
+import shared_path  # noqa: F401  (성제/ 공용 모듈 경로)
+from chat_render import DEFAULT_MASCOT, image_bytes, message_html, render_history
 
 # 🔐 로고 base64 인코딩
 def load_logo_base64(path):
@@ -79,52 +82,46 @@ st.markdown(f"""
 # ✅ 대화 상태 초기화
 if "messages" not in st.session_state:
     st.session_state["messages"] = [
-        {"role": "assistant", "content": "안녕하세요! 📘 경북대 학사 도우미입니다. 무엇이든 물어보세요!"}
+        {"role": "assistant", "content": "안녕하세요! 📘 경북대 학사 도우미입니다. 무엇이든 물어보세요!",
+         "mascot": "assets/mascot_hello.png"}
     ]
 
-# ✅ 대화 렌더링
-for i, msg in enumerate(st.session_state["messages"]):
-    if msg["role"] == "assistant":
-        if i == 0:
-            mascot_img = "assets/mascot_hello.png"
-        else:
-            prev_user_msg = st.session_state["messages"][i - 1]["content"] if i > 0 else ""
-            graduation_keywords = ["졸업", "졸업요건", "졸업논문", "졸업학점", "학위"]
-            if any(keyword in prev_user_msg for keyword in graduation_keywords):
-                mascot_img = "assets/mascot_graduate.png"
-            else:
-                mascot_img = random.choice([
-                    "assets/mascot.png",
-                    "assets/mascot_love.png",
-                    "assets/mascot_alarm.png"
-                ])
-
-        col1, col2 = st.columns([1, 8])
-        with col1:
-            st.image(mascot_img, width=130)
-        with col2:
-            st.markdown(f"""
+# ✅ 대화 렌더링 (마스코트는 메시지에 저장된 것, 최근 메시지만, 말풍선 HTML 은 한 번만 생성)
+def assistant_html(content):
+    return f"""
                 <div style='position:relative; background-color:#ffffff;
                             padding:15px 20px; border-radius:20px;
                             border: 1px solid #e0e0e0;
                             box-shadow: 2px 2px 5px rgba(0,0,0,0.05);
                             max-width: 90%; margin-bottom:15px;'>
-                  {msg['content']}
+                  {content}
                 </div>
-            """, unsafe_allow_html=True)
+            """
 
-    elif msg["role"] == "user":
-        st.markdown(f"""
+def user_html(content):
+    return f"""
             <div style='text-align:right; margin-bottom:15px;'>
                 <div style='position:relative; display:inline-block; 
                             background-color:#b71c1c; color:white;
                             padding:15px 20px; border-radius:20px;
                             box-shadow: 2px 2px 5px rgba(0,0,0,0.05);
                             max-width: 85%;'>
-                  {msg['content']}
+                  {content}
                 </div>
             </div>
-        """, unsafe_allow_html=True)
+        """
+
+def render_message(msg):
+    if msg["role"] == "assistant":
+        col1, col2 = st.columns([1, 8])
+        with col1:
+            st.image(image_bytes(msg.get("mascot", DEFAULT_MASCOT)), width=130)
+        with col2:
+            st.markdown(message_html(msg, assistant_html), unsafe_allow_html=True)
+    elif msg["role"] == "user":
+        st.markdown(message_html(msg, user_html), unsafe_allow_html=True)
+
+render_history(st.session_state["messages"], render_message)
 
 # ✅ 자주 묻는 질문 버튼
 frequent_questions = [
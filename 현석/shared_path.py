@@ -0,0 +1,9 @@
+# 📎 성제/ 공용 모듈(text_cache, lazy_imports, federated 등)을 불러올 수 있게 경로 추가
+# 이 폴더 스크립트는 맨 위에서 `import shared_path` 한 줄로 쓴다 (파이썬은 실행한 스크립트 폴더만 경로에 넣는다)
+
+import os
+import sys
+
+SHARED_DIR = os.path.abspath(os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "성제"))
+if SHARED_DIR not in sys.path:
+    sys.path.append(SHARED_DIR)
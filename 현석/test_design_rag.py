@@ -1,19 +1,25 @@
 import streamlit as st
 import base64
-import random
 import os
 import glob
-import tempfile
 
 from dotenv import load_dotenv
-from langchain_community.document_loaders import PyPDFLoader
-from langchain.text_splitter import RecursiveCharacterTextSplitter
-from langchain_community.vectorstores import FAISS
-from langchain_community.embeddings import HuggingFaceEmbeddings
-from langchain_core.prompts import ChatPromptTemplate
-from langchain_core.runnables import RunnablePassthrough
-from langchain_core.output_parsers import StrOutputParser
-from langchain_anthropic import ChatAnthropic
+
+import shared_path  # noqa: F401  (성제/ 공용 모듈 경로)
+from lazy_imports import lazy_from
+from chat_render import DEFAULT_MASCOT, image_bytes, message_html, pick_mascot, render_history
+
+# ✅ 무거운 모듈(langchain, 벡터DB, LLM SDK)은 처음 쓸 때 불러온다 → 첫 화면이 먼저 뜬다
+RecursiveCharacterTextSplitter, = lazy_from("langchain.text_splitter", "RecursiveCharacterTextSplitter")
+FAISS, = lazy_from("langchain_community.vectorstores", "FAISS")
+compact_faiss, = lazy_from("compact_docstore", "compact_faiss")
+HuggingFaceEmbeddings, = lazy_from("langchain_community.embeddings", "HuggingFaceEmbeddings")
+ChatPromptTemplate, = lazy_from("langchain_core.prompts", "ChatPromptTemplate")
+RunnablePassthrough, = lazy_from("langchain_core.runnables", "RunnablePassthrough")
+StrOutputParser, = lazy_from("langchain_core.output_parsers", "StrOutputParser")
+load_pdf_bytes, load_pdf_folder = lazy_from("text_cache", "load_pdf_bytes", "load_pdf_folder")
+get_chat_model, = lazy_from("llm_clients", "get_chat_model")
+ConversationMemory, = lazy_from("conversation", "ConversationMemory")
 
 # ✅ API 키 로드
 load_dotenv()
@@ -29,24 +35,16 @@ def load_logo_base64(path):
         return base64.b64encode(f.read()).decode()
 logo_base64 = load_logo_base64("assets/knu_logo.png")
 
-# ✅ PDF 로딩
+# ✅ PDF 로딩 (추출 텍스트 캐시 우선)
 def load_all_pdfs_from_folder(folder_path):
-    pages = []
-    for path in glob.glob(os.path.join(folder_path, "*.pdf")):
-        loader = PyPDFLoader(path)
-        pages.extend(loader.load_and_split())
-    return pages
+    return load_pdf_folder(folder_path)
 
 # ✅ RAG 체인 생성
 @st.cache_resource
 def create_rag_chain(uploaded_file=None, use_only_uploaded=False):
     pages = []
     if uploaded_file:
-        with tempfile.NamedTemporaryFile(delete=False, suffix=".pdf") as tmp:
-            tmp.write(uploaded_file.getvalue())
-            tmp_path = tmp.name
-        loader = PyPDFLoader(tmp_path)
-        pages.extend(loader.load_and_split())
+        pages.extend(load_pdf_bytes(uploaded_file.getvalue(), uploaded_file.name))
 
     if not use_only_uploaded:
         pages.extend(load_all_pdfs_from_folder("data"))
@@ -54,7 +52,8 @@ def create_rag_chain(uploaded_file=None, use_only_uploaded=False):
     splitter = RecursiveCharacterTextSplitter(chunk_size=1000, chunk_overlap=100)
     docs = splitter.split_documents(pages)
     embeddings = HuggingFaceEmbeddings(model_name="jhgan/ko-sbert-nli")
-    vectorstore = FAISS.from_documents(docs, embeddings)
+    # 청크마다 Document 를 들고 있지 않도록 문서 저장소를 열 단위로 교체
+    vectorstore = compact_faiss(FAISS.from_documents(docs, embeddings))
     retriever = vectorstore.as_retriever()
 
     prompt = ChatPromptTemplate.from_messages([
@@ -68,7 +67,7 @@ def create_rag_chain(uploaded_file=None, use_only_uploaded=False):
         {"context": retriever | (lambda docs: "\n\n".join(d.page_content for d in docs)),
          "input": RunnablePassthrough()}
         | prompt
-        | ChatAnthropic(model="claude-3-haiku-20240307")
+        | get_chat_model("anthropic", "claude-3-haiku-20240307")
         | StrOutputParser()
     )
 
@@ -119,6 +118,12 @@ with st.sidebar:
 if "messages" not in st.session_state:
     st.session_state["messages"] = [{"role": "assistant", "content": "안녕하세요! 📘 경북대 학사 도우미입니다.", "mascot": "assets/mascot_hello.png"}]
 
+# ✅ 대화 기억 (후속 질문 바꿔쓰기 + 오래된 대화 요약)
+if "memory" not in st.session_state:
+    st.session_state["memory"] = ConversationMemory(
+        get_chat_model("anthropic", "claude-3-haiku-20240307", timeout=5, max_retries=0, max_tokens=400)
+    )
+
 if (
     "rag_chain" not in st.session_state or
     st.session_state.get("last_uploaded_name") != (uploaded_file.name if uploaded_file else None) or
@@ -139,34 +144,41 @@ st.markdown(f"""
     </div>
 """, unsafe_allow_html=True)
 
-# ✅ 메시지 출력 (마스코트 고정)
-for i, msg in enumerate(st.session_state["messages"]):
-    if msg["role"] == "assistant":
-        mascot_img = msg.get("mascot", "assets/mascot.png")
-        col1, col2 = st.columns([1, 8])
-        with col1:
-            st.image(mascot_img, width=130)
-        with col2:
-            st.markdown(f"""
+# ✅ 메시지 출력 (마스코트 고정, 최근 메시지만, 말풍선 HTML 은 메시지마다 한 번만 생성)
+def assistant_html(content):
+    return f"""
                 <div style='position:relative; background-color:#ffffff;
                             padding:15px 20px; border-radius:20px;
                             border: 1px solid #e0e0e0;
                             box-shadow: 2px 2px 5px rgba(0,0,0,0.05);
                             max-width: 90%; margin-bottom:15px;'>
-                  {msg['content']}
+                  {content}
                 </div>
-            """, unsafe_allow_html=True)
-    else:
-        st.markdown(f"""
+            """
+
+def user_html(content):
+    return f"""
             <div style='text-align:right; margin-bottom:15px;'>
                 <div style='background:#b71c1c; color:white;
                             padding:15px 20px; border-radius:20px;
                             box-shadow: 2px 2px 5px rgba(0,0,0,0.05);
                             display:inline-block; max-width:85%;'>
-                    {msg['content']}
+                    {content}
                 </div>
             </div>
-        """, unsafe_allow_html=True)
+        """
+
+def render_message(msg):
+    if msg["role"] == "assistant":
+        col1, col2 = st.columns([1, 8])
+        with col1:
+            st.image(image_bytes(msg.get("mascot", DEFAULT_MASCOT)), width=130)
+        with col2:
+            st.markdown(message_html(msg, assistant_html), unsafe_allow_html=True)
+    else:
+        st.markdown(message_html(msg, user_html), unsafe_allow_html=True)
+
+render_history(st.session_state["messages"], render_message)
 
 # ✅ 자주 묻는 질문 버튼
 frequent_questions = [
@@ -192,12 +204,10 @@ for idx, q in enumerate(frequent_questions):
         """, unsafe_allow_html=True)
 
         with st.spinner("답변 생성 중..."):
-            response = st.session_state["rag_chain"].invoke(q)
-            mascot_img = (
-                "assets/mascot_graduate.png" if any(k in q for k in ["졸업", "졸업요건", "졸업논문", "졸업학점", "학위"]) else
-                random.choice(["assets/mascot.png", "assets/mascot_love.png", "assets/mascot_alarm.png"])
-            )
+            response = st.session_state["rag_chain"].invoke(st.session_state["memory"].condense(q))
+            mascot_img = pick_mascot(q)
             st.session_state["messages"].append({"role": "assistant", "content": response, "mascot": mascot_img})
+            st.session_state["memory"].add(q, response)
             st.rerun()
 
 # ✅ 사용자 입력
@@ -214,10 +224,8 @@ if user_input := st.chat_input("질문을 입력하세요 (예: 수강신청 일
         </div>
     """, unsafe_allow_html=True)
     with st.spinner("답변 생성 중..."):
-        response = st.session_state["rag_chain"].invoke(user_input)
-        mascot_img = (
-            "assets/mascot_graduate.png" if any(k in user_input for k in ["졸업", "졸업요건", "졸업논문", "졸업학점", "학위"]) else
-            random.choice(["assets/mascot.png", "assets/mascot_love.png", "assets/mascot_alarm.png"])
-        )
+        response = st.session_state["rag_chain"].invoke(st.session_state["memory"].condense(user_input))
+        mascot_img = pick_mascot(user_input)
         st.session_state["messages"].append({"role": "assistant", "content": response, "mascot": mascot_img})
+        st.session_state["memory"].add(user_input, response)
         st.rerun()
\ No newline at end of file